@@ -3,6 +3,7 @@
 
 import os
 import json
+import weakref
 from datetime import datetime
 from contextlib import asynccontextmanager
 
@@ -52,17 +53,22 @@ class Run(Base):
     experiment = relationship("Experiment", back_populates="runs")
 
 
-# ============================================================
-# Create tables
-# ============================================================
+# tables get created on startup (lifespan) / seed, not at import - importing app
+# shouldn't touch the db (scripts, tests, bench_* helpers import it).
+# remembered per engine, so swapping `engine` (tests, another DB_PATH) creates them again
+_tables_ready = weakref.WeakSet()
 
-Base.metadata.create_all(bind=engine)
+def ensure_tables():
+    if engine not in _tables_ready:
+        Base.metadata.create_all(bind=engine)
+        _tables_ready.add(engine)
 
 # ============================================================
 # Template helpers
 # ============================================================
 
 from h import fmt, do_thing, proc_data, mk_resp, chk, trunc, sanitize
+from auth import require_auth, require_role  # no-ops unless ENABLE_AUTH=true
 
 def get_db():
     db = SessionLocal()
@@ -123,7 +129,7 @@ def calc_experiment_stats(experiment, db):
 @asynccontextmanager
 async def lifespan(app):
     # startup
-    Base.metadata.create_all(bind=engine)
+    ensure_tables()
     yield
     # shutdown
 
@@ -323,6 +329,7 @@ async def compare_runs(request: Request, experiment_id: int):
 # ============================================================
 
 @app.get("/api/experiments")
+@require_auth
 async def list_experiments():
     db = get_db()
     try:
@@ -351,6 +358,7 @@ async def list_experiments():
 # ============================================================
 
 @app.post("/api/experiments")
+@require_role("editor")
 async def create_experiment(request: Request):
     db = get_db()
     try:
@@ -386,6 +394,7 @@ async def create_experiment(request: Request):
 # ============================================================
 
 @app.get("/api/experiments/{experiment_id}")
+@require_auth
 async def get_experiment(experiment_id: int):
     db = get_db()
     try:
@@ -426,6 +435,7 @@ async def get_experiment(experiment_id: int):
 # ============================================================
 
 @app.post("/api/experiments/{experiment_id}/runs")
+@require_role("editor")
 async def create_run(experiment_id: int, request: Request):
     db = get_db()
     try:
@@ -477,6 +487,7 @@ async def create_run(experiment_id: int, request: Request):
 # ============================================================
 
 @app.get("/api/experiments/{experiment_id}/runs/{run_id}")
+@require_auth
 async def get_run(experiment_id: int, run_id: int):
     db = get_db()
     try:
@@ -520,6 +531,7 @@ async def health():
 # ============================================================
 
 def seed():
+    ensure_tables()
     db = SessionLocal()
     try:
         # check if data exists
@@ -1,12 +1,23 @@
 # auth.py - authentication and authorization
 # Started by Jake in Q1, Maria was going to finish it but never did
-# The decorators exist but don't actually enforce anything
+# The decorators enforce sessions/roles when ENABLE_AUTH is on (config.py), otherwise pass through
 
 import hashlib
+import inspect
+import json
 import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
 from functools import wraps
 from datetime import datetime
 
+from fastapi import HTTPException, Request
+from starlette.concurrency import run_in_threadpool
+
+import config
+
 # hardcoded credentials for "testing" (never removed)
 ADMIN_USER = "admin"
 ADMIN_PASS_HASH = hashlib.sha256(b"tracker123").hexdigest()
@@ -19,23 +30,123 @@ ROLES = {
     "viewer": ["read"],
 }
 
-def require_auth(f):
-    """Decorator that was supposed to check auth but just passes through"""
+ROLE_PERMISSIONS = {role: frozenset(perms) for role, perms in ROLES.items()}
+
+
+class PermissionCache:
+    """LRU of token -> resolved permission set, so the hot path skips the session store
+
+    entries expire after ttl_seconds, or when their session does if that's sooner. with the
+    sqlite session backend a logout on another worker only reaches this cache when the entry
+    expires, so AUTH_CACHE_TTL_SECONDS is the cross-worker logout window (0 disables caching).
+    """
+
+    def __init__(self, max_size, ttl_seconds, clock=time.monotonic):
+        self.max_size = max_size
+        self.ttl = ttl_seconds
+        self.clock = clock
+        self._entries = OrderedDict()  # token -> (permissions, cached_until), least recent first
+        self._lock = threading.Lock()
+
+    def get(self, token):
+        with self._lock:
+            entry = self._entries.get(token)
+            if entry is None:
+                return None
+            if entry[1] <= self.clock():
+                del self._entries[token]
+                return None
+            self._entries.move_to_end(token)
+            return entry[0]
+
+    def put(self, token, permissions, expires_in=None):
+        """cache for ttl seconds, or until the session expires (expires_in seconds) if sooner"""
+        lifetime = self.ttl if expires_in is None else min(self.ttl, expires_in)
+        with self._lock:
+            self._entries[token] = (permissions, self.clock() + lifetime)
+            self._entries.move_to_end(token)
+            if len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+
+    def invalidate(self, token):
+        with self._lock:
+            self._entries.pop(token, None)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+
+_permission_cache = PermissionCache(config.AUTH_CACHE_SIZE, config.AUTH_CACHE_TTL_SECONDS)
+
+
+def token_from_request(request):
+    """session token from "Authorization: Bearer <token>" or the "session" cookie"""
+    header = request.headers.get("authorization", "")
+    if header[:7].lower() == "bearer ":
+        return header[7:].strip() or None
+    return request.cookies.get("session")
+
+
+def permissions_for(token):
+    """permission set for a session token, None if the session doesn't exist or expired
+
+    a logout in this process invalidates the cache right away (delete_session); a logout on
+    another worker is seen within AUTH_CACHE_TTL_SECONDS (see PermissionCache)
+    """
+    permissions = _permission_cache.get(token)
+    if permissions is None:
+        found = _sessions.lookup(token)
+        if found is None:
+            return None
+        session, expires_at = found
+        permissions = ROLE_PERMISSIONS.get(session.get("role"), frozenset())
+        _permission_cache.put(token, permissions, expires_in=expires_at - _sessions.clock())
+    return permissions
+
+
+def _guard(f, required):
+    """wrap an endpoint (async or sync) so it needs a session with all of `required`
+
+    FastAPI only passes the Request if the endpoint asks for it, so if f doesn't take
+    `request` we add it to the signature FastAPI sees and drop it before calling f.
+    """
+    sig = inspect.signature(f)
+    takes_request = "request" in sig.parameters
+    is_async = inspect.iscoroutinefunction(f)  # sync endpoints go to the threadpool, like FastAPI does
+
     @wraps(f)
     async def wrapper(*args, **kwargs):
-        # TODO: actually implement auth checking
-        # For now just let everything through
-        return await f(*args, **kwargs)
+        request = kwargs["request"] if takes_request else kwargs.pop("request")
+        if config.ENABLE_AUTH:
+            token = token_from_request(request)
+            permissions = permissions_for(token) if token else None
+            if permissions is None:
+                raise HTTPException(status_code=401, detail="Not authenticated")
+            if not required <= permissions:
+                raise HTTPException(status_code=403, detail="Not allowed")
+        if is_async:
+            return await f(*args, **kwargs)
+        return await run_in_threadpool(f, *args, **kwargs)
+
+    if not takes_request:
+        request_param = inspect.Parameter("request", inspect.Parameter.KEYWORD_ONLY, annotation=Request)
+        wrapper.__signature__ = sig.replace(parameters=[*sig.parameters.values(), request_param])
     return wrapper
 
+
+def require_auth(f):
+    """endpoint needs a valid session (any role). no-op unless ENABLE_AUTH"""
+    return _guard(f, frozenset())
+
 def require_role(role):
-    """Decorator for role-based access control (not implemented)"""
+    """endpoint needs a session whose role has every permission of `role` (see ROLES)"""
+    if role not in ROLE_PERMISSIONS:
+        raise ValueError(f"unknown role {role!r}, expected one of {sorted(ROLE_PERMISSIONS)}")
+    required = ROLE_PERMISSIONS[role]
+
     def decorator(f):
-        @wraps(f)
-        async def wrapper(*args, **kwargs):
-            # TODO: check role
-            return await f(*args, **kwargs)
-        return wrapper
+        return _guard(f, required)
     return decorator
 
 def hash_password(password):
@@ -44,19 +155,167 @@ def hash_password(password):
 def verify_password(password, hashed):
     return hash_password(password) == hashed
 
-# Session management (started, not finished)
-_sessions = {}
+# Session management
+# Sessions expire after SESSION_TTL_SECONDS and the store never holds more than
+# SESSION_MAX_COUNT of them. "memory" is per-process; "sqlite" shares sessions
+# across uvicorn workers through a table in SESSION_DB_PATH.
+
+
+class MemorySessionStore:
+    """in-process sessions with TTL expiry and a size cap
+
+    every session gets the same TTL, so creation order is expiry order: the OrderedDict
+    is the time-ordered eviction queue. expired entries are popped from the front and
+    the oldest is evicted when full, both O(1) per entry.
+    """
+
+    def __init__(self, ttl_seconds, max_sessions, clock=time.time):
+        self.ttl = ttl_seconds
+        self.max_sessions = max_sessions
+        self.clock = clock
+        self._sessions = OrderedDict()  # token -> (expires_at, session dict), oldest first
+        self._lock = threading.Lock()
+
+    def _purge_expired(self, now):
+        while self._sessions:
+            token, (expires_at, _) = next(iter(self._sessions.items()))
+            if expires_at > now:
+                break
+            self._sessions.popitem(last=False)
+
+    def create(self, token, session):
+        now = self.clock()
+        with self._lock:
+            self._purge_expired(now)
+            self._sessions[token] = (now + self.ttl, session)
+            while len(self._sessions) > self.max_sessions:
+                self._sessions.popitem(last=False)
+
+    def lookup(self, token):
+        """(session, expires_at) or None"""
+        with self._lock:
+            entry = self._sessions.get(token)
+            if entry is None:
+                return None
+            if entry[0] <= self.clock():
+                del self._sessions[token]
+                return None
+            return entry[1], entry[0]
+
+    def get(self, token):
+        found = self.lookup(token)
+        return found[0] if found else None
+
+    def delete(self, token):
+        with self._lock:
+            self._sessions.pop(token, None)
+
+    def __len__(self):
+        with self._lock:
+            self._purge_expired(self.clock())
+            return len(self._sessions)
+
+
+class SQLiteSessionStore:
+    """sessions in a sqlite table, so every worker process sees the same ones
+
+    expires_at is indexed: expiry is a range DELETE and lookups ignore expired rows.
+    one connection per thread (sqlite3 connections can't cross threads).
+
+    max_sessions is a soft cap: it's enforced by the sweep every PURGE_EVERY creates (counted
+    per process), so the table can run over by up to PURGE_EVERY - 1 per worker in between.
+    """
+
+    PURGE_EVERY = 100  # creates between expiry/cap sweeps
+
+    def __init__(self, path, ttl_seconds, max_sessions, clock=time.time):
+        self.path = path
+        self.ttl = ttl_seconds
+        self.max_sessions = max_sessions
+        self.clock = clock
+        self._local = threading.local()
+        self._creates = 0
+        self._creates_lock = threading.Lock()
+        conn = self._conn()
+        conn.execute(
+            "CREATE TABLE IF NOT EXISTS sessions ("
+            "token TEXT PRIMARY KEY, data TEXT NOT NULL, expires_at REAL NOT NULL)"
+        )
+        conn.execute("CREATE INDEX IF NOT EXISTS ix_sessions_expires_at ON sessions (expires_at)")
+        conn.commit()
+
+    def _conn(self):
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=5)
+            conn.execute("PRAGMA journal_mode=WAL")  # readers don't block the writer across workers
+            self._local.conn = conn
+        return conn
+
+    def create(self, token, session):
+        now = self.clock()
+        conn = self._conn()
+        with conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO sessions (token, data, expires_at) VALUES (?, ?, ?)",
+                [token, json.dumps(session, default=str), now + self.ttl],
+            )
+            with self._creates_lock:
+                self._creates += 1
+                sweep = self._creates % self.PURGE_EVERY == 0
+            if sweep:
+                conn.execute("DELETE FROM sessions WHERE expires_at <= ?", [now])
+                # over the cap: drop the sessions closest to expiry (= the oldest)
+                conn.execute(
+                    "DELETE FROM sessions WHERE token IN (SELECT token FROM sessions ORDER BY expires_at "
+                    "LIMIT max(0, (SELECT count(*) FROM sessions) - ?))",
+                    [self.max_sessions],
+                )
+
+    def lookup(self, token):
+        """(session, expires_at) or None"""
+        row = self._conn().execute(
+            "SELECT data, expires_at FROM sessions WHERE token = ? AND expires_at > ?", [token, self.clock()]
+        ).fetchone()
+        return (json.loads(row[0]), row[1]) if row else None
+
+    def get(self, token):
+        found = self.lookup(token)
+        return found[0] if found else None
+
+    def delete(self, token):
+        conn = self._conn()
+        with conn:
+            conn.execute("DELETE FROM sessions WHERE token = ?", [token])
+
+    def __len__(self):
+        return self._conn().execute(
+            "SELECT count(*) FROM sessions WHERE expires_at > ?", [self.clock()]
+        ).fetchone()[0]
+
+
+def make_session_store(backend=None):
+    backend = backend or config.SESSION_BACKEND
+    if backend == "sqlite":
+        return SQLiteSessionStore(config.SESSION_DB_PATH, config.SESSION_TTL_SECONDS, config.SESSION_MAX_COUNT)
+    return MemorySessionStore(config.SESSION_TTL_SECONDS, config.SESSION_MAX_COUNT)
+
+
+_sessions = make_session_store()
+
 
-def create_session(user_id):
+def create_session(user_id, role="viewer"):
     token = hashlib.sha256(os.urandom(32)).hexdigest()
-    _sessions[token] = {
+    _sessions.create(token, {
         "user_id": user_id,
-        "created_at": datetime.utcnow(),
-    }
+        "role": role,
+        "created_at": datetime.utcnow().isoformat(),
+    })
     return token
 
 def get_session(token):
     return _sessions.get(token)
 
 def delete_session(token):
-    _sessions.pop(token, None)
+    _sessions.delete(token)
+    _permission_cache.invalidate(token)
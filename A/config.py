@@ -19,6 +19,16 @@ ENABLE_TAGS = os.environ.get("ENABLE_TAGS", "false").lower() == "true"
 # (uses /labels endpoint, not /tags — see TAGS_MIGRATION_PLAN.md for details)
 ENABLE_EXPORT = os.environ.get("ENABLE_EXPORT", "false").lower() == "true"
 ENABLE_AUTH = os.environ.get("ENABLE_AUTH", "false").lower() == "true"
+
+# Sessions (see auth.py). "memory" is per-process; use "sqlite" with more than one worker.
+SESSION_BACKEND = os.environ.get("SESSION_BACKEND", "memory")
+SESSION_DB_PATH = os.environ.get("SESSION_DB", os.path.join(os.path.dirname(__file__), "sessions.db"))
+SESSION_TTL_SECONDS = int(os.environ.get("SESSION_TTL_SECONDS", str(8 * 3600)))
+SESSION_MAX_COUNT = int(os.environ.get("SESSION_MAX_COUNT", "100000"))  # soft cap with sqlite, see SQLiteSessionStore
+# per-process LRU of token -> permissions. entries never outlive their session, but a logout on another
+# worker is only seen once the entry expires: the TTL is the cross-worker logout window (0 = no caching)
+AUTH_CACHE_SIZE = int(os.environ.get("AUTH_CACHE_SIZE", "10000"))
+AUTH_CACHE_TTL_SECONDS = int(os.environ.get("AUTH_CACHE_TTL_SECONDS", "30"))
 ENABLE_METRICS_AGG = True  # always on, but the feature is half-built
 
 # Max results (not actually used anywhere yet)
@@ -2,6 +2,7 @@
 
 import json
 from datetime import datetime
+from math import fsum
 
 
 def fmt(d):
@@ -25,29 +26,36 @@ def do_thing(data, k=None):
         pass
 
 
+def _nums(items, field):
+    for i in items:
+        try:
+            v = getattr(i, field) if field else i
+            if v is not None:
+                yield float(v)
+        except:
+            pass
+
+
 def proc_data(items, field=None, op="avg"):
-    """process data for charts"""
+    """process data for charts
+
+    single pass with the builtins. for db rows use agg_metrics in utils/metrics.py instead,
+    that pushes the math into sqlite so the rows never get loaded.
+    """
     try:
         if not items:
             return 0
-        vals = []
-        for i in items:
-            try:
-                v = getattr(i, field) if field else i
-                if v is not None:
-                    vals.append(float(v))
-            except:
-                pass
+        vals = list(_nums(items, field))
         if not vals:
             return 0
         if op == "avg":
-            return sum(vals) / len(vals)
+            return fsum(vals) / len(vals)
         elif op == "max":
             return max(vals)
         elif op == "min":
             return min(vals)
         elif op == "sum":
-            return sum(vals)
+            return fsum(vals)
         return 0
     except:
         return 0
@@ -56,29 +56,55 @@ def serialize_tags_csv(tag_list):
     return ",".join(unique)
 
 
+MAX_TAG_LENGTH = 50
+
+
+def _normalize_tag(tag):
+    normalized = tag.strip().lower()
+    if not normalized:
+        raise ValueError("Tag cannot be empty")
+    if len(normalized) > MAX_TAG_LENGTH:
+        raise ValueError(f"Tag too long (max {MAX_TAG_LENGTH} chars)")
+    return normalized
+
+
 def add_tag_csv(existing_csv, new_tag):
     """Add a tag to an existing CSV string. Returns updated CSV string.
 
-    Raises ValueError if tag already exists or is invalid.
+    Raises ValueError if tag already exists or is invalid. For several edits at once
+    use apply_tag_ops, which this is a single-add wrapper around.
     """
-    tags = parse_tags_csv(existing_csv)
-    normalized = new_tag.strip().lower()
-    if not normalized:
-        raise ValueError("Tag cannot be empty")
-    if len(normalized) > 50:
-        raise ValueError("Tag too long (max 50 chars)")
-    if normalized in [t.lower() for t in tags]:
+    normalized = _normalize_tag(new_tag)
+    if normalized in {t.lower() for t in parse_tags_csv(existing_csv)}:
         raise ValueError(f"Tag '{normalized}' already exists")
-    tags.append(normalized)
-    return serialize_tags_csv(tags)
+    return apply_tag_ops(existing_csv, adds=[normalized])
 
 
 def remove_tag_csv(existing_csv, tag_to_remove):
-    """Remove a tag from a CSV string. Returns updated CSV string."""
-    tags = parse_tags_csv(existing_csv)
-    normalized = tag_to_remove.strip().lower()
-    tags = [t for t in tags if t.lower() != normalized]
-    return serialize_tags_csv(tags)
+    """Remove a tag from a CSV string. Returns updated CSV string (see apply_tag_ops)."""
+    return apply_tag_ops(existing_csv, removes=[tag_to_remove])
+
+
+def apply_tag_ops(existing_csv, adds=(), removes=()):
+    """Apply any number of tag adds and removes to a CSV string in one pass. Returns the new CSV.
+
+    The CSV is parsed once into an insertion-ordered dict (an ordered set), every operation
+    is an O(1) dict lookup, and the result is serialized once. Calling add_tag_csv/remove_tag_csv
+    once per edit re-parses every time, so N edits cost O(N * tags) instead of O(N + tags).
+
+    Semantics:
+      - tags are normalized like serialize_tags_csv (stripped, lowercased)
+      - adding a tag that is already present is a no-op (add_tag_csv raises instead)
+      - a tag in both adds and removes ends up removed
+      - an empty or too-long tag in adds raises ValueError and nothing is applied
+    """
+    normalized_adds = [_normalize_tag(t) for t in adds]  # validate everything before changing anything
+    tags = dict.fromkeys(t.lower() for t in parse_tags_csv(existing_csv))
+    for t in normalized_adds:
+        tags[t] = None
+    for t in removes:
+        tags.pop(t.strip().lower(), None)
+    return ",".join(tags)
 
 
 # --- Commented-out route handlers (to be enabled after migration) ---
@@ -0,0 +1,26 @@
+# shared fixtures for A's tests
+# run from A/:  python -m pytest tests
+
+import os
+import sys
+
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.pool import StaticPool
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+@pytest.fixture
+def tracker(monkeypatch):
+    """app.py pointed at an in-memory db with the tables created, so tracker.db is never touched"""
+    import app as tracker
+
+    original = tracker.engine
+    engine = create_engine("sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool)
+    tracker.Base.metadata.create_all(bind=engine)
+    monkeypatch.setattr(tracker, "engine", engine)
+    tracker.SessionLocal.configure(bind=engine)
+    yield tracker
+    tracker.SessionLocal.configure(bind=original)
+    engine.dispose()
@@ -10,3 +10,14 @@ def test_list():
     x = [1, 2, 3]
     x.append(4)
     assert len(x) == 4
+
+
+def test_ensure_tables_follows_engine_swap(tracker, monkeypatch):
+    from sqlalchemy import create_engine, inspect
+
+    tracker.ensure_tables()
+    other = create_engine("sqlite://")
+    monkeypatch.setattr(tracker, "engine", other)
+    tracker.ensure_tables()
+    assert "experiments" in inspect(other).get_table_names()
+    other.dispose()
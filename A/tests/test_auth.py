@@ -0,0 +1,97 @@
+# tests for the auth decorators on the api endpoints (ENABLE_AUTH on)
+
+import pytest
+from fastapi import FastAPI, Request
+from fastapi.testclient import TestClient
+
+import auth
+import config
+
+
+@pytest.fixture
+def client(tracker, monkeypatch):
+    monkeypatch.setattr(config, "ENABLE_AUTH", True)
+    auth._permission_cache.clear()
+    # no `with`: lifespan would create tables in the real tracker.db
+    return TestClient(tracker.app)
+
+
+def bearer(role):
+    return {"Authorization": f"Bearer {auth.create_session(1, role=role)}"}
+
+
+def test_no_session_is_401(client):
+    assert client.get("/api/experiments").status_code == 401
+    assert client.get("/api/experiments", headers={"Authorization": "Bearer nope"}).status_code == 401
+
+
+def test_wrong_role_is_403(client):
+    response = client.post("/api/experiments", json={"name": "x"}, headers=bearer("viewer"))
+    assert response.status_code == 403
+
+
+def test_allowed_role_is_200(client):
+    editor = bearer("editor")
+    created = client.post("/api/experiments", json={"name": "auth test"}, headers=editor)
+    assert created.status_code == 200
+    assert created.json()["name"] == "auth test"
+    response = client.get("/api/experiments", headers=bearer("viewer"))
+    assert response.status_code == 200
+    assert [e["name"] for e in response.json()] == ["auth test"]
+
+
+def test_session_cookie_works_too(client):
+    token = auth.create_session(1, role="viewer")
+    client.cookies.set("session", token)
+    assert client.get("/api/experiments").status_code == 200
+
+
+def test_logout_rejects_cached_session(client):
+    token = auth.create_session(1, role="viewer")
+    headers = {"Authorization": f"Bearer {token}"}
+    assert client.get("/api/experiments", headers=headers).status_code == 200
+    assert auth._permission_cache.get(token) is not None  # permissions are cached now
+    auth.delete_session(token)
+    assert auth._permission_cache.get(token) is None
+    assert client.get("/api/experiments", headers=headers).status_code == 401
+
+
+def test_auth_off_passes_through(client, monkeypatch):
+    monkeypatch.setattr(config, "ENABLE_AUTH", False)
+    assert client.get("/api/experiments").status_code == 200
+
+
+class Clock:
+    def __init__(self, now=1000.0):
+        self.now = now
+
+    def __call__(self):
+        return self.now
+
+
+def test_cached_permissions_end_with_the_session(monkeypatch):
+    clock = Clock()
+    monkeypatch.setattr(auth, "_sessions", auth.MemorySessionStore(10, 100, clock=clock))
+    monkeypatch.setattr(auth, "_permission_cache", auth.PermissionCache(100, 60, clock=clock))
+    token = auth.create_session(1, role="viewer")
+    assert auth.permissions_for(token) == auth.ROLE_PERMISSIONS["viewer"]
+    clock.now += 10  # session expired, cache ttl (60s) has not
+    assert auth._permission_cache.get(token) is None
+    assert auth.permissions_for(token) is None
+
+
+def test_sync_endpoint_behind_require_auth(monkeypatch):
+    monkeypatch.setattr(config, "ENABLE_AUTH", True)
+    auth._permission_cache.clear()
+    app = FastAPI()
+
+    @app.get("/whoami")
+    @auth.require_auth
+    def whoami(request: Request):
+        return {"ok": True}
+
+    client = TestClient(app)
+    assert client.get("/whoami").status_code == 401
+    response = client.get("/whoami", headers=bearer("viewer"))
+    assert response.status_code == 200
+    assert response.json() == {"ok": True}
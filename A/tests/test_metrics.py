@@ -0,0 +1,136 @@
+# tests for utils/metrics.py: the per-thread sqlite connection and the csv export
+
+import csv
+import io
+import json
+import sqlite3
+import threading
+
+import pytest
+from sqlalchemy import create_engine
+
+from utils import metrics
+
+
+@pytest.fixture
+def metrics_db(tmp_path, monkeypatch):
+    """metrics pointed at a throwaway db file instead of tracker.db"""
+    path = str(tmp_path / "metrics.db")
+    monkeypatch.setattr(metrics, "DB_FILE", path)
+    yield path
+    metrics.close_conn()
+
+
+def test_same_thread_reuses_connection(metrics_db):
+    conn = metrics.get_conn()
+    assert metrics.get_conn() is conn
+    conn.execute("SELECT 1")
+
+
+def test_each_thread_gets_its_own_connection(metrics_db):
+    main = metrics.get_conn()
+    seen = []
+
+    def worker():
+        conn = metrics.get_conn()
+        seen.append((conn, metrics.get_conn() is conn, conn.execute("SELECT 1").fetchone()))
+        metrics.close_conn()
+
+    threads = [threading.Thread(target=worker) for _ in range(2)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    assert [(same, row) for _, same, row in seen] == [(True, (1,))] * 2
+    assert len({id(main), *(id(conn) for conn, _, _ in seen)}) == 3
+
+
+def test_close_conn_then_reopen(metrics_db):
+    conn = metrics.get_conn()
+    metrics.close_conn()
+    with pytest.raises(sqlite3.ProgrammingError):
+        conn.execute("SELECT 1")  # really closed
+    reopened = metrics.get_conn()
+    assert reopened is not conn
+    assert reopened.execute("SELECT 1").fetchone() == (1,)
+    metrics.close_conn()
+    metrics.close_conn()  # closing twice is fine
+
+
+def test_changing_db_file_reopens(metrics_db, tmp_path, monkeypatch):
+    conn = metrics.get_conn()
+    monkeypatch.setattr(metrics, "DB_FILE", str(tmp_path / "other.db"))
+    assert metrics.get_conn() is not conn
+
+
+@pytest.fixture
+def runs_db(metrics_db):
+    """metrics_db with app.py's tables, and add(name, hyperparameters, notes) to insert runs of experiment 1"""
+    import app as tracker
+
+    engine = create_engine(f"sqlite:///{metrics_db}")
+    tracker.Base.metadata.create_all(bind=engine)
+    engine.dispose()
+    conn = sqlite3.connect(metrics_db)
+    conn.execute("INSERT INTO experiments (id, name, status) VALUES (1, 'exp', 'running')")
+
+    def add(name, hyperparameters, notes=""):
+        conn.execute(
+            "INSERT INTO runs (experiment_id, name, hyperparameters, accuracy, notes, status) VALUES (1, ?, ?, 0.5, ?, 'completed')",
+            [name, hyperparameters, notes],
+        )
+        conn.commit()
+
+    conn.commit()
+    yield add
+    conn.close()
+
+
+def parse(chunks):
+    return list(csv.DictReader(io.StringIO("".join(chunks))))
+
+
+def test_csv_header_flattens_hyperparameters(runs_db):
+    runs_db("a", json.dumps({"lr": 0.1, "layers": 2}))
+    runs_db("b", json.dumps({"lr": 0.2, "dropout": 0.5}))
+    text = "".join(metrics.stream_experiment_csv(1))
+    assert text.splitlines()[0].split(",") == metrics.RUN_CSV_COLUMNS + ["hp_dropout", "hp_layers", "hp_lr"]
+    a, b = parse([text])
+    assert (a["name"], a["hp_lr"], a["hp_layers"], a["hp_dropout"]) == ("a", "0.1", "2", "")
+    assert (b["name"], b["hp_lr"], b["hp_layers"], b["hp_dropout"]) == ("b", "0.2", "", "0.5")
+    assert a["accuracy"] == "0.5" and a["loss"] == ""  # None -> empty cell
+
+
+def test_csv_nested_values_are_json(runs_db):
+    runs_db("a", json.dumps({"sched": {"type": "cosine", "warmup": 10}, "sizes": [64, 128]}))
+    (row,) = parse(metrics.stream_experiment_csv(1))
+    assert json.loads(row["hp_sched"]) == {"type": "cosine", "warmup": 10}
+    assert json.loads(row["hp_sizes"]) == [64, 128]
+
+
+def test_csv_invalid_hyperparameters_are_empty(runs_db):
+    runs_db("good", json.dumps({"lr": 0.1}))
+    runs_db("broken", "{not json")
+    runs_db("list", "[1, 2]")
+    runs_db("empty", "")
+    rows = parse(metrics.stream_experiment_csv(1))
+    assert [(r["name"], r["hp_lr"]) for r in rows] == [("good", "0.1"), ("broken", ""), ("list", ""), ("empty", "")]
+
+
+def test_csv_quotes_commas_quotes_and_newlines(runs_db):
+    name = 'run, "quoted"'
+    notes = "line one\nline two, with comma"
+    runs_db(name, "{}", notes)
+    (row,) = parse(metrics.stream_experiment_csv(1))
+    assert (row["name"], row["notes"]) == (name, notes)
+
+
+def test_csv_chunks_and_export_match(runs_db, monkeypatch):
+    monkeypatch.setattr(metrics, "CSV_FLUSH_ROWS", 2)
+    for i in range(5):
+        runs_db(f"r{i}", json.dumps({"seed": i}))
+    chunks = list(metrics.stream_experiment_csv(1))
+    assert len(chunks) == 3
+    assert [r["hp_seed"] for r in parse(chunks)] == ["0", "1", "2", "3", "4"]
+    assert metrics.export_experiment(1, format="csv") == "".join(chunks)
+    assert metrics.export_experiment(2, format="csv") is None
@@ -0,0 +1,109 @@
+# tests for the session stores (auth.py): ttl expiry, the size cap, and the sqlite purge
+
+import sqlite3
+import threading
+
+import pytest
+
+from auth import MemorySessionStore, SQLiteSessionStore
+
+
+class Clock:
+    def __init__(self, now=1000.0):
+        self.now = now
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture(params=["memory", "sqlite"])
+def make_store(request, tmp_path):
+    def make(ttl=10, max_sessions=100, clock=None):
+        clock = clock or Clock()
+        if request.param == "memory":
+            return MemorySessionStore(ttl, max_sessions, clock=clock)
+        store = SQLiteSessionStore(str(tmp_path / "sessions.db"), ttl, max_sessions, clock=clock)
+        store.PURGE_EVERY = 1  # cap is enforced in the sweep, sweep on every create
+        return store
+    return make
+
+
+def test_session_expires_after_ttl(make_store):
+    clock = Clock()
+    store = make_store(ttl=10, clock=clock)
+    store.create("a", {"role": "viewer"})
+    clock.now += 9.9
+    assert store.get("a") == {"role": "viewer"}
+    clock.now += 0.1
+    assert store.get("a") is None
+    assert len(store) == 0
+
+
+def test_oldest_session_evicted_at_cap(make_store):
+    clock = Clock()
+    store = make_store(max_sessions=2, clock=clock)
+    for token in ["a", "b", "c"]:
+        store.create(token, {"role": "viewer"})
+        clock.now += 1
+    assert store.get("a") is None
+    assert store.get("b") is not None
+    assert store.get("c") is not None
+    assert len(store) == 2
+
+
+def test_delete(make_store):
+    store = make_store()
+    store.create("a", {"role": "viewer"})
+    store.delete("a")
+    assert store.get("a") is None
+
+
+def table_tokens(path):
+    conn = sqlite3.connect(path)
+    try:
+        return sorted(row[0] for row in conn.execute("SELECT token FROM sessions"))
+    finally:
+        conn.close()
+
+
+def test_sqlite_purge_removes_expired_rows(tmp_path):
+    clock = Clock()
+    path = str(tmp_path / "sessions.db")
+    store = SQLiteSessionStore(path, 10, 100, clock=clock)
+    store.PURGE_EVERY = 3
+    store.create("old-1", {})
+    store.create("old-2", {})
+    clock.now += 60  # both expired, still in the table until the next sweep
+    assert table_tokens(path) == ["old-1", "old-2"]
+    store.create("new", {})  # 3rd create -> sweep
+    assert table_tokens(path) == ["new"]
+
+
+def test_sqlite_cap_is_soft_between_sweeps(tmp_path):
+    clock = Clock()
+    path = str(tmp_path / "sessions.db")
+    store = SQLiteSessionStore(path, 10, 2, clock=clock)
+    store.PURGE_EVERY = 4
+    for i in range(3):
+        store.create(f"t{i}", {})
+        clock.now += 1
+    assert len(store) == 3  # over the cap until the next sweep
+    store.create("t3", {})
+    assert table_tokens(path) == ["t2", "t3"]
+
+
+def test_sqlite_create_counter_is_thread_safe(tmp_path):
+    store = SQLiteSessionStore(str(tmp_path / "sessions.db"), 10, 10_000, clock=Clock())
+    store.PURGE_EVERY = 10_000
+
+    def worker(n):
+        for i in range(50):
+            store.create(f"{n}-{i}", {})
+
+    threads = [threading.Thread(target=worker, args=(n,)) for n in range(8)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    assert store._creates == 400
+    assert len(store) == 400
@@ -0,0 +1,43 @@
+# tests for tags_v2.py: apply_tag_ops and the single-edit helpers built on it
+
+import pytest
+
+from tags_v2 import add_tag_csv, apply_tag_ops, parse_tags_csv, remove_tag_csv
+
+
+def test_batch_adds_and_removes():
+    result = apply_tag_ops("a,b,c", adds=["d", " E "], removes=["b", "c"])
+    assert result == "a,d,e"
+    assert parse_tags_csv(result) == ["a", "d", "e"]
+
+
+def test_duplicate_adds_are_noops():
+    assert apply_tag_ops("a,b", adds=["b", "B", "c", "c"]) == "a,b,c"
+    assert apply_tag_ops("A,a,b") == "a,b"  # existing duplicates collapse too
+
+
+def test_removing_missing_tag_is_noop():
+    assert apply_tag_ops("a,b", removes=["zzz", ""]) == "a,b"
+    assert apply_tag_ops("", removes=["a"]) == ""
+    assert apply_tag_ops(None, adds=["a"]) == "a"
+
+
+def test_add_and_remove_same_tag_ends_removed():
+    # removes run after adds, whatever order the caller lists them in
+    assert apply_tag_ops("a", adds=["b"], removes=["b"]) == "a"
+    assert apply_tag_ops("a,b", adds=["b", "c"], removes=["B"]) == "a,c"
+
+
+def test_invalid_add_applies_nothing():
+    with pytest.raises(ValueError, match="empty"):
+        apply_tag_ops("a", adds=["b", "  "], removes=["a"])
+    with pytest.raises(ValueError, match="too long"):
+        apply_tag_ops("a", adds=["x" * 51])
+
+
+def test_single_edit_helpers():
+    assert add_tag_csv("a,b", " C ") == "a,b,c"
+    with pytest.raises(ValueError, match="already exists"):
+        add_tag_csv("a,b", "B")
+    assert remove_tag_csv("a,b,c", " B ") == "a,c"
+    assert remove_tag_csv("a", "missing") == "a"
@@ -0,0 +1,88 @@
+# quick benchmark: per-request cost of require_auth on the hot read endpoints
+# run from A/:  python -m utils.bench_auth [requests]
+# points app.py at a throwaway db in a temp dir, doesn't touch tracker.db
+
+import asyncio
+import os
+import sys
+import tempfile
+import time
+
+from fastapi.testclient import TestClient
+
+
+def per_call_us(fn, calls):
+    start = time.perf_counter()
+    for _ in range(calls):
+        fn()
+    return (time.perf_counter() - start) / calls * 1e6
+
+
+def main():
+    requests = int(sys.argv[1]) if len(sys.argv) > 1 else 2000
+    tmp = tempfile.mkdtemp()
+    from sqlalchemy import create_engine
+
+    import app as tracker
+    import auth
+    import config
+
+    tracker.engine = create_engine(f"sqlite:///{os.path.join(tmp, 'bench.db')}", connect_args={"check_same_thread": False})
+    tracker.SessionLocal.configure(bind=tracker.engine)
+    tracker.Base.metadata.create_all(bind=tracker.engine)
+
+    token = auth.create_session(1, role="viewer")
+    headers = {"Authorization": f"Bearer {token}"}
+
+    # 1) the check itself: cache hit vs session store lookup
+    hit_us = per_call_us(lambda: auth.permissions_for(token), 100_000)
+
+    def miss():
+        auth._permission_cache.clear()
+        auth.permissions_for(token)
+    miss_us = per_call_us(miss, 20_000)
+
+    # 2) a decorated endpoint called directly, auth off vs on (no HTTP, no db)
+    class FakeRequest:
+        headers = {"authorization": f"Bearer {token}"}
+        cookies = {}
+
+    @auth.require_auth
+    async def endpoint():
+        return None
+
+    async def loop(n):
+        for _ in range(n):
+            await endpoint(request=FakeRequest())
+
+    def direct(enabled):
+        config.ENABLE_AUTH = enabled
+        start = time.perf_counter()
+        asyncio.run(loop(100_000))
+        return (time.perf_counter() - start) / 100_000 * 1e6
+
+    off_direct, on_direct = direct(False), direct(True)
+
+    # 3) real read endpoints over HTTP (TestClient), auth off vs on
+    client = TestClient(tracker.app)
+    exp_id = client.post("/api/experiments", json={"name": "bench"}).json().get("id", 1)
+    paths = ["/api/experiments", f"/api/experiments/{exp_id}"]
+    http = {}
+    for enabled in (False, True):
+        config.ENABLE_AUTH = enabled
+        for path in paths:
+            client.get(path, headers=headers)  # warm up
+            http[(path, enabled)] = per_call_us(lambda: client.get(path, headers=headers), requests)
+    config.ENABLE_AUTH = False
+
+    print(f"permissions_for, cache hit      {hit_us:8.2f} us")
+    print(f"permissions_for, cache miss     {miss_us:8.2f} us  (session store lookup)")
+    print(f"decorated endpoint, auth off    {off_direct:8.2f} us")
+    print(f"decorated endpoint, auth on     {on_direct:8.2f} us  (+{on_direct - off_direct:.2f} us)")
+    for path in paths:
+        off, on = http[(path, False)], http[(path, True)]
+        print(f"GET {path:<24} off {off:8.1f} us   on {on:8.1f} us   (+{on - off:.1f} us)")
+
+
+if __name__ == "__main__":
+    main()
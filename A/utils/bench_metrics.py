@@ -0,0 +1,68 @@
+# quick benchmark: per-call cost of the metrics helpers, fresh connection vs reused one
+# run from A/:  python -m utils.bench_metrics [calls]
+# uses a throwaway db in a temp dir, doesn't touch tracker.db
+
+import os
+import sqlite3
+import sys
+import tempfile
+import time
+
+from utils import metrics
+
+
+def make_db(path, runs=1000):
+    conn = sqlite3.connect(path)
+    conn.execute("CREATE TABLE runs (id INTEGER PRIMARY KEY, experiment_id INTEGER, name TEXT, "
+                 "accuracy REAL, loss REAL, latency_ms REAL, created_at TEXT)")
+    conn.execute("CREATE INDEX ix_runs_experiment ON runs (experiment_id)")
+    conn.executemany(
+        "INSERT INTO runs (experiment_id, name, accuracy, loss, latency_ms, created_at) "
+        "VALUES (?, ?, ?, ?, ?, datetime('now'))",
+        [(i % 10 + 1, f"run {i}", 0.5 + (i % 50) / 100, 1.0, 40.0 + i % 7) for i in range(runs)],
+    )
+    conn.commit()
+    conn.close()
+
+
+def per_call_us(fn, calls):
+    start = time.perf_counter()
+    for i in range(calls):
+        fn(i)
+    return (time.perf_counter() - start) / calls * 1e6
+
+
+def main():
+    calls = int(sys.argv[1]) if len(sys.argv) > 1 else 5000
+    with tempfile.TemporaryDirectory() as tmp:
+        metrics.DB_FILE = os.path.join(tmp, "bench.db")
+        make_db(metrics.DB_FILE)
+
+        def fresh(i):
+            # what every helper used to do: connect, one query, close
+            conn = sqlite3.connect(metrics.DB_FILE)
+            try:
+                conn.execute("SELECT COUNT(accuracy), AVG(accuracy), MIN(accuracy), MAX(accuracy) "
+                             "FROM runs WHERE experiment_id = ?", [i % 10 + 1]).fetchone()
+            finally:
+                conn.close()
+
+        def reused(i):
+            metrics.agg_metrics(i % 10 + 1)
+
+        def compare(i):
+            metrics.compare_runs_metrics([i % 1000 + 1, i % 1000 + 2])
+
+        fresh_us = per_call_us(fresh, calls)
+        reused_us = per_call_us(reused, calls)
+        compare_us = per_call_us(compare, calls)
+        metrics.close_conn()
+
+    print(f"{calls} calls each")
+    print(f"  fresh connection per call   {fresh_us:8.1f} us/call")
+    print(f"  agg_metrics (reused conn)   {reused_us:8.1f} us/call  ({fresh_us / reused_us:.1f}x faster)")
+    print(f"  compare_runs_metrics        {compare_us:8.1f} us/call")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,48 @@
+# quick microbenchmark: bulk tag edits with add_tag_csv/remove_tag_csv vs apply_tag_ops
+# run from A/:  python -m utils.bench_tags [existing_tags] [ops]
+
+import sys
+import time
+
+from tags_v2 import add_tag_csv, apply_tag_ops, parse_tags_csv, remove_tag_csv
+
+
+def old_way(csv_value, adds, removes):
+    # what the label routes would do today: one call (parse + rebuild) per edit
+    for t in adds:
+        try:
+            csv_value = add_tag_csv(csv_value, t)
+        except ValueError:
+            pass
+    for t in removes:
+        csv_value = remove_tag_csv(csv_value, t)
+    return csv_value
+
+
+def best_of(fn, repeat=5):
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = fn()
+        times.append(time.perf_counter() - start)
+    return min(times), result
+
+
+def main():
+    existing = int(sys.argv[1]) if len(sys.argv) > 1 else 200
+    ops = int(sys.argv[2]) if len(sys.argv) > 2 else 200
+    csv_value = ",".join(f"tag{i}" for i in range(existing))
+    adds = [f"new{i}" for i in range(ops)] + [f"tag{i}" for i in range(0, existing, 10)]
+    removes = [f"tag{i}" for i in range(0, existing, 3)]
+
+    old_s, old_result = best_of(lambda: old_way(csv_value, adds, removes))
+    new_s, new_result = best_of(lambda: apply_tag_ops(csv_value, adds, removes))
+    assert parse_tags_csv(old_result) == parse_tags_csv(new_result), "results differ"
+
+    print(f"{existing} existing tags, {len(adds)} adds, {len(removes)} removes")
+    print(f"  add_tag_csv/remove_tag_csv  {old_s * 1000:9.2f} ms")
+    print(f"  apply_tag_ops               {new_s * 1000:9.2f} ms  ({old_s / new_s:.0f}x faster)")
+
+
+if __name__ == "__main__":
+    main()
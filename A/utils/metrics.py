@@ -2,42 +2,71 @@
 # moved here from app.py during the "great refactor" of Q3 2024
 # some of this works, some doesn't. good luck.
 
+import csv
+import io
 import json
 import sqlite3
 import os
+import threading
 from datetime import datetime, timedelta
 
 # NOTE: this creates its own connection, doesn't use the SQLAlchemy session from app.py
 DB_FILE = os.path.join(os.path.dirname(os.path.dirname(__file__)), "tracker.db")
 
+# sqlite3 connections can't be shared across threads, so keep one per thread and reuse it.
+# the connection also caches prepared statements (keyed by SQL text), so keep the SQL strings stable.
+STATEMENT_CACHE_SIZE = 256
+_local = threading.local()
+
 def get_conn():
-    return sqlite3.connect(DB_FILE)
+    """this thread's connection to DB_FILE, opened on first use. don't close it, use close_conn()"""
+    conn = getattr(_local, "conn", None)
+    if conn is None or _local.db_file != DB_FILE:
+        if conn is not None:
+            conn.close()  # DB_FILE was changed (tests do this)
+        conn = sqlite3.connect(DB_FILE, cached_statements=STATEMENT_CACHE_SIZE)
+        _local.conn = conn
+        _local.db_file = DB_FILE
+    return conn
+
+def close_conn():
+    """close this thread's connection (next get_conn() opens a new one)"""
+    conn = getattr(_local, "conn", None)
+    if conn is not None:
+        conn.close()
+        _local.conn = None
+
+METRIC_COLUMNS = ("accuracy", "loss", "latency_ms")
 
 def agg_metrics(experiment_id, metric="accuracy", window_days=None):
-    """aggregate metrics for an experiment, optionally within a time window"""
+    """aggregate metrics for an experiment, optionally within a time window
+
+    the aggregates run in sqlite (one row back), not over a python list of every run.
+    B's shared/aggregation.py is the full version (several metrics, grouping, percentiles).
+    """
+    if metric not in METRIC_COLUMNS:
+        return None  # column name goes into the SQL string, so only known columns
     conn = get_conn()
     try:
-        query = f"SELECT {metric} FROM runs WHERE experiment_id = ?"
+        query = f"SELECT COUNT({metric}), AVG({metric}), MIN({metric}), MAX({metric}) FROM runs WHERE experiment_id = ?"
         params = [experiment_id]
         if window_days:
-            cutoff = (datetime.utcnow() - timedelta(days=window_days)).isoformat()
+            # created_at is stored as "YYYY-MM-DD HH:MM:SS", so compare with the same separator
+            cutoff = (datetime.utcnow() - timedelta(days=window_days)).isoformat(sep=" ")
             query += " AND created_at > ?"
             params.append(cutoff)
-        cursor = conn.execute(query, params)
-        values = [row[0] for row in cursor.fetchall() if row[0] is not None]
-        if not values:
+        count, mean, lo, hi = conn.execute(query, params).fetchone()
+        if not count:
             return None
         return {
-            "count": len(values),
-            "mean": sum(values) / len(values),
-            "min": min(values),
-            "max": max(values),
-            "range": max(values) - min(values),
+            "count": count,
+            "mean": mean,
+            "min": lo,
+            "max": hi,
+            "range": hi - lo,
         }
     except:
         return None
-    finally:
-        conn.close()
 
 def compare_runs_metrics(run_ids):
     """compare metrics across specific runs"""
@@ -58,8 +87,6 @@ def compare_runs_metrics(run_ids):
         return results
     except:
         return []
-    finally:
-        conn.close()
 
 # Tag-related functions that were started but never finished
 # These use raw SQL and a "tags" table that doesn't exist in the schema
@@ -74,8 +101,6 @@ def get_tags(experiment_id):
         return [row[0] for row in cursor.fetchall()]
     except:
         return []  # table probably doesn't exist
-    finally:
-        conn.close()
 
 def add_tag(experiment_id, tag):
     """add a tag to an experiment"""
@@ -88,9 +113,8 @@ def add_tag(experiment_id, tag):
         conn.commit()
         return True
     except:
+        conn.rollback()
         return False  # table probably doesn't exist
-    finally:
-        conn.close()
 
 # ============================================================
 # Metric tags - for categorizing metric types (NOT experiment tags)
@@ -143,9 +167,8 @@ def add_metric_tag(experiment_id, metric_name, category="primary"):
         conn.commit()
         return True
     except:
+        conn.rollback()
         return False  # table probably doesn't exist yet
-    finally:
-        conn.close()
 
 
 def get_metric_tags(experiment_id):
@@ -168,13 +191,11 @@ def get_metric_tags(experiment_id):
         ]
     except:
         return []  # table probably doesn't exist yet
-    finally:
-        conn.close()
 
 
 # Export function that was requested but never properly integrated
 def export_experiment(experiment_id, format="json"):
-    """export experiment data - only json works, csv is broken"""
+    """export experiment data as a json or csv string. for big exports use stream_experiment_csv"""
     conn = get_conn()
     try:
         cursor = conn.execute(
@@ -183,30 +204,85 @@ def export_experiment(experiment_id, format="json"):
         exp = cursor.fetchone()
         if not exp:
             return None
-        runs_cursor = conn.execute(
-            "SELECT * FROM runs WHERE experiment_id = ?", [experiment_id]
-        )
-        runs = runs_cursor.fetchall()
         if format == "json":
+            runs_cursor = conn.execute(
+                "SELECT * FROM runs WHERE experiment_id = ?", [experiment_id]
+            )
+            runs = runs_cursor.fetchall()
             return json.dumps({"experiment": exp, "runs": [list(r) for r in runs]})
         elif format == "csv":
-            # TODO: implement CSV export
-            raise NotImplementedError("csv export not implemented yet")
+            return "".join(stream_experiment_csv(experiment_id))
         else:
             return None
     except:
         return None
+
+
+RUN_CSV_COLUMNS = ["id", "experiment_id", "name", "accuracy", "loss", "latency_ms", "status", "notes", "created_at"]
+CSV_FLUSH_ROWS = 1000  # rows per yielded chunk
+
+
+def _parse_hp(hp_string):
+    try:
+        hp = json.loads(hp_string) if hp_string else {}
+    except (TypeError, ValueError):
+        return {}
+    return hp if isinstance(hp, dict) else {}
+
+
+def stream_experiment_csv(experiment_id):
+    """yield an experiment's runs as csv text chunks, hyperparameters flattened into hp_<key> columns
+
+    two passes over the runs: the first only collects hyperparameter keys (the header needs them),
+    the second writes rows. memory is the key set plus one chunk, not the whole export.
+    uses its own connection: a streaming response may pull chunks from different threads.
+    """
+    conn = sqlite3.connect(DB_FILE, check_same_thread=False)
+    try:
+        hp_keys = set()
+        for (hp_string,) in conn.execute("SELECT hyperparameters FROM runs WHERE experiment_id = ?", [experiment_id]):
+            hp_keys.update(_parse_hp(hp_string))
+        hp_keys = sorted(hp_keys)
+        columns = RUN_CSV_COLUMNS + [f"hp_{k}" for k in hp_keys]
+
+        def rows():
+            cursor = conn.execute(
+                f"SELECT {', '.join(RUN_CSV_COLUMNS)}, hyperparameters FROM runs WHERE experiment_id = ? ORDER BY id",
+                [experiment_id],
+            )
+            for r in cursor:
+                row = dict(zip(RUN_CSV_COLUMNS, r))
+                hp = _parse_hp(r[-1])
+                for k in hp_keys:
+                    v = hp.get(k)
+                    row[f"hp_{k}"] = json.dumps(v) if isinstance(v, (dict, list)) else v
+                yield row
+
+        yield from iter_csv(rows(), columns)
     finally:
         conn.close()
 
 
-def build_csv(rows, columns):
-    """build a csv string from data"""
-    out = ",".join(columns) + "\n"
+def iter_csv(rows, columns):
+    """yield csv text in chunks of CSV_FLUSH_ROWS lines. rows are dicts; missing or None -> empty field
+
+    the csv module does the quoting, so commas/quotes/newlines in names and notes survive.
+    """
+    buf = io.StringIO()
+    writer = csv.writer(buf, lineterminator="\n")
+    writer.writerow(columns)
+    pending = 0
     for row in rows:
-        vals = []
-        for c in columns:
-            v = row.get(c, "")
-            vals.append(str(v) if v is not None else "")
-        out += ",".join(vals) + "\n"
-    return out
+        writer.writerow(["" if row.get(c) is None else row.get(c) for c in columns])
+        pending += 1
+        if pending == CSV_FLUSH_ROWS:
+            yield buf.getvalue()
+            buf.seek(0)
+            buf.truncate()
+            pending = 0
+    yield buf.getvalue()
+
+
+def build_csv(rows, columns):
+    """build a csv string from data (linear: chunks are joined once, not concatenated per row)"""
+    return "".join(iter_csv(rows, columns))
@@ -0,0 +1,3 @@
+# benchmarks/ package
+# Performance suite: synthetic databases, pytest-benchmark timings, and an HTTP load driver.
+# Not collected by the default `pytest` run (testpaths = tests); run with `pytest benchmarks`.
@@ -0,0 +1,35 @@
+# benchmarks/conftest.py
+# Fixtures for the pytest-benchmark suite: one synthetic database and client per data scale.
+# Why: Timings are only comparable when every run uses the same generated data shape.
+# Relevant files: benchmarks/scenarios.py, benchmarks/test_endpoints.py
+
+import pytest
+from fastapi.testclient import TestClient
+
+from benchmarks.scenarios import working_copy
+
+
+def pytest_addoption(parser):
+    parser.addoption(
+        "--bench-scales",
+        default="1000",
+        help="Comma-separated total run counts to benchmark at (e.g. 1000,100000,1000000)",
+    )
+
+
+def pytest_generate_tests(metafunc):
+    if "scale" in metafunc.fixturenames:
+        scales = [int(s) for s in metafunc.config.getoption("--bench-scales").split(",")]
+        metafunc.parametrize("scale", scales, ids=[f"{s}runs" for s in scales], scope="session")
+
+
+@pytest.fixture(name="bench_client", scope="session")
+def fixture_bench_client(scale, tmp_path_factory):
+    """A TestClient over a private copy of the synthetic database for this scale."""
+    from benchmarks.scenarios import make_app
+
+    db_path = working_copy(scale, str(tmp_path_factory.mktemp(f"bench-{scale}")))
+    app, engine = make_app(db_path)
+    with TestClient(app) as client:
+        yield client
+    engine.dispose()
@@ -0,0 +1,115 @@
+# benchmarks/gate.py
+# Performance regression gate: fixed scenario run compared against a committed baseline.
+# Why: An O(1) query turning into N+1 passes ruff and pytest; this catches it in `manage.py bench` (or `check --bench`).
+# Relevant files: manage.py (bench, check), benchmarks/baseline.json, benchmarks/scenarios.py
+
+import json
+import os
+import statistics
+import tempfile
+import time
+import tracemalloc
+
+from fastapi.testclient import TestClient
+
+from benchmarks.scenarios import HOT_EXPERIMENTS, SCENARIOS, experiment_count, make_app, working_copy
+from shared.instrumentation import registry
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+BASELINE_PATH = os.path.join(BENCH_DIR, "baseline.json")
+RESULTS_PATH = os.path.join(BENCH_DIR, "results", "latest.json")
+
+# Fixed scenario: enough experiments that per-experiment queries (N+1) show up in the SQL counts.
+BENCH_RUNS = 2000
+BENCH_RUNS_PER_EXP = 100
+BENCH_REQUESTS = 20
+WARMUP_REQUESTS = 2
+
+# Used when the baseline file has no "tolerances" block. Floors keep tiny numbers from flapping.
+DEFAULT_TOLERANCES = {
+    "latency_pct": 100.0,
+    "latency_floor_ms": 20.0,
+    "sql_queries": 0,
+    "memory_pct": 50.0,
+    "memory_floor_kb": 512.0,
+}
+
+
+def run_bench(requests: int = BENCH_REQUESTS) -> dict:
+    """Run every scenario sequentially; return per-endpoint median/p95 latency, SQL count, and peak memory."""
+    experiments = min(HOT_EXPERIMENTS, experiment_count(BENCH_RUNS, BENCH_RUNS_PER_EXP))
+    results = {}
+    with tempfile.TemporaryDirectory() as tmp:
+        app, engine = make_app(working_copy(BENCH_RUNS, tmp, BENCH_RUNS_PER_EXP))
+        with TestClient(app) as client:
+            for scenario in SCENARIOS:
+
+                def request(i):
+                    response = client.request(scenario.method, scenario.url(i % experiments + 1), json=scenario.body)
+                    assert response.status_code < 400, f"{scenario.name}: HTTP {response.status_code}"
+
+                for i in range(WARMUP_REQUESTS):
+                    request(i)
+
+                registry.reset()
+                latencies = []
+                for i in range(requests):
+                    start = time.perf_counter()
+                    request(i)
+                    latencies.append((time.perf_counter() - start) * 1000)
+                sql_statements = sum(registry.sql_statements.values())
+
+                # Memory is measured on a separate request: tracemalloc would skew the timings.
+                tracemalloc.start()
+                try:
+                    request(0)
+                    peak = tracemalloc.get_traced_memory()[1]
+                finally:
+                    tracemalloc.stop()
+
+                latencies.sort()
+                results[scenario.name] = {
+                    "p50_ms": round(statistics.median(latencies), 3),
+                    "p95_ms": round(latencies[min(len(latencies) - 1, int(len(latencies) * 0.95))], 3),
+                    "sql_queries": round(sql_statements / requests, 2),
+                    "peak_memory_kb": round(peak / 1024, 1),
+                }
+        engine.dispose()
+    return {"runs": BENCH_RUNS, "runs_per_experiment": BENCH_RUNS_PER_EXP, "requests": requests, "scenarios": results}
+
+
+def compare(baseline: dict, current: dict, tolerances: dict) -> list[str]:
+    """Return one message per metric that exceeds its baseline by more than the tolerance."""
+    failures = []
+    for name, cur in current["scenarios"].items():
+        base = baseline.get("scenarios", {}).get(name)
+        if base is None:
+            continue
+        latency_limit = max(
+            base["p50_ms"] * (1 + tolerances["latency_pct"] / 100),
+            base["p50_ms"] + tolerances["latency_floor_ms"],
+        )
+        if cur["p50_ms"] > latency_limit:
+            failures.append(f"{name}: p50 {cur['p50_ms']:.1f}ms > limit {latency_limit:.1f}ms (baseline {base['p50_ms']:.1f}ms)")
+        sql_limit = base["sql_queries"] + tolerances["sql_queries"]
+        if cur["sql_queries"] > sql_limit:
+            failures.append(f"{name}: {cur['sql_queries']:g} SQL queries/request > limit {sql_limit:g}")
+        memory_limit = max(
+            base["peak_memory_kb"] * (1 + tolerances["memory_pct"] / 100),
+            base["peak_memory_kb"] + tolerances["memory_floor_kb"],
+        )
+        if cur["peak_memory_kb"] > memory_limit:
+            failures.append(f"{name}: peak memory {cur['peak_memory_kb']:.0f}KB > limit {memory_limit:.0f}KB")
+    return failures
+
+
+def load_json(path: str) -> dict:
+    with open(path) as f:
+        return json.load(f)
+
+
+def save_json(path: str, data: dict):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, "w") as f:
+        json.dump(data, f, indent=2, sort_keys=True)
+        f.write("\n")
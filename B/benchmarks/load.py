@@ -0,0 +1,152 @@
+# benchmarks/load.py
+# HTTP load driver: concurrent requests per scenario, latency percentiles and SQL counts, JSON report + diff.
+# Why: pytest-benchmark times single requests; this shows behavior under concurrency and at 10^5-10^6 runs.
+# Relevant files: benchmarks/scenarios.py, shared/instrumentation.py
+#
+# Usage (from B/):
+#   python -m benchmarks.load --runs 100000 --requests 100 --concurrency 8 --out load-1e5.json
+#   python -m benchmarks.load --runs 100000 --baseline load-1e5.json        # diff against an earlier report
+#   python -m benchmarks.load --url http://localhost:8000 --runs 100000     # hit a running server instead
+
+import argparse
+import asyncio
+import json
+import platform
+import statistics
+import sys
+import tempfile
+import time
+from datetime import datetime
+
+import httpx
+
+from benchmarks.scenarios import HOT_EXPERIMENTS, SCENARIOS_BY_NAME, experiment_count, make_app, working_copy
+from shared.instrumentation import registry
+
+
+def percentile(sorted_values: list, pct: float) -> float:
+    """Nearest-rank percentile of an already sorted list."""
+    if not sorted_values:
+        return 0.0
+    index = max(0, min(len(sorted_values) - 1, round(pct / 100 * len(sorted_values) + 0.5) - 1))
+    return sorted_values[index]
+
+
+async def run_scenario(client: httpx.AsyncClient, scenario, total_runs: int, requests: int, concurrency: int) -> dict:
+    """Issue `requests` requests with at most `concurrency` in flight; return latency/throughput stats."""
+    experiments = min(HOT_EXPERIMENTS, experiment_count(total_runs))
+    semaphore = asyncio.Semaphore(concurrency)
+    latencies = []
+    errors = 0
+
+    async def one(i: int):
+        nonlocal errors
+        async with semaphore:
+            start = time.perf_counter()
+            response = await client.request(scenario.method, scenario.url(i % experiments + 1), json=scenario.body)
+            latencies.append(time.perf_counter() - start)
+            if response.status_code >= 400:
+                errors += 1
+
+    registry.reset()
+    wall_start = time.perf_counter()
+    await asyncio.gather(*(one(i) for i in range(requests)))
+    wall = time.perf_counter() - wall_start
+    latencies.sort()
+    sql_statements = sum(registry.sql_statements.values())
+    return {
+        "requests": requests,
+        "errors": errors,
+        "throughput_rps": round(requests / wall, 2),
+        "mean_ms": round(statistics.fmean(latencies) * 1000, 3),
+        "p50_ms": round(percentile(latencies, 50) * 1000, 3),
+        "p95_ms": round(percentile(latencies, 95) * 1000, 3),
+        "p99_ms": round(percentile(latencies, 99) * 1000, 3),
+        "max_ms": round(latencies[-1] * 1000, 3),
+        # Only known in-process; a remote server's SQL isn't visible from here.
+        "sql_per_request": round(sql_statements / requests, 2) if sql_statements else None,
+    }
+
+
+async def run_load(total_runs: int, scenarios: list, requests: int, concurrency: int, url: str = None) -> dict:
+    """Run every scenario in turn and return the full report dict."""
+    engine = None
+    with tempfile.TemporaryDirectory() as tmp:
+        if url:
+            transport, base_url = None, url
+        else:
+            app, engine = make_app(working_copy(total_runs, tmp))
+            transport, base_url = httpx.ASGITransport(app=app), "http://bench"
+        results = {}
+        async with httpx.AsyncClient(transport=transport, base_url=base_url, timeout=None) as client:
+            for scenario in scenarios:
+                print(f"  {scenario.name:<14} ", end="", flush=True)
+                results[scenario.name] = await run_scenario(client, scenario, total_runs, requests, concurrency)
+                r = results[scenario.name]
+                print(f"p50 {r['p50_ms']:9.1f}ms  p95 {r['p95_ms']:9.1f}ms  {r['throughput_rps']:8.1f} req/s")
+        if engine is not None:
+            engine.dispose()
+    return {
+        "generated_at": datetime.utcnow().isoformat(),
+        "python": platform.python_version(),
+        "machine": platform.machine(),
+        "total_runs": total_runs,
+        "requests": requests,
+        "concurrency": concurrency,
+        "target": url or "in-process",
+        "scenarios": results,
+    }
+
+
+def _change(old, new) -> str:
+    if old is None or new is None:
+        return f"{old} -> {new}"
+    pct = f" ({(new - old) / old * 100:+.0f}%)" if old else ""
+    return f"{old:.1f} -> {new:.1f}{pct}"
+
+
+def diff_reports(baseline: dict, current: dict) -> list[str]:
+    """Human-readable per-scenario comparison of p50/p95/throughput/SQL between two reports."""
+    keys = ["p50_ms", "p95_ms", "throughput_rps", "sql_per_request"]
+    lines = [f"{'scenario':<14}" + "".join(f"{key:<28}" for key in keys)]
+    for name, cur in current["scenarios"].items():
+        base = baseline.get("scenarios", {}).get(name)
+        if base is None:
+            lines.append(f"{name:<14}(not in baseline)")
+            continue
+        lines.append(f"{name:<14}" + "".join(f"{_change(base.get(key), cur.get(key)):<28}" for key in keys))
+    return lines
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m benchmarks.load", description="HTTP load driver")
+    parser.add_argument("--runs", type=int, default=1000, help="Total runs in the synthetic database (default 1000)")
+    parser.add_argument("--requests", type=int, default=50, help="Requests per scenario (default 50)")
+    parser.add_argument("--concurrency", type=int, default=4, help="Requests in flight (default 4)")
+    parser.add_argument("--scenarios", default=",".join(SCENARIOS_BY_NAME), help="Comma-separated scenario names")
+    parser.add_argument("--url", default=None, help="Target a running server instead of an in-process app")
+    parser.add_argument("--out", default=None, help="Write the JSON report here")
+    parser.add_argument("--baseline", default=None, help="Earlier JSON report to diff against")
+    args = parser.parse_args(argv)
+
+    unknown = [n for n in args.scenarios.split(",") if n not in SCENARIOS_BY_NAME]
+    if unknown:
+        print(f"Unknown scenario(s): {', '.join(unknown)}. Available: {', '.join(SCENARIOS_BY_NAME)}")
+        sys.exit(1)
+    scenarios = [SCENARIOS_BY_NAME[n] for n in args.scenarios.split(",")]
+
+    print(f"Load test: {args.runs} runs, {args.requests} requests/scenario, concurrency {args.concurrency}")
+    report = asyncio.run(run_load(args.runs, scenarios, args.requests, args.concurrency, args.url))
+    if args.out:
+        with open(args.out, "w") as f:
+            json.dump(report, f, indent=2)
+        print(f"Report written to {args.out}")
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+        print()
+        print("\n".join(diff_reports(baseline, report)))
+
+
+if __name__ == "__main__":
+    main()
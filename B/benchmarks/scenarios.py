@@ -0,0 +1,113 @@
+# benchmarks/scenarios.py
+# Benchmark scenarios (the endpoints we time) and synthetic database setup shared by every driver.
+# Why: pytest-benchmark and the load driver must hit the same paths against the same data shapes.
+# Relevant files: benchmarks/conftest.py, benchmarks/load.py, shared/synthetic.py, manage.py
+
+import os
+import shutil
+from dataclasses import dataclass
+from typing import Optional
+
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+# Import all models so Base.metadata knows about them before create_all()
+import experiments.models  # noqa: F401
+import exports.models  # noqa: F401
+import runs.models  # noqa: F401
+import tags.models  # noqa: F401
+from shared.base import Base
+from shared.db import get_db
+from shared.instrumentation import instrument_engine
+from shared.synthetic import generate
+
+DATA_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), ".data")
+RUNS_PER_EXPERIMENT = 1000
+TAGS_PER_EXPERIMENT = 5
+# Requests rotate over this many experiments so per-key caches don't turn every request into a hit.
+HOT_EXPERIMENTS = 10
+
+
+@dataclass(frozen=True)
+class Scenario:
+    name: str
+    method: str
+    path: str
+    body: Optional[dict] = None
+
+    def url(self, experiment_id: int) -> str:
+        return self.path.format(experiment_id=experiment_id)
+
+
+SCENARIOS = [
+    Scenario("dashboard", "GET", "/"),
+    Scenario("list", "GET", "/api/experiments"),
+    Scenario("detail_api", "GET", "/api/experiments/{experiment_id}"),
+    Scenario("detail_page", "GET", "/experiments/{experiment_id}"),
+    Scenario("compare_page", "GET", "/experiments/{experiment_id}/compare"),
+    Scenario("distribution", "GET", "/api/experiments/{experiment_id}/distribution?metric=latency_ms"),
+    Scenario("trends", "GET", "/api/experiments/{experiment_id}/trends?metric=accuracy&days=90"),
+    Scenario(
+        "ingest",
+        "POST",
+        "/api/experiments/{experiment_id}/runs",
+        {"name": "bench", "hyperparameters": {"learning_rate": 1e-4}, "accuracy": 0.9, "loss": 0.2, "latency_ms": 40.0},
+    ),
+    Scenario("export_csv", "POST", "/api/experiments/{experiment_id}/export", {"format": "csv"}),
+]
+
+SCENARIOS_BY_NAME = {s.name: s for s in SCENARIOS}
+
+
+def experiment_count(total_runs: int, runs_per_exp: int = RUNS_PER_EXPERIMENT) -> int:
+    return max(1, total_runs // runs_per_exp)
+
+
+def ensure_database(total_runs: int, runs_per_exp: int = RUNS_PER_EXPERIMENT) -> str:
+    """Return the path of a cached synthetic database with `total_runs` runs, generating it on first use."""
+    os.makedirs(DATA_DIR, exist_ok=True)
+    path = os.path.join(DATA_DIR, f"runs-{total_runs}-{runs_per_exp}.db")
+    if not os.path.exists(path):
+        tmp_path = path + ".tmp"
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        engine = create_engine(f"sqlite:///{tmp_path}")
+        Base.metadata.create_all(bind=engine)
+        generate(
+            engine,
+            experiment_count(total_runs, runs_per_exp),
+            min(total_runs, runs_per_exp),
+            TAGS_PER_EXPERIMENT,
+            seed=total_runs,
+        )
+        engine.dispose()
+        os.replace(tmp_path, path)
+    return path
+
+
+def working_copy(total_runs: int, directory: str, runs_per_exp: int = RUNS_PER_EXPERIMENT) -> str:
+    """Copy the cached database into `directory` so ingest/export runs never mutate the cached copy."""
+    path = os.path.join(directory, f"runs-{total_runs}-{runs_per_exp}.db")
+    shutil.copyfile(ensure_database(total_runs, runs_per_exp), path)
+    return path
+
+
+def make_app(db_path: str):
+    """Build the real app with get_db pointed at `db_path`. Returns (app, engine)."""
+    from manage import create_app
+
+    engine = create_engine(f"sqlite:///{db_path}", connect_args={"check_same_thread": False})
+    instrument_engine(engine, slow_log=False)
+    Base.metadata.create_all(bind=engine)
+    BenchSession = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+
+    def override_get_db():
+        db = BenchSession()
+        try:
+            yield db
+        finally:
+            db.close()
+
+    app = create_app()
+    app.dependency_overrides[get_db] = override_get_db
+    return app, engine
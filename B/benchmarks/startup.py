@@ -0,0 +1,103 @@
+# benchmarks/startup.py
+# Cold-start profile: fresh interpreters timed from first import to a started app, with -X importtime.
+# Why: Every worker restart and every test session pays startup; this shows where it goes.
+# Relevant files: manage.py (startup-profile, create_app), shared/config.py (STARTUP_TARGET_MS)
+
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+
+from shared.config import BASE_DIR
+
+# Runs in a fresh interpreter; prints phase timings (ms) as JSON on its last stdout line.
+_PROBE = """
+import time
+t0 = time.perf_counter()
+import manage
+t1 = time.perf_counter()
+app = manage.create_app()
+t2 = time.perf_counter()
+import asyncio
+async def _startup():
+    async with app.router.lifespan_context(app):
+        pass
+asyncio.run(_startup())
+t3 = time.perf_counter()
+import json
+print(json.dumps({"import": (t1 - t0) * 1000, "create_app": (t2 - t1) * 1000, "startup": (t3 - t2) * 1000}))
+"""
+
+PHASES = ("import", "create_app", "startup")
+# Modules whose own packages are grouped under one name in the breakdown.
+APP_PACKAGES = {"manage", "shared", "experiments", "runs", "tags", "exports"}
+
+
+def parse_importtime(stderr: str) -> list[dict]:
+    """Parse `-X importtime` output into [{"module", "self_us", "cumulative_us", "depth"}] in import order."""
+    modules = []
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_us, cumulative_us, name = line[len("import time:"):].split("|", 2)
+        modules.append(
+            {
+                "module": name.strip(),
+                "self_us": int(self_us),
+                "cumulative_us": int(cumulative_us),
+                "depth": (len(name) - len(name.lstrip())) // 2,
+            }
+        )
+    return modules
+
+
+def group_by_package(modules: list[dict]) -> dict:
+    """Sum self time per top-level package (the app's own packages collapse into "app"), slowest first."""
+    totals = {}
+    for m in modules:
+        top = m["module"].split(".")[0]
+        key = "app" if top in APP_PACKAGES else top
+        totals[key] = totals.get(key, 0) + m["self_us"]
+    return dict(sorted(totals.items(), key=lambda item: item[1], reverse=True))
+
+
+def _probe(database_url: str, importtime: bool = False) -> tuple[dict, str]:
+    env = {**os.environ, "TRACKER_DATABASE_URL": database_url}
+    flags = ["-X", "importtime"] if importtime else []
+    result = subprocess.run(
+        [sys.executable, *flags, "-c", _PROBE],
+        cwd=BASE_DIR,
+        env=env,
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    return json.loads(result.stdout.strip().splitlines()[-1]), result.stderr
+
+
+def profile_startup(runs: int = 3) -> dict:
+    """Time `runs` cold starts against a fresh database, then break down imports in one more run.
+
+    Each run is a new interpreter (bytecode caches stay warm, as on a worker restart).
+    `-X importtime` slows imports noticeably, so it is only on for the breakdown run.
+    Reported phase times are medians; the total is the median of per-run totals.
+    """
+    with tempfile.TemporaryDirectory() as tmp:
+        # A new database per run so the schema check does real work, as on first deploy.
+        urls = [f"sqlite:///{os.path.join(tmp, f'startup-{i}.db')}" for i in range(runs + 1)]
+        samples = [_probe(url)[0] for url in urls[:runs]]
+        _, stderr = _probe(urls[-1], importtime=True)
+    modules = parse_importtime(stderr)
+    return {
+        "runs": runs,
+        "phases_ms": {p: statistics.median(s[p] for s in samples) for p in PHASES},
+        "total_ms": statistics.median(sum(s[p] for p in PHASES) for s in samples),
+        "packages_ms": {name: us / 1000 for name, us in group_by_package(modules).items()},
+        "slowest_imports_ms": [
+            {"module": m["module"], "cumulative_ms": m["cumulative_us"] / 1000}
+            for m in sorted(modules, key=lambda m: m["cumulative_us"], reverse=True)
+            if m["depth"] <= 1
+        ][:10],
+    }
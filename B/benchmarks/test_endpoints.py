@@ -0,0 +1,26 @@
+# benchmarks/test_endpoints.py
+# pytest-benchmark timings for the dashboard, list, detail, compare, ingest, and export paths.
+# Why: Gives a per-endpoint baseline at each data scale to diff changes against.
+# Relevant files: benchmarks/scenarios.py, benchmarks/conftest.py
+#
+# Usage:
+#   pytest benchmarks --bench-scales=1000,100000 --benchmark-json=bench.json
+#   pytest benchmarks --benchmark-compare       (after an earlier --benchmark-autosave)
+
+import pytest
+
+from benchmarks.scenarios import SCENARIOS
+
+
+@pytest.mark.parametrize("scenario", SCENARIOS, ids=[s.name for s in SCENARIOS])
+def test_endpoint(benchmark, bench_client, scenario, scale):
+    """Time one request to the scenario's endpoint against the first experiment."""
+    benchmark.group = f"{scale} runs"
+    url = scenario.url(experiment_id=1)
+
+    def request():
+        return bench_client.request(scenario.method, url, json=scenario.body)
+
+    # Large scales make the full-load endpoints take seconds; cap the rounds instead of the time.
+    response = benchmark.pedantic(request, rounds=5 if scale < 100000 else 2, warmup_rounds=1)
+    assert response.status_code < 400
@@ -29,6 +29,8 @@ class Experiment(Base):
     status = Column(Enum(ExperimentStatus), default=ExperimentStatus.DRAFT, nullable=False)
     created_at = Column(DateTime, default=datetime.utcnow)
     updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+    # Sorted JSON array of tag names, maintained by triggers on the tags table (see tags/models.py).
+    tag_names = Column(Text, nullable=False, default="[]", server_default="[]")
 
     runs = relationship("Run", back_populates="experiment", cascade="all, delete-orphan")
     tags = relationship("Tag", back_populates="experiment", cascade="all, delete-orphan")
@@ -1,69 +1,138 @@
 # experiments/routes.py
 # API and HTML routes for experiment CRUD.
 # Why: Co-locates all experiment endpoints; agents find them by folder name.
-# Relevant files: experiments/models.py, experiments/schemas.py, experiments/templates/
+# Relevant files: experiments/models.py, experiments/schemas.py, experiments/templates/, shared/coalesce.py
 
 from __future__ import annotations
 
 import json
-import os
+from typing import Literal, Optional
 
-from fastapi import APIRouter, Depends, HTTPException, Request
-from fastapi.responses import HTMLResponse
-from fastapi.templating import Jinja2Templates
-from sqlalchemy.orm import Session
+from fastapi import APIRouter, Depends, HTTPException, Query, Request
+from fastapi.responses import HTMLResponse, JSONResponse, Response
+from sqlalchemy import func, select
+from sqlalchemy.orm import Session, load_only
 
-from experiments.models import Experiment, ExperimentStatus
-from experiments.schemas import ExperimentCreate, ExperimentResponse
+from experiments.models import Experiment
+from experiments.schemas import (
+    ExperimentCreate,
+    ExperimentResponse,
+    ExperimentStatsResponse,
+    StatsGroup,
+    StatsGroupBy,
+)
+from runs.models import Run
+from runs.schemas import MetricDistribution, MetricTrend
+from shared.aggregation import aggregate, empty_summary, experiment_summaries
+from shared.coalesce import coalesced
+from shared.config import CHART_MAX_POINTS, RUN_PAGE_DEFAULT_LIMIT
 from shared.db import get_db
+from shared.rendering import format_metric, status_badge, templates
+from shared.rollup import trend
+from shared.routing import InstrumentedRoute
+from shared.sketch import describe, load_sketch
+from tags.models import Tag
 
-router = APIRouter()
+router = APIRouter(route_class=InstrumentedRoute)
 
-_template_dir = os.path.join(os.path.dirname(__file__), "templates")
-_shared_template_dir = os.path.join(os.path.dirname(__file__), "..", "shared", "templates")
-templates = Jinja2Templates(directory=[_template_dir, _shared_template_dir])
+
+# Fields GET /api/experiments/{id}?fields= can select. "tags" is the tag_names column; the
+# summary fields come from one aggregate query; "runs.<field>" picks columns of each run.
+EXPERIMENT_FIELDS = ("id", "name", "description", "status", "created_at", "updated_at", "tags")
+SUMMARY_FIELDS = tuple(empty_summary())
+RUN_FIELDS = ("id", "name", "hyperparameters", "accuracy", "loss", "latency_ms", "notes", "status", "created_at")
 
 
 def _format_dt(dt) -> str:
     return dt.strftime("%Y-%m-%d %H:%M") if dt else ""
 
 
-def _experiment_stats(experiment: Experiment):
-    runs = experiment.runs
-    if not runs:
-        return {"total_runs": 0, "avg_accuracy": None, "best_accuracy": None, "avg_loss": None}
-    accuracies = [r.accuracy for r in runs if r.accuracy is not None]
-    losses = [r.loss for r in runs if r.loss is not None]
-    return {
-        "total_runs": len(runs),
-        "avg_accuracy": sum(accuracies) / len(accuracies) if accuracies else None,
-        "best_accuracy": max(accuracies) if accuracies else None,
-        "avg_loss": sum(losses) / len(losses) if losses else None,
-    }
+def _ensure_experiment(db: Session, experiment_id: int):
+    """Raise 404 unless the experiment exists (reads only its id, not the text columns)."""
+    if db.query(Experiment.id).filter(Experiment.id == experiment_id).first() is None:
+        raise HTTPException(
+            status_code=404,
+            detail=f"Experiment {experiment_id} not found. Check the ID and try again.",
+        )
 
 
-def _status_badge(status: ExperimentStatus) -> str:
-    colors = {
-        ExperimentStatus.DRAFT: "#6c757d",
-        ExperimentStatus.RUNNING: "#0d6efd",
-        ExperimentStatus.COMPLETED: "#198754",
-        ExperimentStatus.FAILED: "#dc3545",
-        ExperimentStatus.ARCHIVED: "#6c757d",
-    }
-    color = colors.get(status, "#6c757d")
-    return f'<span style="background-color: {color}; color: white; padding: 2px 8px; border-radius: 4px; font-size: 0.8em;">{status.value}</span>'
+def _parse_fields(fields: Optional[str]) -> tuple[list, list]:
+    """Split ?fields= into (experiment/summary fields, run fields); None selects everything.
+
+    "runs" alone means every run field. Unknown names raise ValueError.
+    """
+    if fields is None:
+        return [*EXPERIMENT_FIELDS, *SUMMARY_FIELDS], list(RUN_FIELDS)
+    top, run_fields = ["id"], []
+    for name in (f.strip() for f in fields.split(",")):
+        if not name or name in top:
+            continue
+        if name == "runs":
+            run_fields = list(RUN_FIELDS)
+        elif name.startswith("runs."):
+            if name[5:] not in RUN_FIELDS:
+                raise ValueError(f"Unknown run field '{name[5:]}'. Choose from: {', '.join(RUN_FIELDS)}.")
+            if name[5:] not in run_fields:
+                run_fields.append(name[5:])
+        elif name in EXPERIMENT_FIELDS or name in SUMMARY_FIELDS:
+            top.append(name)
+        else:
+            allowed = ", ".join([*EXPERIMENT_FIELDS, *SUMMARY_FIELDS, "runs", "runs.<field>"])
+            raise ValueError(f"Unknown field '{name}'. Choose from: {allowed}.")
+    return top, run_fields
+
+
+def _run_dict(row, run_fields: list) -> dict:
+    run = {}
+    for name in run_fields:
+        value = getattr(row, name)
+        if name == "hyperparameters":
+            value = json.loads(value) if value else {}
+        elif name == "status":
+            value = value.value
+        elif name == "created_at":
+            value = _format_dt(value)
+        run[name] = value
+    return run
+
+
+def _chart_points(db: Session, experiment_id: int, total_runs: int):
+    """Return (labels, accuracies, losses) for the metrics chart, evenly downsampled to CHART_MAX_POINTS."""
+    query = db.query(Run.id, Run.name, Run.accuracy, Run.loss).filter(Run.experiment_id == experiment_id)
+    if total_runs > CHART_MAX_POINTS:
+        # Keep every Nth run by position; the window function avoids fetching the skipped rows.
+        step = -(-total_runs // CHART_MAX_POINTS)
+        ranked = query.add_columns(func.row_number().over(order_by=Run.id).label("pos")).subquery()
+        rows = db.query(ranked.c.id, ranked.c.name, ranked.c.accuracy, ranked.c.loss).filter(
+            (ranked.c.pos - 1) % step == 0
+        ).order_by(ranked.c.id)
+    else:
+        rows = query.order_by(Run.id)
+    rows = rows.all()
+    labels = [row.name or f"Run #{row.id}" for row in rows]
+    return labels, [row.accuracy for row in rows], [row.loss for row in rows]
 
 
 # --- API Routes ---
 
 
 @router.get("/api/experiments", response_model=list[ExperimentResponse])
-def list_experiments(db: Session = Depends(get_db)):
-    """List all experiments, newest first."""
-    experiments = db.query(Experiment).order_by(Experiment.created_at.desc()).all()
+def list_experiments(
+    tag: Optional[str] = Query(None, description="Only experiments with this tag"),
+    db: Session = Depends(get_db),
+):
+    """List all experiments, newest first, each with its tag names (no JOIN: read from tag_names)."""
+    query = db.query(Experiment)
+    tagged = None
+    if tag is not None:
+        # Membership goes through the indexed tags table, not a scan of the denormalized column.
+        tagged = select(Tag.experiment_id).where(Tag.name == tag)
+        query = query.filter(Experiment.id.in_(tagged))
+    experiments = query.order_by(Experiment.created_at.desc()).all()
+    summaries = experiment_summaries(db, tagged)
     result = []
     for exp in experiments:
-        stats = _experiment_stats(exp)
+        stats = summaries.get(exp.id) or empty_summary()
         result.append(
             ExperimentResponse(
                 id=exp.id,
@@ -74,11 +143,114 @@ def list_experiments(db: Session = Depends(get_db)):
                 updated_at=exp.updated_at,
                 total_runs=stats["total_runs"],
                 avg_accuracy=stats["avg_accuracy"],
+                tags=json.loads(exp.tag_names),
             )
         )
     return result
 
 
+@coalesced
+def _stats_data(
+    db: Session,
+    experiment_id: int,
+    metrics: str,
+    group_by: Optional[StatsGroupBy],
+    window_days: Optional[int],
+    percentiles: str,
+) -> ExperimentStatsResponse:
+    _ensure_experiment(db, experiment_id)
+    metric_names = [m.strip() for m in metrics.split(",") if m.strip()]
+    try:
+        pcts = [float(p) for p in percentiles.split(",") if p.strip()]
+        groups = aggregate(
+            db,
+            metric_names,
+            experiment_ids=[experiment_id],
+            group_by=group_by,
+            window_days=window_days,
+            percentiles=pcts,
+        )
+    except ValueError as exc:
+        raise HTTPException(status_code=422, detail=str(exc)) from exc
+    return ExperimentStatsResponse(
+        experiment_id=experiment_id,
+        group_by=group_by,
+        window_days=window_days,
+        groups=[
+            StatsGroup(key=None if g["group"] is None else str(g["group"]), runs=g["runs"], metrics=g["metrics"])
+            for g in groups
+        ],
+    )
+
+
+@router.get("/api/experiments/{experiment_id}/stats", response_model=ExperimentStatsResponse)
+def experiment_stats(
+    request: Request,
+    experiment_id: int,
+    metrics: str = Query("accuracy,loss,latency_ms", description="Comma-separated: accuracy, loss, latency_ms"),
+    group_by: Optional[StatsGroupBy] = Query(None, description="Split the stats by tag or time bucket"),
+    window_days: Optional[int] = Query(None, ge=1, description="Only runs created in the last N days"),
+    percentiles: str = Query("", description="Comma-separated percentiles, e.g. 50,90,99"),
+):
+    """Count, mean, min, max, range, and optional percentiles for several run metrics, in one query.
+
+    Returns 404 if the experiment does not exist, 422 for unknown metrics or bad percentiles.
+    """
+    return _stats_data(
+        request,
+        experiment_id=experiment_id,
+        metrics=metrics,
+        group_by=group_by,
+        window_days=window_days,
+        percentiles=percentiles,
+    )
+
+
+@router.get("/api/experiments/{experiment_id}/distribution", response_model=MetricDistribution)
+def experiment_distribution(
+    experiment_id: int,
+    metric: str = Query("latency_ms", description="accuracy, loss, or latency_ms"),
+    percentiles: str = Query("50,90,99", description="Comma-separated percentiles"),
+    bins: int = Query(20, ge=1, le=200, description="Histogram bins between min and max"),
+    db: Session = Depends(get_db),
+):
+    """Percentiles and a fixed-bin histogram for one run metric, read from the experiment's sketch.
+
+    Values are within SKETCH_RELATIVE_ACCURACY of exact; no run rows are scanned.
+    Returns 404 if the experiment does not exist, 422 for an unknown metric or bad percentiles.
+    """
+    _ensure_experiment(db, experiment_id)
+    try:
+        pcts = [float(p) for p in percentiles.split(",") if p.strip()]
+        if any(not 0 < p <= 100 for p in pcts):
+            raise ValueError("Percentiles must be in (0, 100].")
+        sketch = load_sketch(db, metric, [experiment_id])
+    except ValueError as exc:
+        raise HTTPException(status_code=422, detail=str(exc)) from exc
+    return describe(sketch, metric, pcts, bins)
+
+
+@router.get("/api/experiments/{experiment_id}/trends", response_model=MetricTrend)
+def experiment_trends(
+    experiment_id: int,
+    metric: str = Query("accuracy", description="accuracy, loss, or latency_ms"),
+    granularity: Literal["hour", "day"] = Query("day", description="Bucket size"),
+    days: int = Query(90, ge=1, le=366, description="How far back to go"),
+    db: Session = Depends(get_db),
+):
+    """Mean/min/max/stddev of a run metric per hour or day, read from the rollup table.
+
+    Cost is proportional to the number of buckets in the window, not the number of runs.
+    Returns 404 if the experiment does not exist, 422 for an unknown metric.
+    """
+    _ensure_experiment(db, experiment_id)
+    try:
+        points = trend(db, experiment_id, metric, granularity, days)
+    except ValueError as exc:
+        raise HTTPException(status_code=422, detail=str(exc)) from exc
+    return MetricTrend(experiment_id=experiment_id, metric=metric, granularity=granularity, days=days, points=points)
+
+
 @router.post("/api/experiments", response_model=ExperimentResponse, status_code=201)
 def create_experiment(payload: ExperimentCreate, db: Session = Depends(get_db)):
     """Create a new experiment.
@@ -103,104 +275,105 @@ def create_experiment(payload: ExperimentCreate, db: Session = Depends(get_db)):
     )
 
 
-@router.get("/api/experiments/{experiment_id}")
-def get_experiment(experiment_id: int, db: Session = Depends(get_db)):
-    """Get experiment details including all runs.
-
-    Returns 404 with a message if the experiment does not exist.
-    """
-    experiment = db.query(Experiment).filter(Experiment.id == experiment_id).first()
+@coalesced
+def _experiment_json(db: Session, experiment_id: int, fields: Optional[str]) -> bytes:
+    """The encoded body of GET /api/experiments/{id}: encoded once, shared by coalesced callers."""
+    try:
+        top, run_fields = _parse_fields(fields)
+    except ValueError as exc:
+        raise HTTPException(status_code=422, detail=str(exc)) from exc
+    columns = [getattr(Experiment, "tag_names" if f == "tags" else f) for f in top if f in EXPERIMENT_FIELDS]
+    experiment = (
+        db.query(Experiment).options(load_only(*columns)).filter(Experiment.id == experiment_id).first()
+    )
     if not experiment:
         raise HTTPException(
             status_code=404,
             detail=f"Experiment {experiment_id} not found. Check the ID and try again.",
         )
-    runs = []
-    for run in experiment.runs:
-        hp = json.loads(run.hyperparameters) if run.hyperparameters else {}
-        runs.append(
-            {
-                "id": run.id,
-                "name": run.name,
-                "hyperparameters": hp,
-                "accuracy": run.accuracy,
-                "loss": run.loss,
-                "latency_ms": run.latency_ms,
-                "notes": run.notes,
-                "status": run.status.value,
-                "created_at": _format_dt(run.created_at),
-            }
+    body = {}
+    for name in top:
+        if name in EXPERIMENT_FIELDS:
+            value = getattr(experiment, "tag_names" if name == "tags" else name)
+            if name == "status":
+                value = value.value
+            elif name in ("created_at", "updated_at"):
+                value = _format_dt(value)
+            elif name == "tags":
+                value = json.loads(value)
+            body[name] = value
+    if run_fields:
+        rows = (
+            db.query(*(getattr(Run, f) for f in run_fields))
+            .filter(Run.experiment_id == experiment_id)
+            .order_by(Run.id)
         )
-    stats = _experiment_stats(experiment)
-    return {
-        "id": experiment.id,
-        "name": experiment.name,
-        "description": experiment.description,
-        "status": experiment.status.value,
-        "created_at": _format_dt(experiment.created_at),
-        "updated_at": _format_dt(experiment.updated_at),
-        "runs": runs,
-        **stats,
-    }
+        body["runs"] = [_run_dict(row, run_fields) for row in rows]
+    if any(name in SUMMARY_FIELDS for name in top):
+        stats = experiment_summaries(db, [experiment_id]).get(experiment_id) or empty_summary()
+        body.update((name, stats[name]) for name in top if name in SUMMARY_FIELDS)
+    return JSONResponse(body).body
+
+
+@router.get("/api/experiments/{experiment_id}")
+def get_experiment(
+    request: Request,
+    experiment_id: int,
+    fields: Optional[str] = Query(
+        None, description="Comma-separated fields to return, e.g. name,total_runs,runs.id,runs.accuracy"
+    ),
+):
+    """Get experiment details including all runs.
+
+    With ?fields=, only those fields (plus id) are returned and only their columns are read:
+    no run rows unless a run field is asked for, no aggregate unless a summary field is.
+    Returns 404 with a message if the experiment does not exist, 422 for an unknown field.
+    """
+    return Response(_experiment_json(request, experiment_id=experiment_id, fields=fields), media_type="application/json")
 
 
 # --- HTML Routes ---
 
 
-@router.get("/experiments/{experiment_id}", response_class=HTMLResponse)
-def experiment_detail_page(request: Request, experiment_id: int, db: Session = Depends(get_db)):
-    """Render the experiment detail page with runs table and metrics charts."""
+@coalesced
+def _detail_page_data(db: Session, experiment_id: int) -> dict:
     experiment = db.query(Experiment).filter(Experiment.id == experiment_id).first()
     if not experiment:
         raise HTTPException(
             status_code=404,
             detail=f"Experiment {experiment_id} not found. Check the ID and try again.",
         )
-    runs_data = []
-    for run in experiment.runs:
-        hp = json.loads(run.hyperparameters) if run.hyperparameters else {}
-        runs_data.append(
-            {
-                "id": run.id,
-                "name": run.name or f"Run #{run.id}",
-                "hyperparameters": hp,
-                "hyperparameters_str": json.dumps(hp, indent=2),
-                "accuracy": run.accuracy,
-                "accuracy_fmt": f"{run.accuracy:.4f}" if run.accuracy else "N/A",
-                "loss": run.loss,
-                "loss_fmt": f"{run.loss:.4f}" if run.loss else "N/A",
-                "latency_ms": run.latency_ms,
-                "latency_fmt": f"{run.latency_ms:.1f}ms" if run.latency_ms else "N/A",
-                "status": run.status,
-                "status_badge": _status_badge(ExperimentStatus(run.status.value) if hasattr(run.status, "value") else ExperimentStatus.COMPLETED),
-                "notes": run.notes,
-                "created_at": _format_dt(run.created_at),
-            }
-        )
-
-    run_labels = [r["name"] for r in runs_data]
-    run_accuracies = [r["accuracy"] for r in runs_data]
-    run_losses = [r["loss"] for r in runs_data]
-
-    stats = _experiment_stats(experiment)
-    return templates.TemplateResponse(
-        "detail.html",
-        {
-            "request": request,
-            "experiment": {
-                "id": experiment.id,
-                "name": experiment.name,
-                "description": experiment.description,
-                "status": experiment.status,
-                "status_badge": _status_badge(experiment.status),
-                "created_at": _format_dt(experiment.created_at),
-                "updated_at": _format_dt(experiment.updated_at),
-                "tags": [{"name": tag.name} for tag in experiment.tags],
-            },
-            "runs": runs_data,
-            "stats": stats,
-            "run_labels": json.dumps(run_labels),
-            "run_accuracies": json.dumps(run_accuracies),
-            "run_losses": json.dumps(run_losses),
+    stats = experiment_summaries(db, [experiment_id]).get(experiment_id) or empty_summary()
+    run_labels, run_accuracies, run_losses = _chart_points(db, experiment_id, stats["total_runs"])
+    return {
+        "experiment": {
+            "id": experiment.id,
+            "name": experiment.name,
+            "description": experiment.description,
+            "status": experiment.status,
+            "status_badge": status_badge(experiment.status.value),
+            "created_at": _format_dt(experiment.created_at),
+            "updated_at": _format_dt(experiment.updated_at),
+            "tags": [{"name": name} for name in json.loads(experiment.tag_names)],
         },
-    )
+        "stats": {
+            **stats,
+            "avg_accuracy_fmt": format_metric(stats["avg_accuracy"]),
+            "best_accuracy_fmt": format_metric(stats["best_accuracy"]),
+            "avg_loss_fmt": format_metric(stats["avg_loss"]),
+        },
+        "page_size": RUN_PAGE_DEFAULT_LIMIT,
+        "run_labels": json.dumps(run_labels),
+        "run_accuracies": json.dumps(run_accuracies),
+        "run_losses": json.dumps(run_losses),
+    }
+
+
+@router.get("/experiments/{experiment_id}", response_class=HTMLResponse)
+def experiment_detail_page(request: Request, experiment_id: int):
+    """Render the experiment detail page with summary stats and metrics charts.
+
+    The runs table itself is fetched page by page from GET /api/experiments/{id}/runs.
+    """
+    data = _detail_page_data(request, experiment_id=experiment_id)
+    return templates.TemplateResponse("experiments/detail.html", {"request": request, **data})
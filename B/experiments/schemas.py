@@ -6,7 +6,7 @@
 from __future__ import annotations
 
 from datetime import datetime
-from typing import Optional
+from typing import Literal, Optional
 
 from pydantic import BaseModel, Field
 
@@ -28,9 +28,35 @@ class ExperimentResponse(BaseModel):
     updated_at: Optional[datetime] = None
     total_runs: int = 0
     avg_accuracy: Optional[float] = None
+    tags: list[str] = Field(default_factory=list)
 
     model_config = {"from_attributes": True}
 
 
 class ExperimentDetailResponse(ExperimentResponse):
     runs: list = Field(default_factory=list)
+
+
+StatsGroupBy = Literal["tag", "day", "week", "month"]
+
+
+class MetricStats(BaseModel):
+    count: int
+    mean: Optional[float] = None
+    min: Optional[float] = None
+    max: Optional[float] = None
+    range: Optional[float] = None
+    percentiles: dict[str, Optional[float]] = Field(default_factory=dict)
+
+
+class StatsGroup(BaseModel):
+    key: Optional[str] = Field(None, description="Tag name or time bucket; null when not grouped")
+    runs: int
+    metrics: dict[str, MetricStats]
+
+
+class ExperimentStatsResponse(BaseModel):
+    experiment_id: int
+    group_by: Optional[StatsGroupBy] = None
+    window_days: Optional[int] = None
+    groups: list[StatsGroup]
@@ -16,8 +16,9 @@ from experiments.models import Experiment
 from exports.models import ExportFormat, ExportJob
 from exports.schemas import ExportRequest, ExportResponse
 from shared.db import get_db
+from shared.routing import InstrumentedRoute
 
-router = APIRouter()
+router = APIRouter(route_class=InstrumentedRoute)
 
 
 @router.post("/api/experiments/{experiment_id}/export", response_model=ExportResponse, status_code=201)
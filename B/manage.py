@@ -5,30 +5,47 @@
 # Relevant files: shared/config.py, shared/db.py, experiments/routes.py, runs/routes.py
 
 import argparse
+import hashlib
 import json
+import os
 import sys
+import weakref
 from contextlib import asynccontextmanager
 from datetime import datetime
-
-from fastapi import Depends, FastAPI, Request
-from fastapi.responses import HTMLResponse
-from fastapi.templating import Jinja2Templates
-from sqlalchemy.orm import Session
+from typing import TYPE_CHECKING
 
 from shared.base import Base
-from shared.config import HOST, PORT
+from shared.config import HOST, PORT, SERVE_GRACEFUL_TIMEOUT_S, SERVE_MAX_REQUESTS, SERVE_WORKERS
 from shared.db import SessionLocal, engine, get_db
 
+if TYPE_CHECKING:
+    from fastapi import FastAPI
+
+# FastAPI, the routers, and templates are imported inside create_app(), so commands that
+# never build an app (migrate, seed, slow-queries, check) skip most of the import cost.
+# `python manage.py startup-profile` shows the breakdown.
 
-def create_app() -> FastAPI:
+
+def create_app() -> "FastAPI":
     """Build and return the FastAPI application with all routes mounted."""
+    from fastapi import Depends, FastAPI, Request
+    from fastapi.responses import HTMLResponse, PlainTextResponse
+    from sqlalchemy.orm import Session
+
+    from shared.instrumentation import InstrumentationMiddleware, registry
+    from shared.rendering import format_metric, precompile_templates, status_badge, templates
+    from shared.routing import InstrumentedRoute
 
     @asynccontextmanager
     async def lifespan(app):
-        Base.metadata.create_all(bind=engine)
+        if os.environ.get(SCHEMA_READY_ENV) != _schema_fingerprint():
+            _ensure_tables()
+        precompile_templates()
         yield
 
     app = FastAPI(title="ML Experiment Tracker", lifespan=lifespan)
+    app.router.route_class = InstrumentedRoute
+    app.add_middleware(InstrumentationMiddleware)
 
     # Import routes after app creation to avoid circular imports
     from experiments.routes import router as experiments_router
@@ -44,43 +61,43 @@ def create_app() -> FastAPI:
     app.include_router(exports_router)
 
     # Dashboard
-    import os
-
-    _shared_template_dir = os.path.join(os.path.dirname(__file__), "shared", "templates")
-    templates = Jinja2Templates(directory=[_shared_template_dir])
-
     @app.get("/", response_class=HTMLResponse)
     def dashboard(request: Request, db: Session = Depends(get_db)):
         """Render the main dashboard with experiment overview and activity feed."""
-        from experiments.models import Experiment
+        from sqlalchemy import func
+        from sqlalchemy.orm import load_only
 
-        experiments = db.query(Experiment).order_by(Experiment.created_at.desc()).all()
+        from experiments.models import Experiment
+        from runs.models import Run
+        from shared.aggregation import empty_summary, experiment_summaries
+
+        # The dashboard never shows descriptions; load only the columns it renders.
+        experiments = (
+            db.query(Experiment)
+            .options(load_only(Experiment.id, Experiment.name, Experiment.status, Experiment.created_at))
+            .order_by(Experiment.created_at.desc())
+            .all()
+        )
+        summaries = experiment_summaries(db)
+        # Last three runs of every experiment in one query instead of loading each exp.runs.
+        ranked = db.query(
+            Run.id,
+            Run.experiment_id,
+            Run.name,
+            Run.accuracy,
+            Run.created_at,
+            func.row_number().over(partition_by=Run.experiment_id, order_by=Run.id.desc()).label("pos"),
+        ).subquery()
+        latest_runs = {}
+        for run in db.query(ranked).filter(ranked.c.pos <= 3).order_by(ranked.c.id):
+            latest_runs.setdefault(run.experiment_id, []).append(run)
         exp_data = []
         recent_activity = []
         for exp in experiments:
-            runs = exp.runs
-            accuracies = [r.accuracy for r in runs if r.accuracy is not None]
-            losses = [r.loss for r in runs if r.loss is not None]
-            stats = {
-                "total_runs": len(runs),
-                "avg_accuracy": sum(accuracies) / len(accuracies) if accuracies else None,
-                "best_accuracy": max(accuracies) if accuracies else None,
-                "avg_loss": sum(losses) / len(losses) if losses else None,
-            }
-            status_colors = {
-                "draft": "#6c757d",
-                "running": "#0d6efd",
-                "completed": "#198754",
-                "failed": "#dc3545",
-                "archived": "#6c757d",
-            }
+            stats = summaries.get(exp.id) or empty_summary()
             status_val = exp.status.value if hasattr(exp.status, "value") else str(exp.status)
-            color = status_colors.get(status_val, "#6c757d")
-            badge = f'<span style="background-color: {color}; color: white; padding: 2px 8px; border-radius: 4px; font-size: 0.8em;">{status_val}</span>'
+            badge = status_badge(status_val)
 
-            desc = exp.description or ""
-            if len(desc) > 100:
-                desc = desc[:100] + "..."
             def fmt_dt(dt):
                 return dt.strftime("%Y-%m-%d %H:%M") if dt else ""
 
@@ -88,23 +105,22 @@ def create_app() -> FastAPI:
                 {
                     "id": exp.id,
                     "name": exp.name,
-                    "description": desc,
                     "status": status_val,
                     "status_badge": badge,
                     "created_at": fmt_dt(exp.created_at),
                     "total_runs": stats["total_runs"],
-                    "avg_accuracy": f"{stats['avg_accuracy']:.4f}" if stats["avg_accuracy"] else "N/A",
-                    "best_accuracy": f"{stats['best_accuracy']:.4f}" if stats["best_accuracy"] else "N/A",
+                    "avg_accuracy": format_metric(stats["avg_accuracy"]),
+                    "best_accuracy": format_metric(stats["best_accuracy"]),
                 }
             )
-            for run in runs[-3:]:
+            for run in latest_runs.get(exp.id, []):
                 recent_activity.append(
                     {
                         "type": "run",
                         "experiment_name": exp.name,
                         "experiment_id": exp.id,
                         "run_name": run.name or f"Run #{run.id}",
-                        "accuracy": f"{run.accuracy:.4f}" if run.accuracy else "N/A",
+                        "accuracy": format_metric(run.accuracy),
                         "created_at": fmt_dt(run.created_at),
                     }
                 )
@@ -116,14 +132,13 @@ def create_app() -> FastAPI:
         chart_accuracy = []
         chart_loss = []
         for exp in experiments[:10]:
-            accuracies = [r.accuracy for r in exp.runs if r.accuracy is not None]
-            losses = [r.loss for r in exp.runs if r.loss is not None]
+            stats = summaries.get(exp.id) or empty_summary()
             name = exp.name
             if len(name) > 20:
                 name = name[:20] + "..."
             chart_labels.append(name)
-            chart_accuracy.append(sum(accuracies) / len(accuracies) if accuracies else None)
-            chart_loss.append(sum(losses) / len(losses) if losses else None)
+            chart_accuracy.append(stats["avg_accuracy"])
+            chart_loss.append(stats["avg_loss"])
 
         return templates.TemplateResponse(
             "dashboard.html",
@@ -145,17 +160,64 @@ def create_app() -> FastAPI:
         """Health check endpoint. Returns 200 if the service is running."""
         return {"status": "ok", "timestamp": datetime.utcnow().isoformat()}
 
+    # Metrics
+    @app.get("/api/metrics", response_class=PlainTextResponse)
+    def metrics():
+        """Prometheus text exposition of per-route latency, SQL counts/time, and template render time.
+
+        With TRACKER_PROFILING=1, add ?profile=1 to any other request to get its call tree instead of its response.
+        """
+        return PlainTextResponse(registry.render_prometheus(), media_type="text/plain; version=0.0.4")
+
     return app
 
 
-def _ensure_tables():
-    """Import all models so Base.metadata knows about them, then create tables."""
+# Set by `serve` after it checks the schema (to the schema's fingerprint), and inherited by its
+# workers, which then skip the check in their startup instead of all running it at once.
+SCHEMA_READY_ENV = "TRACKER_SCHEMA_READY"
+
+# Engines whose schema has been checked in this process; `run` checks before serving and the
+# app's startup would otherwise check again.
+_ensured_engines = weakref.WeakSet()
+
+
+def _import_models():
+    """Import all models so Base.metadata knows about every table."""
     import experiments.models  # noqa: F401
     import exports.models  # noqa: F401
     import runs.models  # noqa: F401
     import tags.models  # noqa: F401
 
+
+def _schema_fingerprint() -> str:
+    """Short hash of the tables, columns and indexes the models in this process define.
+
+    A worker started after SIGHUP runs new code; if that code's schema differs from the one
+    `serve` checked, the fingerprints differ and the worker runs the check itself.
+    """
+    _import_models()
+    parts = []
+    for table in sorted(Base.metadata.tables.values(), key=lambda t: t.name):
+        parts.append(table.name)
+        parts.extend(f"{column.name} {column.type!r}" for column in table.columns)
+        parts.extend(sorted(str(index.name) for index in table.indexes))
+    return hashlib.sha256("\n".join(parts).encode()).hexdigest()[:16]
+
+
+def _ensure_tables():
+    """Import all models so Base.metadata knows about them, create tables, and upgrade older databases.
+
+    Runs once per engine per process.
+    """
+    if engine in _ensured_engines:
+        return
+    _import_models()
+    from tags.models import ensure_tag_names
+
     Base.metadata.create_all(bind=engine)
+    with engine.begin() as conn:
+        ensure_tag_names(conn)
+    _ensured_engines.add(engine)
 
 
 def cmd_run(args):
@@ -169,20 +231,85 @@ def cmd_run(args):
     uvicorn.run(create_app(), host=HOST, port=PORT)
 
 
-def cmd_seed(args):
-    """Load sample experiment data into the database."""
+def cmd_serve(args):
+    """Start the production server: a supervisor process pre-forks N workers sharing one socket.
+
+    The schema check and sample data run once here, before forking; SCHEMA_READY_ENV (the schema
+    fingerprint) tells the workers to skip the check in their startup, so they never run DDL
+    concurrently. Each worker then builds its own app (manage:create_app) with its own connection
+    pool. Send SIGHUP to restart the workers one at a time (picks up new code); a worker that
+    exits (crash or --max-requests) is replaced. Metrics (/api/metrics) and caches are per worker.
+
+    After SIGHUP, the first worker whose models define a new table, column or index runs the
+    check itself. Upgrade steps that don't show up in the models (e.g. a new trigger in
+    ensure_tag_names) are not detected: deploy those with a full restart or `migrate` first.
+    """
+    import uvicorn
+
     _ensure_tables()
     _seed_if_empty()
+    os.environ[SCHEMA_READY_ENV] = _schema_fingerprint()
+    # Workers open their own connections after the fork; don't hand them this process's pool.
+    engine.dispose()
+    where = f"unix:{args.uds}" if args.uds else f"http://{args.host}:{args.port}"
+    print(f"Starting {args.workers} worker(s) at {where}")
+    print("SIGHUP reloads the workers; Ctrl+C stops.")
+    uvicorn.run(
+        "manage:create_app",
+        factory=True,
+        host=args.host,
+        port=args.port,
+        uds=args.uds,
+        workers=args.workers,
+        limit_max_requests=args.max_requests or None,
+        timeout_graceful_shutdown=args.graceful_timeout,
+        access_log=False,
+    )
+
+
+def cmd_seed(args):
+    """Load sample experiment data, or bulk-generate synthetic data when --experiments is given."""
+    _ensure_tables()
+    if args.experiments is None:
+        _seed_if_empty()
+        return
+    import time
+
+    from shared.synthetic import generate
+
+    start = time.perf_counter()
+    counts = generate(engine, args.experiments, args.runs_per_exp, args.tags, seed=args.seed)
+    elapsed = time.perf_counter() - start
+    print(
+        f"Inserted {counts['experiments']} experiments, {counts['runs']} runs, "
+        f"{counts['tags']} tags in {elapsed:.1f}s."
+    )
 
 
 def cmd_migrate(args):
-    """Create or update database tables."""
+    """Create or update database tables; optionally recompute metric sketches and rollups from all runs."""
     _ensure_tables()
     print("Database tables created/updated.")
+    if args.rebuild_sketches:
+        from shared.sketch import rebuild_sketches
+
+        with engine.begin() as conn:
+            rebuild_sketches(conn)
+        print("Metric sketches rebuilt.")
+    if args.rebuild_rollups:
+        from shared.rollup import rebuild_rollups
+
+        with engine.begin() as conn:
+            rebuild_rollups(conn)
+        print("Hourly and daily metric rollups rebuilt.")
 
 
 def cmd_check(args):
-    """Run ruff lint and pytest."""
+    """Run ruff lint and pytest; with --bench, also the performance regression gate.
+
+    The gate compares latencies against benchmarks/baseline.json, so it depends on the machine
+    and its load. It is opt-in to keep `check` deterministic; run it on quiet hardware.
+    """
     import subprocess
 
     print("Running ruff check...")
@@ -190,16 +317,124 @@ def cmd_check(args):
     print()
     print("Running pytest...")
     pytest_result = subprocess.run(["pytest"], cwd=sys.path[0] or ".")
-    if ruff_result.returncode != 0 or pytest_result.returncode != 0:
+    bench_returncode = 0
+    if args.bench:
+        print()
+        print("Running performance regression gate...")
+        bench_returncode = subprocess.run([sys.executable, "manage.py", "bench"], cwd=sys.path[0] or ".").returncode
+    if ruff_result.returncode != 0 or pytest_result.returncode != 0 or bench_returncode != 0:
         print("\nSome checks failed. Fix the issues above and run again.")
         sys.exit(1)
     print("\nAll checks passed.")
 
 
+def cmd_bench(args):
+    """Benchmark the fixed scenario and fail if any endpoint regressed past the baseline tolerances."""
+    from benchmarks.gate import (
+        BASELINE_PATH,
+        DEFAULT_TOLERANCES,
+        RESULTS_PATH,
+        compare,
+        load_json,
+        run_bench,
+        save_json,
+    )
+
+    out = args.out or RESULTS_PATH
+    baseline_path = args.baseline or BASELINE_PATH
+    print(f"Benchmarking {args.requests} requests per endpoint...")
+    results = run_bench(args.requests)
+    save_json(out, results)
+    print(f"{'endpoint':<14}{'p50':>10}{'p95':>10}{'sql/req':>9}{'peak mem':>12}")
+    for name, r in results["scenarios"].items():
+        print(
+            f"{name:<14}{r['p50_ms']:>8.1f}ms{r['p95_ms']:>8.1f}ms{r['sql_queries']:>9g}{r['peak_memory_kb']:>10.0f}KB"
+        )
+    print(f"Results written to {out}")
+
+    if args.update_baseline:
+        previous = load_json(baseline_path) if os.path.exists(baseline_path) else {}
+        results["tolerances"] = previous.get("tolerances", DEFAULT_TOLERANCES)
+        save_json(baseline_path, results)
+        print(f"Baseline updated: {baseline_path}")
+        return
+    if not os.path.exists(baseline_path):
+        print(f"No baseline at {baseline_path}. Run: python manage.py bench --update-baseline")
+        sys.exit(1)
+
+    baseline = load_json(baseline_path)
+    tolerances = {**DEFAULT_TOLERANCES, **baseline.get("tolerances", {})}
+    overrides = {
+        "latency_pct": args.latency_tolerance,
+        "sql_queries": args.sql_tolerance,
+        "memory_pct": args.memory_tolerance,
+    }
+    tolerances.update({key: value for key, value in overrides.items() if value is not None})
+    failures = compare(baseline, results, tolerances)
+    if failures:
+        print(f"\nPerformance regressions (baseline: {baseline_path}):")
+        for failure in failures:
+            print(f"  {failure}")
+        print("If the change is intended, run: python manage.py bench --update-baseline")
+        sys.exit(1)
+    print("No performance regressions.")
+
+
+def cmd_startup_profile(args):
+    """Time cold starts (fresh interpreter to started app) and show where the import time goes."""
+    from benchmarks.startup import profile_startup
+    from shared.config import STARTUP_TARGET_MS
+
+    target = args.target_ms or STARTUP_TARGET_MS
+    print(f"Profiling {args.runs} cold starts...")
+    profile = profile_startup(args.runs)
+    print(f"{'phase':<14}{'median':>10}")
+    for phase, ms in profile["phases_ms"].items():
+        print(f"{phase:<14}{ms:>8.0f}ms")
+    print(f"{'total':<14}{profile['total_ms']:>8.0f}ms  (target {target:.0f}ms)")
+    print("\nImport self time by package:")
+    for name, ms in list(profile["packages_ms"].items())[: args.top]:
+        print(f"  {name:<22}{ms:>8.1f}ms")
+    print("\nSlowest top-level imports (cumulative):")
+    for entry in profile["slowest_imports_ms"][: args.top]:
+        print(f"  {entry['module']:<40}{entry['cumulative_ms']:>8.1f}ms")
+    if args.out:
+        with open(args.out, "w") as f:
+            json.dump(profile, f, indent=2)
+        print(f"\nProfile written to {args.out}")
+    if profile["total_ms"] > target:
+        print(f"\nCold start {profile['total_ms']:.0f}ms is over the {target:.0f}ms target.")
+        sys.exit(1)
+
+
+def cmd_slow_queries(args):
+    """Summarize the slow query log, worst offenders first."""
+    from shared.slowlog import read_entries, summarize
+
+    entries = read_entries()
+    if not entries:
+        print("No slow queries logged yet. Threshold is SLOW_QUERY_THRESHOLD_MS in shared/config.py.")
+        return
+    groups = summarize(entries, sort=args.sort)
+    print(f"{len(entries)} slow statements, {len(groups)} distinct queries (sorted by {args.sort})\n")
+    for group in groups[: args.limit]:
+        flag = "  [FULL SCAN]" if group["full_scan"] else ""
+        print(
+            f"{group['total_ms']:10.1f}ms total  {group['max_ms']:8.1f}ms max  {group['count']:6d}x{flag}"
+        )
+        print(f"  routes: {', '.join(group['routes'])}")
+        print(f"  sql:    {' '.join(group['sql'].split())}")
+        for line in group["plan"]:
+            print(f"  plan:   {line}")
+        print()
+
+
 def _seed_if_empty():
     """Insert sample data if the database is empty."""
     from experiments.models import Experiment, ExperimentStatus
     from runs.models import Run, RunStatus
+    from shared.rollup import record_rollups
+    from shared.sketch import record_runs
 
     db = SessionLocal()
     try:
@@ -284,6 +519,9 @@ def _seed_if_empty():
             ),
         ]
         db.add_all(runs)
+        db.flush()
+        record_runs(db, runs)
+        record_rollups(db, runs)
         db.commit()
         print("Sample data seeded successfully.")
     finally:
@@ -298,24 +536,74 @@ def main():
     subparsers = parser.add_subparsers(dest="command", help="Available commands")
 
     subparsers.add_parser("run", help="Start the development server on port 8000")
-    subparsers.add_parser("seed", help="Load sample experiment data")
-    subparsers.add_parser("migrate", help="Create or update database tables")
-    subparsers.add_parser("check", help="Run ruff lint and pytest")
+    serve_parser = subparsers.add_parser("serve", help="Start the multi-process production server")
+    serve_parser.add_argument("--workers", type=int, default=SERVE_WORKERS, help="Worker processes (default: one per core)")
+    serve_parser.add_argument("--host", default=HOST, help=f"Bind address (default {HOST})")
+    serve_parser.add_argument("--port", type=int, default=PORT, help=f"Bind port (default {PORT})")
+    serve_parser.add_argument("--uds", default=None, help="Listen on this Unix socket instead of host/port")
+    serve_parser.add_argument(
+        "--max-requests",
+        type=int,
+        default=SERVE_MAX_REQUESTS,
+        help=f"Replace a worker after this many requests, 0 to disable (default {SERVE_MAX_REQUESTS})",
+    )
+    serve_parser.add_argument(
+        "--graceful-timeout",
+        type=int,
+        default=SERVE_GRACEFUL_TIMEOUT_S,
+        help=f"Seconds a stopping worker gets to finish in-flight requests (default {SERVE_GRACEFUL_TIMEOUT_S})",
+    )
+    seed_parser = subparsers.add_parser("seed", help="Load sample experiment data (or synthetic data with --experiments)")
+    seed_parser.add_argument("--experiments", type=int, default=None, help="Generate N synthetic experiments")
+    seed_parser.add_argument("--runs-per-exp", type=int, default=100, help="Synthetic runs per experiment (default 100)")
+    seed_parser.add_argument("--tags", type=int, default=3, help="Synthetic tags per experiment (default 3)")
+    seed_parser.add_argument("--seed", type=int, default=0, help="Random seed for reproducible data (default 0)")
+    migrate_parser = subparsers.add_parser("migrate", help="Create or update database tables")
+    migrate_parser.add_argument(
+        "--rebuild-sketches", action="store_true", help="Recompute per-experiment metric sketches from the runs table"
+    )
+    migrate_parser.add_argument(
+        "--rebuild-rollups", action="store_true", help="Recompute hourly/daily metric rollups from the runs table"
+    )
+    check_parser = subparsers.add_parser("check", help="Run ruff lint and pytest (--bench adds the performance gate)")
+    check_parser.add_argument(
+        "--bench", action="store_true", help="Also run the latency-based performance regression gate (timing-dependent)"
+    )
+    bench_parser = subparsers.add_parser("bench", help="Benchmark endpoints and compare against the baseline")
+    bench_parser.add_argument("--requests", type=int, default=20, help="Timed requests per endpoint (default 20)")
+    bench_parser.add_argument("--out", default=None, help="Where to write the results (default benchmarks/results/latest.json)")
+    bench_parser.add_argument("--baseline", default=None, help="Baseline to compare against (default benchmarks/baseline.json)")
+    bench_parser.add_argument("--update-baseline", action="store_true", help="Overwrite the baseline with this run")
+    bench_parser.add_argument("--latency-tolerance", type=float, default=None, help="Allowed p50 increase, percent")
+    bench_parser.add_argument("--sql-tolerance", type=float, default=None, help="Allowed extra queries per request")
+    bench_parser.add_argument("--memory-tolerance", type=float, default=None, help="Allowed peak memory increase, percent")
+    startup_parser = subparsers.add_parser("startup-profile", help="Time cold starts and break down import cost")
+    startup_parser.add_argument("--runs", type=int, default=3, help="Cold starts to time (default 3)")
+    startup_parser.add_argument("--top", type=int, default=10, help="Rows per breakdown (default 10)")
+    startup_parser.add_argument("--target-ms", type=float, default=None, help="Fail above this (default STARTUP_TARGET_MS)")
+    startup_parser.add_argument("--out", default=None, help="Also write the profile as JSON")
+    slow_parser = subparsers.add_parser("slow-queries", help="Summarize the slow query log")
+    slow_parser.add_argument("--limit", type=int, default=10, help="Number of queries to show (default 10)")
+    slow_parser.add_argument("--sort", choices=["total", "max", "count"], default="total", help="Ranking key")
 
     args = parser.parse_args()
 
     commands = {
         "run": cmd_run,
+        "serve": cmd_serve,
         "seed": cmd_seed,
         "migrate": cmd_migrate,
         "check": cmd_check,
+        "bench": cmd_bench,
+        "slow-queries": cmd_slow_queries,
+        "startup-profile": cmd_startup_profile,
     }
 
     if args.command in commands:
         commands[args.command](args)
     else:
         parser.print_help()
-        print("\nAvailable commands: run, seed, migrate, check")
+        print("\nAvailable commands: run, serve, seed, migrate, check, bench, slow-queries, startup-profile")
         print("Example: python manage.py run")
         sys.exit(1)
 
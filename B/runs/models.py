@@ -36,3 +36,37 @@ class Run(Base):
 
     def __repr__(self):
         return f"<Run id={self.id} experiment_id={self.experiment_id} status={self.status.value}>"
+
+
+class RunMetricBucket(Base):
+    """One bucket of an experiment's metric sketch: how many runs had a value in that bucket.
+
+    Rows for one (experiment_id, metric) together form a DDSketch (see shared/sketch.py).
+    """
+
+    __tablename__ = "run_metric_buckets"
+
+    experiment_id = Column(Integer, ForeignKey("experiments.id"), primary_key=True)
+    metric = Column(String(20), primary_key=True)
+    bucket = Column(Integer, primary_key=True)
+    count = Column(Integer, nullable=False, default=0)
+
+
+class RunMetricRollup(Base):
+    """Per-experiment, per-metric totals for one hour or day of runs (see shared/rollup.py).
+
+    `bucket` is the formatted bucket start ("2026-03-03 14:00" or "2026-03-03") so incremental
+    upserts and set-based rebuilds produce identical keys.
+    """
+
+    __tablename__ = "run_metric_rollups"
+
+    experiment_id = Column(Integer, ForeignKey("experiments.id"), primary_key=True)
+    metric = Column(String(20), primary_key=True)
+    granularity = Column(String(10), primary_key=True)
+    bucket = Column(String(16), primary_key=True)
+    count = Column(Integer, nullable=False, default=0)
+    sum = Column(Float, nullable=False, default=0.0)
+    sum_sq = Column(Float, nullable=False, default=0.0)
+    min = Column(Float, nullable=True)
+    max = Column(Float, nullable=True)
@@ -1,34 +1,55 @@
 # runs/routes.py
 # API and HTML routes for logging runs and comparing metrics.
 # Why: Co-locates all run endpoints; agents find them by folder name.
-# Relevant files: runs/models.py, runs/schemas.py, runs/templates/, experiments/models.py
+# Relevant files: runs/models.py, runs/schemas.py, runs/templates/, experiments/models.py, shared/coalesce.py
 
 from __future__ import annotations
 
 import json
-import os
+from typing import Literal
 
-from fastapi import APIRouter, Depends, HTTPException, Request
+from fastapi import APIRouter, Depends, HTTPException, Query, Request
 from fastapi.responses import HTMLResponse
-from fastapi.templating import Jinja2Templates
-from sqlalchemy.orm import Session
+from markupsafe import Markup
+from sqlalchemy import func
+from sqlalchemy.orm import Session, load_only
 
 from experiments.models import Experiment
 from runs.models import Run
-from runs.schemas import RunCreate, RunResponse
+from runs.schemas import RunCreate, RunPage, RunResponse, RunSortField, RunSummary
+from shared.coalesce import coalesced
+from shared.config import RUN_PAGE_DEFAULT_LIMIT, RUN_PAGE_MAX_LIMIT
 from shared.db import get_db
+from shared.rendering import env, format_metric, row_fragments, templates
+from shared.rollup import record_rollups
+from shared.routing import InstrumentedRoute
+from shared.sketch import record_runs
 
-router = APIRouter()
-
-_template_dir = os.path.join(os.path.dirname(__file__), "templates")
-_shared_template_dir = os.path.join(os.path.dirname(__file__), "..", "shared", "templates")
-templates = Jinja2Templates(directory=[_template_dir, _shared_template_dir])
+router = APIRouter(route_class=InstrumentedRoute)
 
 
 def _format_dt(dt) -> str:
     return dt.strftime("%Y-%m-%d %H:%M") if dt else ""
 
 
+def _compare_row_html(run) -> Markup:
+    """Render one metrics-comparison row, reusing the cached fragment while the run is unchanged."""
+    status = run.status.value
+    key = ("runs/_compare_row.html", run.id, run.name, status, run.accuracy, run.loss, run.latency_ms)
+    return row_fragments.get_or_render(
+        key,
+        lambda: env.get_template("runs/_compare_row.html").render(
+            run={
+                "name": run.name or f"Run #{run.id}",
+                "accuracy_fmt": format_metric(run.accuracy),
+                "loss_fmt": format_metric(run.loss),
+                "latency_fmt": format_metric(run.latency_ms, ".1f", "ms"),
+                "status": status,
+            }
+        ),
+    )
+
+
 # --- API Routes ---
 
 
@@ -56,6 +77,9 @@ def create_run(experiment_id: int, payload: RunCreate, db: Session = Depends(get
         status=payload.status,
     )
     db.add(run)
+    db.flush()  # assigns created_at, which picks the rollup buckets
+    record_runs(db, [run])
+    record_rollups(db, [run])
     db.commit()
     db.refresh(run)
     return RunResponse(
@@ -72,6 +96,62 @@ def create_run(experiment_id: int, payload: RunCreate, db: Session = Depends(get
     )
 
 
+@coalesced
+def _run_page(db: Session, experiment_id: int, offset: int, limit: int, sort: str, order: str) -> RunPage:
+    if not db.query(Experiment.id).filter(Experiment.id == experiment_id).first():
+        raise HTTPException(
+            status_code=404,
+            detail=f"Experiment {experiment_id} not found. Check the ID and try again.",
+        )
+    total = db.query(func.count(Run.id)).filter(Run.experiment_id == experiment_id).scalar()
+    column = getattr(Run, sort)
+    direction = column.desc() if order == "desc" else column.asc()
+    rows = (
+        db.query(Run.id, Run.name, Run.status, Run.accuracy, Run.loss, Run.latency_ms, Run.created_at)
+        .filter(Run.experiment_id == experiment_id)
+        .order_by(direction, Run.id.asc())
+        .offset(offset)
+        .limit(limit)
+        .all()
+    )
+    return RunPage(
+        total=total,
+        offset=offset,
+        limit=limit,
+        sort=sort,
+        order=order,
+        runs=[
+            RunSummary(
+                id=row.id,
+                name=row.name or f"Run #{row.id}",
+                status=row.status,
+                accuracy=row.accuracy,
+                loss=row.loss,
+                latency_ms=row.latency_ms,
+                created_at=_format_dt(row.created_at),
+            )
+            for row in rows
+        ],
+    )
+
+
+@router.get("/api/experiments/{experiment_id}/runs", response_model=RunPage)
+def list_runs(
+    request: Request,
+    experiment_id: int,
+    offset: int = Query(default=0, ge=0),
+    limit: int = Query(default=RUN_PAGE_DEFAULT_LIMIT, ge=1, le=RUN_PAGE_MAX_LIMIT),
+    sort: RunSortField = "id",
+    order: Literal["asc", "desc"] = "asc",
+):
+    """List one page of an experiment's runs, sorted by a metric or column.
+
+    Backs the virtual-scrolling runs table on the experiment detail page.
+    Returns 404 if the experiment does not exist. Returns 422 for an unknown sort field.
+    """
+    return _run_page(request, experiment_id=experiment_id, offset=offset, limit=limit, sort=sort, order=order)
+
+
 @router.get("/api/experiments/{experiment_id}/runs/{run_id}", response_model=RunResponse)
 def get_run(experiment_id: int, run_id: int, db: Session = Depends(get_db)):
     """Get details for a specific run.
@@ -113,7 +193,7 @@ def run_detail_page(request: Request, experiment_id: int, run_id: int, db: Sessi
     experiment = db.query(Experiment).filter(Experiment.id == experiment_id).first()
     hp = json.loads(run.hyperparameters) if run.hyperparameters else {}
     return templates.TemplateResponse(
-        "detail.html",
+        "runs/detail.html",
         {
             "request": request,
             "experiment": {"id": experiment.id, "name": experiment.name},
@@ -123,11 +203,11 @@ def run_detail_page(request: Request, experiment_id: int, run_id: int, db: Sessi
                 "hyperparameters": hp,
                 "hyperparameters_str": json.dumps(hp, indent=2),
                 "accuracy": run.accuracy,
-                "accuracy_fmt": f"{run.accuracy:.4f}" if run.accuracy else "N/A",
+                "accuracy_fmt": format_metric(run.accuracy),
                 "loss": run.loss,
-                "loss_fmt": f"{run.loss:.4f}" if run.loss else "N/A",
+                "loss_fmt": format_metric(run.loss),
                 "latency_ms": run.latency_ms,
-                "latency_fmt": f"{run.latency_ms:.1f}ms" if run.latency_ms else "N/A",
+                "latency_fmt": format_metric(run.latency_ms, ".1f", "ms"),
                 "status": run.status.value,
                 "notes": run.notes,
                 "created_at": _format_dt(run.created_at),
@@ -136,17 +216,31 @@ def run_detail_page(request: Request, experiment_id: int, run_id: int, db: Sessi
     )
 
 
-@router.get("/experiments/{experiment_id}/compare", response_class=HTMLResponse)
-def compare_runs_page(request: Request, experiment_id: int, db: Session = Depends(get_db)):
-    """Render the run comparison page with side-by-side metrics and charts."""
-    experiment = db.query(Experiment).filter(Experiment.id == experiment_id).first()
+@coalesced
+def _compare_page_data(db: Session, experiment_id: int) -> dict:
+    """Only the columns the page shows are loaded; run notes and the description are never read."""
+    experiment = (
+        db.query(Experiment)
+        .options(load_only(Experiment.id, Experiment.name))
+        .filter(Experiment.id == experiment_id)
+        .first()
+    )
     if not experiment:
         raise HTTPException(
             status_code=404,
             detail=f"Experiment {experiment_id} not found.",
         )
+    runs = (
+        db.query(Run)
+        .options(
+            load_only(Run.id, Run.name, Run.hyperparameters, Run.accuracy, Run.loss, Run.latency_ms, Run.status)
+        )
+        .filter(Run.experiment_id == experiment_id)
+        .order_by(Run.id)
+    )
     runs_data = []
-    for run in experiment.runs:
+    metric_rows = []
+    for run in runs:
         hp = json.loads(run.hyperparameters) if run.hyperparameters else {}
         runs_data.append(
             {
@@ -154,31 +248,31 @@ def compare_runs_page(request: Request, experiment_id: int, db: Session = Depend
                 "name": run.name or f"Run #{run.id}",
                 "hyperparameters": hp,
                 "accuracy": run.accuracy,
-                "accuracy_fmt": f"{run.accuracy:.4f}" if run.accuracy else "N/A",
                 "loss": run.loss,
-                "loss_fmt": f"{run.loss:.4f}" if run.loss else "N/A",
                 "latency_ms": run.latency_ms,
-                "latency_fmt": f"{run.latency_ms:.1f}ms" if run.latency_ms else "N/A",
-                "status": run.status.value,
-                "created_at": _format_dt(run.created_at),
             }
         )
+        metric_rows.append(_compare_row_html(run))
 
     all_hp_keys = set()
     for r in runs_data:
         all_hp_keys.update(r["hyperparameters"].keys())
     all_hp_keys = sorted(all_hp_keys)
 
-    return templates.TemplateResponse(
-        "compare.html",
-        {
-            "request": request,
-            "experiment": {"id": experiment.id, "name": experiment.name},
-            "runs": runs_data,
-            "hp_keys": all_hp_keys,
-            "run_labels": json.dumps([r["name"] for r in runs_data]),
-            "run_accuracies": json.dumps([r["accuracy"] for r in runs_data]),
-            "run_losses": json.dumps([r["loss"] for r in runs_data]),
-            "run_latencies": json.dumps([r["latency_ms"] for r in runs_data]),
-        },
-    )
+    return {
+        "experiment": {"id": experiment.id, "name": experiment.name},
+        "runs": runs_data,
+        "metric_rows": metric_rows,
+        "hp_keys": all_hp_keys,
+        "run_labels": json.dumps([r["name"] for r in runs_data]),
+        "run_accuracies": json.dumps([r["accuracy"] for r in runs_data]),
+        "run_losses": json.dumps([r["loss"] for r in runs_data]),
+        "run_latencies": json.dumps([r["latency_ms"] for r in runs_data]),
+    }
+
+
+@router.get("/experiments/{experiment_id}/compare", response_class=HTMLResponse)
+def compare_runs_page(request: Request, experiment_id: int):
+    """Render the run comparison page with side-by-side metrics and charts."""
+    data = _compare_page_data(request, experiment_id=experiment_id)
+    return templates.TemplateResponse("runs/compare.html", {"request": request, **data})
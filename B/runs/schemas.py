@@ -4,7 +4,7 @@
 # Relevant files: runs/models.py, runs/routes.py
 
 from datetime import datetime
-from typing import Optional
+from typing import Literal, Optional
 
 from pydantic import BaseModel, Field
 
@@ -34,3 +34,58 @@ class RunResponse(BaseModel):
     created_at: datetime
 
     model_config = {"from_attributes": True}
+
+
+RunSortField = Literal["id", "name", "status", "accuracy", "loss", "latency_ms", "created_at"]
+
+
+class RunSummary(BaseModel):
+    id: int
+    name: str
+    status: RunStatus
+    accuracy: Optional[float] = None
+    loss: Optional[float] = None
+    latency_ms: Optional[float] = None
+    created_at: str
+
+
+class RunPage(BaseModel):
+    total: int
+    offset: int
+    limit: int
+    sort: RunSortField
+    order: Literal["asc", "desc"]
+    runs: list[RunSummary]
+
+
+class HistogramBin(BaseModel):
+    low: float
+    high: float
+    count: int
+
+
+class MetricDistribution(BaseModel):
+    metric: str
+    count: int
+    relative_accuracy: float = Field(description="Percentiles, min and max are within this relative error")
+    min: Optional[float] = None
+    max: Optional[float] = None
+    percentiles: dict[str, Optional[float]] = Field(default_factory=dict)
+    histogram: list[HistogramBin] = Field(default_factory=list)
+
+
+class TrendPoint(BaseModel):
+    bucket: str = Field(description="Bucket start: 'YYYY-MM-DD HH:00' (hour) or 'YYYY-MM-DD' (day)")
+    count: int
+    mean: float
+    min: float
+    max: float
+    stddev: float
+
+
+class MetricTrend(BaseModel):
+    experiment_id: int
+    metric: str
+    granularity: Literal["hour", "day"]
+    days: int
+    points: list[TrendPoint]
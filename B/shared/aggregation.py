@@ -0,0 +1,131 @@
+# shared/aggregation.py
+# Run metric aggregation pushed into SQL: count/mean/min/max/range and percentiles, grouped, in one query.
+# Why: Loading every run to average it in Python costs one ORM object per run per request.
+# Relevant files: experiments/routes.py (stats endpoint, list/detail), manage.py (dashboard), runs/models.py
+
+from datetime import datetime, timedelta
+
+from sqlalchemy import and_, case, func
+from sqlalchemy.orm import Session
+
+from runs.models import Run
+from tags.models import Tag
+
+METRICS = ("accuracy", "loss", "latency_ms")
+GROUP_BY = ("experiment", "tag", "day", "week", "month")
+_TIME_BUCKETS = {"day": "%Y-%m-%d", "week": "%Y-W%W", "month": "%Y-%m"}
+
+
+def _group_column(group_by):
+    if group_by is None:
+        return None
+    if group_by == "experiment":
+        return Run.experiment_id
+    if group_by == "tag":
+        return Tag.name
+    return func.strftime(_TIME_BUCKETS[group_by], Run.created_at)
+
+
+def _source(db: Session, columns, group_by, experiment_ids, window_days):
+    query = db.query(*columns).select_from(Run)
+    if group_by == "tag":
+        query = query.join(Tag, Tag.experiment_id == Run.experiment_id)
+    if experiment_ids is not None:
+        query = query.filter(Run.experiment_id.in_(experiment_ids))
+    if window_days:
+        query = query.filter(Run.created_at >= datetime.utcnow() - timedelta(days=window_days))
+    return query
+
+
+def aggregate(
+    db: Session,
+    metrics=METRICS,
+    experiment_ids=None,
+    group_by=None,
+    window_days=None,
+    percentiles=(),
+) -> list[dict]:
+    """Aggregate run metrics in a single SQL statement.
+
+    Returns one dict per group (a single group keyed None when `group_by` is None):
+    {"group", "runs", "metrics": {name: {"count", "mean", "min", "max", "range", "percentiles"}}}.
+    Percentiles are nearest-rank, computed with row_number()/count() window functions in
+    the same statement. NULL metric values are ignored, as AVG/MIN/MAX do.
+    """
+    unknown = [m for m in metrics if m not in METRICS]
+    if unknown:
+        raise ValueError(f"Unknown metric(s): {', '.join(unknown)}. Available: {', '.join(METRICS)}")
+    if group_by is not None and group_by not in GROUP_BY:
+        raise ValueError(f"Unknown group_by {group_by!r}. Available: {', '.join(GROUP_BY)}")
+    if any(not 0 < p <= 100 for p in percentiles):
+        raise ValueError("Percentiles must be in (0, 100].")
+
+    group = _group_column(group_by)
+    group_cols = [group.label("group")] if group is not None else []
+    if percentiles:
+        # Rank each metric within its group (NULLs last) so the outer query can pick ranks.
+        ranked = list(group_cols)
+        for m in metrics:
+            col = getattr(Run, m)
+            ranked += [
+                col.label(m),
+                func.row_number().over(partition_by=group, order_by=(col.is_(None), col)).label(f"{m}_rank"),
+                func.count(col).over(partition_by=group).label(f"{m}_n"),
+            ]
+        sub = _source(db, ranked, group_by, experiment_ids, window_days).subquery()
+        values = {m: sub.c[m] for m in metrics}
+        group = sub.c.group if group is not None else None
+        query = db.query(*([group] if group is not None else []), func.count().label("runs")).select_from(sub)
+    else:
+        values = {m: getattr(Run, m) for m in metrics}
+        query = _source(db, [*group_cols, func.count().label("runs")], group_by, experiment_ids, window_days)
+
+    for m, col in values.items():
+        query = query.add_columns(func.count(col), func.avg(col), func.min(col), func.max(col))
+        for p in percentiles:
+            # Nearest rank is ceil(p * n / 100): the one integer rank in [p*n/100, p*n/100 + 1).
+            target = sub.c[f"{m}_n"] * p / 100.0
+            rank = sub.c[f"{m}_rank"]
+            query = query.add_columns(func.min(case((and_(rank >= target, rank < target + 1), col))))
+    if group is not None:
+        query = query.group_by(group).order_by(group)
+
+    groups = []
+    for row in query.all():
+        row = list(row)
+        key = row.pop(0) if group is not None else None
+        result = {"group": key, "runs": row.pop(0), "metrics": {}}
+        for m in metrics:
+            count, mean, low, high = row[:4]
+            pcts = row[4 : 4 + len(percentiles)]
+            del row[: 4 + len(percentiles)]
+            result["metrics"][m] = {
+                "count": count,
+                "mean": mean,
+                "min": low,
+                "max": high,
+                "range": high - low if count else None,
+                "percentiles": {f"p{p:g}": v for p, v in zip(percentiles, pcts)},
+            }
+        groups.append(result)
+    return groups
+
+
+def experiment_summaries(db: Session, experiment_ids=None) -> dict:
+    """Return {experiment_id: {"total_runs", "avg_accuracy", "best_accuracy", "avg_loss"}} from one query.
+
+    Experiments without runs are absent; use `empty_summary()` for them.
+    """
+    summaries = {}
+    for group in aggregate(db, ("accuracy", "loss"), experiment_ids=experiment_ids, group_by="experiment"):
+        summaries[group["group"]] = {
+            "total_runs": group["runs"],
+            "avg_accuracy": group["metrics"]["accuracy"]["mean"],
+            "best_accuracy": group["metrics"]["accuracy"]["max"],
+            "avg_loss": group["metrics"]["loss"]["mean"],
+        }
+    return summaries
+
+
+def empty_summary() -> dict:
+    return {"total_runs": 0, "avg_accuracy": None, "best_accuracy": None, "avg_loss": None}
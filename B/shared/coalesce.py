@@ -0,0 +1,99 @@
+# shared/coalesce.py
+# Single-flight request coalescing: concurrent identical reads share one in-flight computation.
+# Why: When a popular experiment finishes, many people open the same pages at once; each would load every run again.
+# Relevant files: shared/instrumentation.py (coalesce_requests_total), experiments/routes.py, runs/routes.py
+
+import asyncio
+from functools import wraps
+
+from anyio import from_thread
+from starlette.concurrency import run_in_threadpool
+from starlette.requests import Request
+
+from shared.db import get_db
+from shared.instrumentation import current_request_stats, registry
+
+
+class SingleFlight:
+    """Async-aware single-flight group: at most one computation per key runs at a time.
+
+    Callers that arrive while a computation for their key is running wait for it and
+    get its result (or its exception) instead of starting their own. Nothing is cached:
+    once it finishes, the next caller computes again. So a reader can see a result
+    that started just before its own request, never one older than that.
+    """
+
+    def __init__(self):
+        self._inflight: dict = {}
+
+    async def do(self, key, fn) -> tuple:
+        """Await `fn()` (an async callable) once per in-flight key. Returns (result, shared)."""
+        # Futures belong to one event loop; test clients and benchmarks may run several.
+        key = (asyncio.get_running_loop(), key)
+        task = self._inflight.get(key)
+        shared = task is not None
+        if task is None:
+            task = asyncio.ensure_future(fn())
+            self._inflight[key] = task
+            task.add_done_callback(lambda done: self._finished(key, done))
+        # Shielded, so a caller that disconnects doesn't cancel the work the others are waiting on.
+        return await asyncio.shield(task), shared
+
+    def _finished(self, key, task):
+        if self._inflight.get(key) is task:
+            del self._inflight[key]
+        if not task.cancelled():
+            task.exception()  # mark retrieved, even if every waiter went away
+
+    def __len__(self) -> int:
+        return len(self._inflight)
+
+
+flights = SingleFlight()
+
+
+def _hashable(value):
+    return tuple(value) if isinstance(value, list) else value
+
+
+def _run_with_own_session(request: Request, load, params: dict):
+    """Call `load(db, **params)` with a session opened and closed here, not by any one request.
+
+    Goes through the app's get_db (or its test override) so tests still see their database.
+    """
+    factory = request.app.dependency_overrides.get(get_db, get_db)
+    sessions = factory()
+    db = next(sessions)
+    try:
+        return load(db, **params)
+    finally:
+        sessions.close()
+
+
+def coalesced(load):
+    """Coalesce concurrent calls of a sync data loader `load(db, **params)` with the same params.
+
+    The decorated function is called from a sync endpoint as `load(request, **params)`. The
+    first caller starts the load on its own DB session in the threadpool; callers that arrive
+    while it runs wait for it and get the same return value (or exception). Loaders return
+    plain data (dicts, pydantic models, encoded bytes), never ORM objects or Responses: each
+    endpoint builds its own response from the shared result. The session is closed when the
+    load finishes, so a disconnecting caller never pulls it out from under the others.
+    Profiled requests are not coalesced; they load inline, in the endpoint's own thread.
+    """
+
+    @wraps(load)
+    def wrapper(request: Request, **params):
+        stats = current_request_stats()
+        if stats is not None and stats.profile:
+            return _run_with_own_session(request, load, params)
+        key = (load.__module__, load.__qualname__, tuple(sorted((k, _hashable(v)) for k, v in params.items())))
+        # Endpoints run in threadpool workers; hop to the event loop to join or start the flight.
+        result, shared = from_thread.run(
+            flights.do, key, lambda: run_in_threadpool(_run_with_own_session, request, load, params)
+        )
+        if stats is not None:
+            registry.observe_coalesce(stats.method, stats.route, shared)
+        return result
+
+    return wrapper
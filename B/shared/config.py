@@ -7,7 +7,49 @@ import os
 
 BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
 DB_PATH = os.path.join(BASE_DIR, "tracker.db")
-DATABASE_URL = f"sqlite:///{DB_PATH}"
+# Override to point a process at another database (startup-profile uses a throwaway one).
+DATABASE_URL = os.environ.get("TRACKER_DATABASE_URL", f"sqlite:///{DB_PATH}")
 
-HOST = "0.0.0.0"
-PORT = 8000
+HOST = os.environ.get("TRACKER_HOST", "0.0.0.0")
+PORT = int(os.environ.get("TRACKER_PORT", "8000"))
+
+# `python manage.py serve` (multi-process). Workers default to one per core; each exits after
+# SERVE_MAX_REQUESTS requests and is replaced, and gets SERVE_GRACEFUL_TIMEOUT_S to finish
+# in-flight requests on shutdown or reload (SIGHUP).
+SERVE_WORKERS = os.cpu_count() or 1
+SERVE_MAX_REQUESTS = 10000
+SERVE_GRACEFUL_TIMEOUT_S = 30
+
+# SQLite settings applied to every connection (see shared/db.py). WAL lets worker processes
+# read while one writes; writers wait up to the busy timeout instead of failing with "locked".
+SQLITE_BUSY_TIMEOUT_MS = 5000
+SQLITE_SYNCHRONOUS = "NORMAL"
+
+# Compiled Jinja2 bytecode is written here so restarts skip template parsing.
+TEMPLATE_CACHE_DIR = os.path.join(BASE_DIR, ".template_cache")
+# Max number of rendered table-row fragments kept in memory (see shared/rendering.py).
+FRAGMENT_CACHE_SIZE = 20000
+
+# Experiment detail page: the runs table is paged from the API, charts are downsampled.
+RUN_PAGE_DEFAULT_LIMIT = 100
+RUN_PAGE_MAX_LIMIT = 500
+CHART_MAX_POINTS = 1000
+
+# ?profile=1 returns the endpoint's call tree (file paths included) and runs the profiler on
+# the caller's behalf, so it is off unless a developer turns it on with TRACKER_PROFILING=1.
+PROFILING_ENABLED = os.environ.get("TRACKER_PROFILING") == "1"
+
+# Slow query log (see shared/slowlog.py and `python manage.py slow-queries`). Every serve worker
+# appends to the same file, so it is rotated externally (logrotate with `rotate 5`, no dateext):
+# writers reopen it after a move, and slow-queries reads path.1 .. path.SLOW_QUERY_LOG_BACKUPS too.
+SLOW_QUERY_THRESHOLD_MS = 100
+SLOW_QUERY_LOG_PATH = os.path.join(BASE_DIR, "slow_queries.log")
+SLOW_QUERY_LOG_BACKUPS = 5
+
+# Per-experiment metric sketches (see shared/sketch.py). Quantiles are within this relative
+# error. Changing it changes the bucket layout: run `python manage.py migrate --rebuild-sketches`.
+SKETCH_RELATIVE_ACCURACY = 0.01
+
+# Cold start budget for `python manage.py startup-profile`: fresh interpreter to a started app
+# (imports, create_app, schema check, template precompile). Measured ~1.2-1.3s on a dev laptop.
+STARTUP_TARGET_MS = 1500
@@ -1,14 +1,37 @@
 # shared/db.py
 # Database engine, session factory, and dependency injection.
 # Why: Single source of truth for DB connections; all routes use get_db().
-# Relevant files: shared/config.py, shared/base.py, experiments/models.py, runs/models.py
+# Relevant files: shared/config.py, shared/base.py, manage.py (serve), experiments/models.py, runs/models.py
 
-from sqlalchemy import create_engine
+from sqlalchemy import create_engine, event
 from sqlalchemy.orm import sessionmaker
 
-from shared.config import DATABASE_URL
+from shared.config import DATABASE_URL, SQLITE_BUSY_TIMEOUT_MS, SQLITE_SYNCHRONOUS
+from shared.instrumentation import instrument_engine
+
+
+def _set_sqlite_pragmas(dbapi_connection, connection_record):
+    cursor = dbapi_connection.cursor()
+    # busy_timeout first, so switching to WAL waits for another process's lock instead of failing.
+    cursor.execute(f"PRAGMA busy_timeout={int(SQLITE_BUSY_TIMEOUT_MS)}")
+    cursor.execute("PRAGMA journal_mode=WAL")
+    cursor.execute(f"PRAGMA synchronous={SQLITE_SYNCHRONOUS}")
+    cursor.close()
+
+
+def configure_sqlite(engine):
+    """Apply the multi-process SQLite settings to every new connection (safe to call more than once).
+
+    journal_mode=WAL is stored in the database file, so every process sees the same mode;
+    busy_timeout and synchronous are per connection, so each worker sets them itself.
+    """
+    if not event.contains(engine, "connect", _set_sqlite_pragmas):
+        event.listen(engine, "connect", _set_sqlite_pragmas)
+
 
 engine = create_engine(DATABASE_URL, connect_args={"check_same_thread": False})
+configure_sqlite(engine)
+instrument_engine(engine)
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
 
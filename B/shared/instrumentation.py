@@ -0,0 +1,329 @@
+# shared/instrumentation.py
+# Per-request latency, SQL, and template render metrics, plus opt-in ?profile=1 call trees.
+# Why: Shows which routes are slow and whether the time goes to SQL, templates, or Python.
+# Relevant files: shared/db.py, shared/rendering.py, shared/routing.py, shared/coalesce.py, manage.py (/api/metrics)
+
+import asyncio
+import cProfile
+import io
+import pstats
+import threading
+import time
+from contextvars import ContextVar
+from functools import wraps
+from typing import Optional
+from urllib.parse import parse_qs
+
+from sqlalchemy import event
+
+from shared import config
+from shared.slowlog import slow_query_log
+
+# Upper bounds (seconds) shared by every histogram; +Inf is implicit.
+LATENCY_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+
+class Histogram:
+    """Cumulative-bucket histogram in the Prometheus style."""
+
+    def __init__(self, buckets=LATENCY_BUCKETS):
+        self.buckets = buckets
+        self.counts = [0] * len(buckets)
+        self.count = 0
+        self.sum = 0.0
+
+    def observe(self, value: float):
+        self.count += 1
+        self.sum += value
+        for i, bound in enumerate(self.buckets):
+            if value <= bound:
+                self.counts[i] += 1
+
+
+class RequestStats:
+    """Counters for the request currently being handled (shared with its threadpool worker)."""
+
+    def __init__(self, scope: Optional[dict] = None, profile: bool = False):
+        self.scope = scope or {}
+        self.profile = profile
+        self.profiler = None
+        self.sql_count = 0
+        self.sql_seconds = 0.0
+
+    @property
+    def method(self) -> str:
+        return self.scope.get("method", "")
+
+    @property
+    def route(self) -> str:
+        """Route template once routing has matched (e.g. "/api/experiments/{experiment_id}")."""
+        return getattr(self.scope.get("route"), "path", "<unmatched>")
+
+
+_current: ContextVar[Optional[RequestStats]] = ContextVar("request_stats", default=None)
+
+
+def current_request_stats() -> Optional[RequestStats]:
+    """Return the stats object of the request being handled, or None outside a request."""
+    return _current.get()
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _labels(**labels) -> str:
+    return ",".join(f'{key}="{_escape(str(value))}"' for key, value in labels.items())
+
+
+class MetricsRegistry:
+    """Process-wide metric store rendered by GET /api/metrics."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        with self._lock:
+            self.request_latency: dict = {}
+            self.requests_total: dict = {}
+            self.sql_statements: dict = {}
+            self.sql_seconds: dict = {}
+            self.template_render: dict = {}
+            self.coalesce_requests: dict = {}
+
+    def observe_request(self, method: str, route: str, status: int, seconds: float, stats: RequestStats):
+        with self._lock:
+            self.request_latency.setdefault((method, route), Histogram()).observe(seconds)
+            key = (method, route, status)
+            self.requests_total[key] = self.requests_total.get(key, 0) + 1
+            self.sql_statements[(method, route)] = self.sql_statements.get((method, route), 0) + stats.sql_count
+            self.sql_seconds[(method, route)] = self.sql_seconds.get((method, route), 0.0) + stats.sql_seconds
+
+    def observe_template(self, template: str, seconds: float):
+        with self._lock:
+            self.template_render.setdefault(template, Histogram()).observe(seconds)
+
+    def observe_coalesce(self, method: str, route: str, shared: bool):
+        with self._lock:
+            key = (method, route, "true" if shared else "false")
+            self.coalesce_requests[key] = self.coalesce_requests.get(key, 0) + 1
+
+    def render_prometheus(self) -> str:
+        """Serialize every metric in the Prometheus text exposition format (0.0.4)."""
+        lines = []
+        with self._lock:
+            lines.append("# HELP http_request_duration_seconds Request latency by route.")
+            lines.append("# TYPE http_request_duration_seconds histogram")
+            for (method, route), hist in sorted(self.request_latency.items()):
+                _histogram_lines(lines, "http_request_duration_seconds", hist, method=method, route=route)
+
+            lines.append("# HELP http_requests_total Requests by route and status code.")
+            lines.append("# TYPE http_requests_total counter")
+            for (method, route, status), value in sorted(self.requests_total.items()):
+                lines.append(f"http_requests_total{{{_labels(method=method, route=route, status=status)}}} {value}")
+
+            lines.append("# HELP sql_statements_total SQL statements executed, by route.")
+            lines.append("# TYPE sql_statements_total counter")
+            for (method, route), value in sorted(self.sql_statements.items()):
+                lines.append(f"sql_statements_total{{{_labels(method=method, route=route)}}} {value}")
+
+            lines.append("# HELP sql_duration_seconds_total Time spent executing SQL, by route.")
+            lines.append("# TYPE sql_duration_seconds_total counter")
+            for (method, route), value in sorted(self.sql_seconds.items()):
+                lines.append(f"sql_duration_seconds_total{{{_labels(method=method, route=route)}}} {value:.6f}")
+
+            lines.append("# HELP template_render_seconds Jinja2 render time by template.")
+            lines.append("# TYPE template_render_seconds histogram")
+            for template, hist in sorted(self.template_render.items()):
+                _histogram_lines(lines, "template_render_seconds", hist, template=template)
+
+            lines.append("# HELP coalesce_requests_total Coalesced requests; shared=\"true\" reused one already in flight.")
+            lines.append("# TYPE coalesce_requests_total counter")
+            for (method, route, shared), value in sorted(self.coalesce_requests.items()):
+                lines.append(f"coalesce_requests_total{{{_labels(method=method, route=route, shared=shared)}}} {value}")
+        return "\n".join(lines) + "\n"
+
+
+def _histogram_lines(lines: list, name: str, hist: Histogram, **labels):
+    for bound, count in zip(hist.buckets, hist.counts):
+        lines.append(f"{name}_bucket{{{_labels(**labels, le=bound)}}} {count}")
+    lines.append(f"{name}_bucket{{{_labels(**labels, le='+Inf')}}} {hist.count}")
+    lines.append(f"{name}_sum{{{_labels(**labels)}}} {hist.sum:.6f}")
+    lines.append(f"{name}_count{{{_labels(**labels)}}} {hist.count}")
+
+
+registry = MetricsRegistry()
+
+
+# --- SQLAlchemy hooks ---
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    conn.info.setdefault("query_start", []).append(time.perf_counter())
+
+
+def _count_statement(conn):
+    elapsed = time.perf_counter() - conn.info["query_start"].pop()
+    stats = _current.get()
+    if stats is not None:
+        stats.sql_count += 1
+        stats.sql_seconds += elapsed
+    return elapsed, stats
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    elapsed, stats = _count_statement(conn)
+    if not executemany:
+        method, route = (stats.method, stats.route) if stats is not None else ("", "<no request>")
+        slow_query_log.maybe_record(conn, cursor, statement, parameters, elapsed, method, route)
+
+
+def _after_cursor_execute_unlogged(conn, cursor, statement, parameters, context, executemany):
+    _count_statement(conn)
+
+
+def instrument_engine(engine, slow_log: bool = True):
+    """Attach SQL timing listeners to an engine (safe to call more than once).
+
+    slow_log=False still counts SQL per request but keeps the engine out of the slow query
+    log: benchmark databases would otherwise fill the production log.
+    """
+    if not event.contains(engine, "before_cursor_execute", _before_cursor_execute):
+        after = _after_cursor_execute if slow_log else _after_cursor_execute_unlogged
+        event.listen(engine, "before_cursor_execute", _before_cursor_execute)
+        event.listen(engine, "after_cursor_execute", after)
+
+
+# --- Profiling ---
+
+
+def _new_profiler():
+    """Prefer pyinstrument's call tree when installed; fall back to cProfile."""
+    try:
+        from pyinstrument import Profiler
+    except ImportError:
+        return cProfile.Profile()
+    return Profiler()
+
+
+def _start(profiler):
+    if isinstance(profiler, cProfile.Profile):
+        profiler.enable()
+    else:
+        profiler.start()
+
+
+def _stop(profiler):
+    if isinstance(profiler, cProfile.Profile):
+        profiler.disable()
+    else:
+        profiler.stop()
+
+
+def profile_report(profiler) -> str:
+    """Render a finished profiler as text: a pyinstrument tree, or cProfile callees by cumulative time."""
+    if not isinstance(profiler, cProfile.Profile):
+        return profiler.output_text(unicode=True, show_all=False)
+    out = io.StringIO()
+    stats = pstats.Stats(profiler, stream=out).sort_stats("cumulative")
+    stats.print_stats(40)
+    stats.print_callees(20)
+    return out.getvalue()
+
+
+def profiled(call):
+    """Wrap an endpoint so it runs under a profiler when the request asked for ?profile=1.
+
+    Sync endpoints run on threadpool workers, and both cProfile and pyinstrument only
+    see the thread that starts them, so profiling has to begin inside the call itself.
+    """
+    if asyncio.iscoroutinefunction(call):
+
+        @wraps(call)
+        async def async_wrapper(*args, **kwargs):
+            stats = _current.get()
+            if stats is None or not stats.profile:
+                return await call(*args, **kwargs)
+            stats.profiler = _new_profiler()
+            _start(stats.profiler)
+            try:
+                return await call(*args, **kwargs)
+            finally:
+                _stop(stats.profiler)
+
+        return async_wrapper
+
+    @wraps(call)
+    def wrapper(*args, **kwargs):
+        stats = _current.get()
+        if stats is None or not stats.profile:
+            return call(*args, **kwargs)
+        stats.profiler = _new_profiler()
+        _start(stats.profiler)
+        try:
+            return call(*args, **kwargs)
+        finally:
+            _stop(stats.profiler)
+
+    return wrapper
+
+
+# --- Middleware ---
+
+
+class InstrumentationMiddleware:
+    """ASGI middleware that records latency and SQL counters per route.
+
+    With ?profile=1 the normal response is discarded and the endpoint's profile
+    is returned as text/plain instead; only when PROFILING_ENABLED, otherwise the
+    parameter is ignored.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        profile = False
+        if config.PROFILING_ENABLED:
+            profile = parse_qs(scope.get("query_string", b"").decode()).get("profile") == ["1"]
+        stats = RequestStats(scope, profile=profile)
+        token = _current.set(stats)
+        status = 500
+        start = time.perf_counter()
+
+        async def send_wrapper(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            if not stats.profile:
+                await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            elapsed = time.perf_counter() - start
+            _current.reset(token)
+            registry.observe_request(stats.method, stats.route, status, elapsed, stats)
+
+        if stats.profile:
+            await self._send_profile(send, stats, stats.method, stats.route, status, elapsed)
+
+    async def _send_profile(self, send, stats: RequestStats, method: str, route: str, status: int, elapsed: float):
+        header = (
+            f"{method} {route} -> {status} in {elapsed * 1000:.1f}ms, "
+            f"{stats.sql_count} SQL statements in {stats.sql_seconds * 1000:.1f}ms\n\n"
+        )
+        body = header + (profile_report(stats.profiler) if stats.profiler else "No endpoint was profiled.\n")
+        payload = body.encode()
+        await send(
+            {
+                "type": "http.response.start",
+                "status": 200,
+                "headers": [(b"content-type", b"text/plain; charset=utf-8"), (b"content-length", str(len(payload)).encode())],
+            }
+        )
+        await send({"type": "http.response.body", "body": payload})
@@ -0,0 +1,136 @@
+# shared/rendering.py
+# Single Jinja2 environment, status badges, and the table-row fragment cache.
+# Why: One template environment with bytecode caching instead of one per router; unchanged rows are never re-rendered.
+# Relevant files: shared/config.py, shared/templates/, experiments/routes.py, runs/routes.py, manage.py
+
+import os
+import threading
+import time
+from collections import OrderedDict
+from functools import lru_cache
+
+from fastapi.templating import Jinja2Templates
+from jinja2 import ChoiceLoader, Environment, FileSystemBytecodeCache, FileSystemLoader, PrefixLoader
+from markupsafe import Markup
+
+from shared.config import BASE_DIR, FRAGMENT_CACHE_SIZE, TEMPLATE_CACHE_DIR
+from shared.instrumentation import registry
+
+# Feature templates are addressed with a package prefix ("experiments/detail.html",
+# "runs/detail.html") so same-named files never shadow each other. Unprefixed names
+# ("base.html", "dashboard.html") fall through to shared/templates/.
+_loader = ChoiceLoader(
+    [
+        PrefixLoader(
+            {
+                "experiments": FileSystemLoader(os.path.join(BASE_DIR, "experiments", "templates")),
+                "runs": FileSystemLoader(os.path.join(BASE_DIR, "runs", "templates")),
+            }
+        ),
+        FileSystemLoader(os.path.join(BASE_DIR, "shared", "templates")),
+    ]
+)
+
+
+class LazyBytecodeCache(FileSystemBytecodeCache):
+    """Bytecode cache that creates its directory on the first write, not when this module is imported."""
+
+    def dump_bytecode(self, bucket) -> None:
+        os.makedirs(self.directory, exist_ok=True)
+        super().dump_bytecode(bucket)
+
+
+env = Environment(
+    loader=_loader,
+    autoescape=True,
+    bytecode_cache=LazyBytecodeCache(TEMPLATE_CACHE_DIR),
+)
+
+
+class _TimedTemplates(Jinja2Templates):
+    """Jinja2Templates that records render time per template (Starlette renders inside TemplateResponse)."""
+
+    def TemplateResponse(self, *args, **kwargs):
+        start = time.perf_counter()
+        response = super().TemplateResponse(*args, **kwargs)
+        registry.observe_template(response.template.name, time.perf_counter() - start)
+        return response
+
+
+templates = _TimedTemplates(env=env)
+
+
+def precompile_templates() -> int:
+    """Compile every template into the in-memory cache (and bytecode cache). Returns the count."""
+    names = env.list_templates()
+    for name in names:
+        env.get_template(name)
+    return len(names)
+
+
+_STATUS_COLORS = {
+    "draft": "#6c757d",
+    "running": "#0d6efd",
+    "completed": "#198754",
+    "failed": "#dc3545",
+    "archived": "#6c757d",
+}
+
+
+@lru_cache(maxsize=None)
+def status_badge(status: str) -> Markup:
+    """Return the colored badge HTML for an experiment or run status value (built once per status)."""
+    color = _STATUS_COLORS.get(status, "#6c757d")
+    return Markup(
+        f'<span style="background-color: {color}; color: white; padding: 2px 8px; '
+        f'border-radius: 4px; font-size: 0.8em;">{status}</span>'
+    )
+
+
+def format_metric(value, spec: str = ".4f", suffix: str = "") -> str:
+    """Format a metric for display, or "N/A" when it is missing (or zero, matching the existing pages)."""
+    return f"{value:{spec}}{suffix}" if value else "N/A"
+
+
+class FragmentCache:
+    """Thread-safe LRU of rendered HTML fragments.
+
+    Keys must include everything the fragment depends on (e.g. a run's id plus
+    its displayed fields), so a changed row simply misses and re-renders.
+    """
+
+    def __init__(self, maxsize: int = FRAGMENT_CACHE_SIZE):
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        self._data: OrderedDict = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get_or_render(self, key, render) -> Markup:
+        """Return the cached fragment for key, calling render() to build it on a miss."""
+        with self._lock:
+            fragment = self._data.get(key)
+            if fragment is not None:
+                self._data.move_to_end(key)
+                self.hits += 1
+                return fragment
+            self.misses += 1
+        fragment = Markup(render())
+        with self._lock:
+            self._data[key] = fragment
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+        return fragment
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+            self.hits = 0
+            self.misses = 0
+
+    def __len__(self):
+        return len(self._data)
+
+
+row_fragments = FragmentCache()
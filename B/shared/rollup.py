@@ -0,0 +1,137 @@
+# shared/rollup.py
+# Hourly and daily metric rollups per experiment (count, sum, sum of squares, min, max), kept on ingest.
+# Why: A 90-day trend chart should read ~90 rollup rows, not scan and filter every run in the window.
+# Relevant files: runs/models.py (RunMetricRollup), runs/routes.py (create_run), experiments/routes.py
+
+import math
+from datetime import datetime, timedelta
+
+from sqlalchemy import delete, func, insert, literal, select
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+
+from runs.models import Run, RunMetricRollup
+from shared.aggregation import METRICS
+
+# Bucket key formats; the same strings are produced in Python (ingest) and SQLite strftime (rebuild).
+GRANULARITIES = {"hour": "%Y-%m-%d %H:00", "day": "%Y-%m-%d"}
+
+
+def _rollup_rows(runs) -> list[dict]:
+    rows = {}
+    for run in runs:
+        created_at = run.created_at or datetime.utcnow()
+        for metric in METRICS:
+            value = getattr(run, metric)
+            if value is None:
+                continue
+            for granularity, fmt in GRANULARITIES.items():
+                key = (run.experiment_id, metric, granularity, created_at.strftime(fmt))
+                row = rows.get(key)
+                if row is None:
+                    rows[key] = {
+                        "experiment_id": key[0],
+                        "metric": metric,
+                        "granularity": granularity,
+                        "bucket": key[3],
+                        "count": 1,
+                        "sum": value,
+                        "sum_sq": value * value,
+                        "min": value,
+                        "max": value,
+                    }
+                else:
+                    row["count"] += 1
+                    row["sum"] += value
+                    row["sum_sq"] += value * value
+                    row["min"] = min(row["min"], value)
+                    row["max"] = max(row["max"], value)
+    return list(rows.values())
+
+
+def record_rollups(conn, runs):
+    """Fold new runs into their hourly and daily buckets. Call in the transaction that inserts the runs."""
+    rows = _rollup_rows(runs)
+    if not rows:
+        return
+    stmt = sqlite_insert(RunMetricRollup)
+    excluded = stmt.excluded
+    # Two-argument min()/max() are SQLite's scalar functions, so the merge happens in one atomic upsert.
+    stmt = stmt.on_conflict_do_update(
+        index_elements=["experiment_id", "metric", "granularity", "bucket"],
+        set_={
+            "count": RunMetricRollup.count + excluded["count"],
+            "sum": RunMetricRollup.sum + excluded["sum"],
+            "sum_sq": RunMetricRollup.sum_sq + excluded["sum_sq"],
+            "min": func.min(RunMetricRollup.min, excluded["min"]),
+            "max": func.max(RunMetricRollup.max, excluded["max"]),
+        },
+    )
+    conn.execute(stmt, rows)
+
+
+def rebuild_rollups(conn, experiment_ids=None):
+    """Recompute rollups from the runs table with one INSERT ... SELECT per metric and granularity.
+
+    `experiment_ids` (a list or a subquery) limits the rebuild; None rebuilds every experiment.
+    """
+    clear = delete(RunMetricRollup)
+    if experiment_ids is not None:
+        clear = clear.where(RunMetricRollup.experiment_id.in_(experiment_ids))
+    conn.execute(clear)
+    for metric in METRICS:
+        value = getattr(Run, metric)
+        for granularity, fmt in GRANULARITIES.items():
+            bucket = func.strftime(fmt, Run.created_at)
+            source = (
+                select(
+                    Run.experiment_id,
+                    literal(metric),
+                    literal(granularity),
+                    bucket,
+                    func.count(value),
+                    func.sum(value),
+                    func.sum(value * value),
+                    func.min(value),
+                    func.max(value),
+                )
+                .where(value.is_not(None), Run.created_at.is_not(None))
+                .group_by(Run.experiment_id, bucket)
+            )
+            if experiment_ids is not None:
+                source = source.where(Run.experiment_id.in_(experiment_ids))
+            conn.execute(
+                insert(RunMetricRollup).from_select(
+                    ["experiment_id", "metric", "granularity", "bucket", "count", "sum", "sum_sq", "min", "max"],
+                    source,
+                )
+            )
+
+
+def trend(db, experiment_id: int, metric: str, granularity: str, days: int) -> list[dict]:
+    """Per-bucket count/mean/min/max/stddev for the last `days` days, oldest first, read from rollups only."""
+    if metric not in METRICS:
+        raise ValueError(f"Unknown metric {metric!r}. Available: {', '.join(METRICS)}")
+    if granularity not in GRANULARITIES:
+        raise ValueError(f"Unknown granularity {granularity!r}. Available: {', '.join(GRANULARITIES)}")
+    since = (datetime.utcnow() - timedelta(days=days)).strftime(GRANULARITIES[granularity])
+    rows = db.query(RunMetricRollup).filter(
+        RunMetricRollup.experiment_id == experiment_id,
+        RunMetricRollup.metric == metric,
+        RunMetricRollup.granularity == granularity,
+        RunMetricRollup.bucket >= since,
+    ).order_by(RunMetricRollup.bucket)
+    points = []
+    for row in rows:
+        mean = row.sum / row.count
+        points.append(
+            {
+                "bucket": row.bucket,
+                "count": row.count,
+                "mean": mean,
+                "min": row.min,
+                "max": row.max,
+                # Population stddev from the running sums; clamp float error below zero.
+                "stddev": math.sqrt(max(0.0, row.sum_sq / row.count - mean * mean)),
+            }
+        )
+    return points
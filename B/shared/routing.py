@@ -0,0 +1,16 @@
+# shared/routing.py
+# APIRoute subclass that lets any endpoint be profiled with ?profile=1.
+# Why: Kept apart from shared/instrumentation.py so importing the DB layer (CLI commands) doesn't import FastAPI.
+# Relevant files: shared/instrumentation.py, experiments/routes.py, runs/routes.py, tags/routes.py, exports/routes.py
+
+from fastapi.routing import APIRoute
+
+from shared.instrumentation import profiled
+
+
+class InstrumentedRoute(APIRoute):
+    """APIRoute whose endpoint can be profiled per request. Use as APIRouter(route_class=...)."""
+
+    def get_route_handler(self):
+        self.dependant.call = profiled(self.dependant.call)
+        return super().get_route_handler()
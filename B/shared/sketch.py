@@ -0,0 +1,158 @@
+# shared/sketch.py
+# Mergeable metric sketches (DDSketch) kept per experiment, for instant percentiles and histograms.
+# Why: Exact percentiles need every value sorted; the sketch answers from a few hundred bucket counts.
+# Relevant files: runs/models.py (RunMetricBucket), runs/routes.py (create_run), shared/synthetic.py
+
+import math
+from collections import Counter
+
+from sqlalchemy import delete, func, select
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+
+from runs.models import Run, RunMetricBucket
+from shared.aggregation import METRICS
+from shared.config import SKETCH_RELATIVE_ACCURACY
+
+# Values at or below this (metrics are never negative) all land in the zero bucket.
+MIN_INDEXABLE = 1e-9
+ZERO_BUCKET = -(2**31)
+REBUILD_BATCH_SIZE = 10000
+
+
+class DDSketch:
+    """Log-bucketed quantile sketch: every quantile is within `relative_accuracy` of the true value.
+
+    Buckets are plain counts keyed by index, so merging two sketches (or SUMming their rows
+    in SQL) gives exactly the sketch of the combined data.
+    """
+
+    def __init__(self, relative_accuracy: float = SKETCH_RELATIVE_ACCURACY, counts=None):
+        self.relative_accuracy = relative_accuracy
+        self.gamma = (1 + relative_accuracy) / (1 - relative_accuracy)
+        self._log_gamma = math.log(self.gamma)
+        self.counts = Counter(counts or {})
+
+    def key(self, value: float) -> int:
+        if value <= MIN_INDEXABLE:
+            return ZERO_BUCKET
+        return math.ceil(math.log(value) / self._log_gamma)
+
+    def value(self, key: int) -> float:
+        """Representative value of a bucket (relative error <= relative_accuracy for anything in it)."""
+        if key == ZERO_BUCKET:
+            return 0.0
+        return 2 * self.gamma**key / (self.gamma + 1)
+
+    def add(self, value: float, count: int = 1):
+        self.counts[self.key(value)] += count
+
+    def merge(self, other: "DDSketch"):
+        self.counts.update(other.counts)
+
+    @property
+    def count(self) -> int:
+        return sum(self.counts.values())
+
+    @property
+    def min(self):
+        return self.value(min(self.counts)) if self.counts else None
+
+    @property
+    def max(self):
+        return self.value(max(self.counts)) if self.counts else None
+
+    def quantile(self, pct: float):
+        """Nearest-rank percentile (pct in (0, 100]), same definition as shared/aggregation.py."""
+        total = self.count
+        if not total:
+            return None
+        rank = max(1, math.ceil(pct / 100 * total))
+        seen = 0
+        for key in sorted(self.counts):
+            seen += self.counts[key]
+            if seen >= rank:
+                return self.value(key)
+        return self.max
+
+    def histogram(self, bins: int, low=None, high=None) -> list[dict]:
+        """Fixed-width bins over [low, high] (default: the sketch's min and max)."""
+        if not self.counts:
+            return []
+        low = self.min if low is None else low
+        high = self.max if high is None else high
+        width = (high - low) / bins if high > low else 1.0
+        result = [{"low": low + i * width, "high": low + (i + 1) * width, "count": 0} for i in range(bins)]
+        for key, count in self.counts.items():
+            v = self.value(key)
+            if low <= v <= high:
+                result[min(bins - 1, int((v - low) / width))]["count"] += count
+        return result
+
+
+def describe(sketch: DDSketch, metric: str, percentiles, bins: int) -> dict:
+    """Summary dict for a metric's sketch: count, min/max, percentiles, and a fixed-bin histogram."""
+    return {
+        "metric": metric,
+        "count": sketch.count,
+        "relative_accuracy": sketch.relative_accuracy,
+        "min": sketch.min,
+        "max": sketch.max,
+        "percentiles": {f"p{p:g}": sketch.quantile(p) for p in percentiles},
+        "histogram": sketch.histogram(bins),
+    }
+
+
+def _bucket_rows(runs) -> list[dict]:
+    sketch = DDSketch()
+    counts = Counter()
+    for run in runs:
+        for metric in METRICS:
+            value = getattr(run, metric)
+            if value is not None:
+                counts[(run.experiment_id, metric, sketch.key(value))] += 1
+    return [{"experiment_id": e, "metric": m, "bucket": b, "count": c} for (e, m, b), c in counts.items()]
+
+
+def _upsert(conn, rows: list[dict]):
+    if not rows:
+        return
+    # Increment in the database, not read-modify-write in Python, so concurrent ingests can't lose counts.
+    stmt = sqlite_insert(RunMetricBucket)
+    stmt = stmt.on_conflict_do_update(
+        index_elements=["experiment_id", "metric", "bucket"],
+        set_={"count": RunMetricBucket.count + stmt.excluded["count"]},
+    )
+    conn.execute(stmt, rows)
+
+
+def record_runs(conn, runs):
+    """Add new runs' metrics to their experiments' sketches. Call in the transaction that inserts the runs."""
+    _upsert(conn, _bucket_rows(runs))
+
+
+def rebuild_sketches(conn, experiment_ids=None):
+    """Recompute sketches from the runs table (after bulk inserts or a SKETCH_RELATIVE_ACCURACY change).
+
+    `experiment_ids` (a list or a subquery) limits the rebuild; None rebuilds every experiment.
+    """
+    clear = delete(RunMetricBucket)
+    runs = select(Run.experiment_id, *(getattr(Run, m) for m in METRICS))
+    if experiment_ids is not None:
+        clear = clear.where(RunMetricBucket.experiment_id.in_(experiment_ids))
+        runs = runs.where(Run.experiment_id.in_(experiment_ids))
+    conn.execute(clear)
+    result = conn.execute(runs.execution_options(yield_per=REBUILD_BATCH_SIZE))
+    for batch in result.partitions():
+        _upsert(conn, _bucket_rows(batch))
+
+
+def load_sketch(db, metric: str, experiment_ids) -> DDSketch:
+    """Merge the sketches of `experiment_ids` (a list or a subquery) for one metric, in SQL."""
+    if metric not in METRICS:
+        raise ValueError(f"Unknown metric {metric!r}. Available: {', '.join(METRICS)}")
+    rows = db.execute(
+        select(RunMetricBucket.bucket, func.sum(RunMetricBucket.count))
+        .where(RunMetricBucket.metric == metric, RunMetricBucket.experiment_id.in_(experiment_ids))
+        .group_by(RunMetricBucket.bucket)
+    )
+    return DDSketch(counts=dict(rows.all()))
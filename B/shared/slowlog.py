@@ -0,0 +1,109 @@
+# shared/slowlog.py
+# Slow query log: SQL over a threshold is written with its route and SQLite EXPLAIN QUERY PLAN.
+# Why: Missing indexes show up as "SCAN <table>" in production logs instead of being guessed at.
+# Relevant files: shared/instrumentation.py (calls maybe_record), shared/config.py, manage.py (slow-queries)
+
+import json
+import logging
+import os
+import threading
+from datetime import datetime, timezone
+from logging.handlers import WatchedFileHandler
+
+from shared.config import SLOW_QUERY_LOG_BACKUPS, SLOW_QUERY_LOG_PATH, SLOW_QUERY_THRESHOLD_MS
+
+_MAX_SQL_CHARS = 2000
+_MAX_PARAMS_CHARS = 500
+
+
+class SlowQueryLog:
+    """Appends one JSON line per slow statement to a log file shared by every worker process.
+
+    Each line is a single append, so workers don't interleave. Rotation is left to logrotate
+    (or similar): WatchedFileHandler reopens the path once the old file has been moved away.
+    """
+
+    def __init__(self, path: str = SLOW_QUERY_LOG_PATH, threshold_ms: float = SLOW_QUERY_THRESHOLD_MS):
+        self.path = path
+        self.threshold_ms = threshold_ms
+        self._handler = None
+        self._lock = threading.Lock()
+
+    def _get_handler(self) -> WatchedFileHandler:
+        with self._lock:
+            if self._handler is None or self._handler.baseFilename != os.path.abspath(self.path):
+                if self._handler is not None:
+                    self._handler.close()
+                self._handler = WatchedFileHandler(self.path, delay=True)
+            return self._handler
+
+    def maybe_record(self, conn, cursor, statement: str, parameters, elapsed: float, method: str, route: str):
+        """Log the statement if it took longer than threshold_ms. Called from after_cursor_execute."""
+        duration_ms = elapsed * 1000
+        if duration_ms < self.threshold_ms:
+            return
+        entry = {
+            "timestamp": datetime.now(timezone.utc).isoformat(),
+            "method": method,
+            "route": route,
+            "duration_ms": round(duration_ms, 3),
+            "sql": statement[:_MAX_SQL_CHARS],
+            "params": repr(parameters)[:_MAX_PARAMS_CHARS],
+            "plan": _explain(conn, cursor, statement, parameters),
+        }
+        self._get_handler().handle(logging.makeLogRecord({"msg": json.dumps(entry)}))
+
+
+def _explain(conn, cursor, statement: str, parameters) -> list:
+    """Return SQLite's EXPLAIN QUERY PLAN detail lines, or [] when it can't be captured.
+
+    Runs on the raw DBAPI connection so the engine's cursor events don't fire again.
+    """
+    if conn.dialect.name != "sqlite" or not isinstance(parameters, (tuple, list, dict)):
+        return []
+    try:
+        rows = cursor.connection.execute("EXPLAIN QUERY PLAN " + statement, parameters).fetchall()
+    except Exception:
+        # The plan is best-effort; never fail the real query over it.
+        return []
+    return [row[-1] for row in rows]
+
+
+def read_entries(path: str = SLOW_QUERY_LOG_PATH) -> list[dict]:
+    """Read every entry from the log and its rotated backups (path, path.1, ...)."""
+    entries = []
+    for file_path in [f"{path}.{i}" for i in range(SLOW_QUERY_LOG_BACKUPS, 0, -1)] + [path]:
+        if not os.path.exists(file_path):
+            continue
+        with open(file_path) as f:
+            entries.extend(json.loads(line) for line in f if line.strip())
+    return entries
+
+
+def summarize(entries: list[dict], sort: str = "total") -> list[dict]:
+    """Group entries by SQL text and rank them by total, max, or count.
+
+    Each group reports the routes that issued it, the latest plan, and whether the
+    plan contains a full table scan ("SCAN <table>" without an index).
+    """
+    groups: dict = {}
+    for entry in entries:
+        group = groups.setdefault(
+            entry["sql"],
+            {"sql": entry["sql"], "count": 0, "total_ms": 0.0, "max_ms": 0.0, "routes": set(), "plan": [], "last_seen": ""},
+        )
+        group["count"] += 1
+        group["total_ms"] += entry["duration_ms"]
+        group["max_ms"] = max(group["max_ms"], entry["duration_ms"])
+        group["routes"].add(f"{entry['method']} {entry['route']}".strip())
+        if entry["timestamp"] >= group["last_seen"]:
+            group["last_seen"] = entry["timestamp"]
+            group["plan"] = entry["plan"]
+    for group in groups.values():
+        group["routes"] = sorted(group["routes"])
+        group["full_scan"] = any(line.startswith("SCAN") and "USING" not in line for line in group["plan"])
+    key = {"total": "total_ms", "max": "max_ms", "count": "count"}[sort]
+    return sorted(groups.values(), key=lambda g: g[key], reverse=True)
+
+
+slow_query_log = SlowQueryLog()
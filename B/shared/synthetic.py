@@ -0,0 +1,113 @@
+# shared/synthetic.py
+# Synthetic experiment/run/tag generator for load tests and benchmarks.
+# Why: Performance claims need realistic volumes (10^3-10^6 runs), not the six seeded sample runs.
+# Relevant files: manage.py (seed --experiments), benchmarks/, shared/sketch.py, runs/models.py
+
+import json
+import random
+from datetime import datetime, timedelta
+
+from sqlalchemy import insert, select
+
+from experiments.models import Experiment, ExperimentStatus
+from runs.models import Run, RunStatus
+from shared.rollup import rebuild_rollups
+from shared.sketch import rebuild_sketches
+from tags.models import Tag
+
+BATCH_SIZE = 10000
+
+_MODELS = ["BERT", "GPT-2", "ResNet", "ViT", "T5", "LSTM", "XGBoost", "CLIP"]
+_TASKS = ["sentiment", "summarization", "CIFAR-10", "ImageNet", "NER", "retrieval", "forecasting"]
+_TAG_POOL = ["nlp", "vision", "baseline", "production", "ablation", "sweep", "gpu", "tpu", "distilled",
+             "quantized", "long-context", "multilingual", "fp16", "lora", "pretrain", "finetune"]
+
+
+def _run_rows(rng: random.Random, experiment_id: int, count: int, start: datetime):
+    """Yield insert dicts for `count` runs of one experiment, spread over the 90 days after `start`."""
+    for i in range(count):
+        lr = rng.choice([1e-5, 2e-5, 5e-5, 1e-4, 3e-4])
+        batch = rng.choice([16, 32, 64, 128])
+        failed = rng.random() < 0.05
+        yield {
+            "experiment_id": experiment_id,
+            "name": f"lr={lr:g}, bs={batch}, seed={i}",
+            "hyperparameters": json.dumps({"learning_rate": lr, "batch_size": batch, "epochs": rng.randint(1, 10)}),
+            "accuracy": None if failed else round(rng.uniform(0.5, 0.99), 4),
+            "loss": None if failed else round(rng.uniform(0.05, 2.5), 4),
+            "latency_ms": round(rng.lognormvariate(4, 0.5), 2),
+            "notes": "",
+            "status": RunStatus.FAILED if failed else RunStatus.COMPLETED,
+            "created_at": start + timedelta(seconds=rng.randint(0, 90 * 24 * 3600)),
+        }
+
+
+def generate(engine, experiments: int, runs_per_exp: int, tags: int, seed: int = 0) -> dict:
+    """Bulk-insert synthetic experiments, runs, and tags. Returns the row counts inserted.
+
+    Rows go in with executemany batches of BATCH_SIZE inside one transaction, with
+    SQLite's synchronous=OFF for the duration, so 10^6 runs take seconds, not minutes.
+    """
+    sqlite = engine.dialect.name == "sqlite"
+    with engine.connect() as conn:
+        if sqlite:
+            # Safety level can't change inside a transaction, so set it before the inserts
+            # and restore it after commit (the connection goes back to the pool).
+            previous_sync = conn.exec_driver_sql("PRAGMA synchronous").scalar()
+            conn.exec_driver_sql("PRAGMA synchronous=OFF")
+            conn.commit()
+        try:
+            counts = _insert_all(conn, random.Random(seed), experiments, runs_per_exp, min(tags, len(_TAG_POOL)))
+            conn.commit()
+        finally:
+            if sqlite:
+                conn.rollback()
+                conn.exec_driver_sql(f"PRAGMA synchronous={int(previous_sync)}")
+                conn.commit()
+    return counts
+
+
+def _insert_all(conn, rng: random.Random, experiments: int, runs_per_exp: int, tags: int) -> dict:
+    start = datetime.utcnow() - timedelta(days=90)
+    first_new_id = (conn.scalar(select(Experiment.id).order_by(Experiment.id.desc()).limit(1)) or 0) + 1
+    conn.execute(
+        insert(Experiment),
+        [
+            {
+                "name": f"{rng.choice(_MODELS)} {rng.choice(_TASKS)} #{first_new_id + i}",
+                "description": f"Synthetic experiment {first_new_id + i} generated for benchmarking",
+                "status": rng.choice(list(ExperimentStatus)),
+                "created_at": start + timedelta(days=rng.uniform(0, 90)),
+                "updated_at": datetime.utcnow(),
+            }
+            for i in range(experiments)
+        ],
+    )
+    experiment_ids = conn.scalars(select(Experiment.id).where(Experiment.id >= first_new_id)).all()
+
+    run_count = 0
+    batch = []
+    for experiment_id in experiment_ids:
+        for row in _run_rows(rng, experiment_id, runs_per_exp, start):
+            batch.append(row)
+            if len(batch) >= BATCH_SIZE:
+                conn.execute(insert(Run), batch)
+                run_count += len(batch)
+                batch = []
+    if batch:
+        conn.execute(insert(Run), batch)
+        run_count += len(batch)
+
+    tag_rows = [
+        {"experiment_id": experiment_id, "name": name, "created_at": start}
+        for experiment_id in experiment_ids
+        for name in rng.sample(_TAG_POOL, tags)
+    ]
+    for i in range(0, len(tag_rows), BATCH_SIZE):
+        conn.execute(insert(Tag), tag_rows[i : i + BATCH_SIZE])
+    # Core inserts bypass create_run, so build the new experiments' sketches and rollups here.
+    # A subquery, not the id list: one bind variable per id overflows SQLite's limit (32766).
+    new_ids = select(Experiment.id).where(Experiment.id >= first_new_id)
+    rebuild_sketches(conn, new_ids)
+    rebuild_rollups(conn, new_ids)
+    return {"experiments": len(experiment_ids), "runs": run_count, "tags": len(tag_rows)}
@@ -1,11 +1,11 @@
 # tags/models.py
 # SQLAlchemy model for the Tag table (experiment labels for filtering and grouping).
 # Why: Keeps tag schema co-located with tag routes; many-to-many with experiments.
-# Relevant files: tags/schemas.py, tags/routes.py, experiments/models.py
+# Relevant files: tags/schemas.py, tags/routes.py, experiments/models.py (tag_names)
 
 from datetime import datetime
 
-from sqlalchemy import Column, DateTime, ForeignKey, Integer, String, UniqueConstraint
+from sqlalchemy import DDL, Column, DateTime, ForeignKey, Index, Integer, String, UniqueConstraint, event, inspect, text
 from sqlalchemy.orm import relationship
 
 from shared.base import Base
@@ -23,7 +23,55 @@ class Tag(Base):
 
     __table_args__ = (
         UniqueConstraint("experiment_id", "name", name="uq_experiment_tag"),
+        Index("ix_tags_name", "name"),
     )
 
     def __repr__(self):
         return f"<Tag id={self.id} name={self.name!r} experiment_id={self.experiment_id}>"
+
+
+# The tags table is the source of truth (indexed "which experiments have tag X" lookups).
+# experiments.tag_names is a sorted JSON array copy kept in sync by these triggers, so
+# list pages read an experiment's tags without a JOIN or a query per experiment. Triggers
+# also cover Core bulk inserts (shared/synthetic.py), which ORM events would miss.
+_TAG_NAMES_SQL = (
+    "(SELECT json_group_array(name) FROM "
+    "(SELECT name FROM tags WHERE experiment_id = {experiment_id} ORDER BY name))"
+)
+TAG_NAMES_TRIGGERS = [
+    f"""CREATE TRIGGER IF NOT EXISTS tags_sync_insert AFTER INSERT ON tags BEGIN
+        UPDATE experiments SET tag_names = {_TAG_NAMES_SQL.format(experiment_id="NEW.experiment_id")}
+        WHERE id = NEW.experiment_id;
+    END""",
+    f"""CREATE TRIGGER IF NOT EXISTS tags_sync_delete AFTER DELETE ON tags BEGIN
+        UPDATE experiments SET tag_names = {_TAG_NAMES_SQL.format(experiment_id="OLD.experiment_id")}
+        WHERE id = OLD.experiment_id;
+    END""",
+    f"""CREATE TRIGGER IF NOT EXISTS tags_sync_update AFTER UPDATE OF name, experiment_id ON tags BEGIN
+        UPDATE experiments SET tag_names = {_TAG_NAMES_SQL.format(experiment_id="OLD.experiment_id")}
+        WHERE id = OLD.experiment_id;
+        UPDATE experiments SET tag_names = {_TAG_NAMES_SQL.format(experiment_id="NEW.experiment_id")}
+        WHERE id = NEW.experiment_id;
+    END""",
+]
+# Set-based backfill: one UPDATE with a correlated subquery, not a query per experiment.
+BACKFILL_TAG_NAMES = f"UPDATE experiments SET tag_names = {_TAG_NAMES_SQL.format(experiment_id='experiments.id')}"
+
+for _trigger in TAG_NAMES_TRIGGERS:
+    event.listen(Tag.__table__, "after_create", DDL(_trigger).execute_if(dialect="sqlite"))
+
+
+def ensure_tag_names(conn):
+    """Bring an existing database up to date: tag_names column, tag name index, triggers, backfill.
+
+    Backfills only when the triggers were missing; once they exist they keep tag_names in sync.
+    """
+    columns = {c["name"] for c in inspect(conn).get_columns("experiments")}
+    if "tag_names" not in columns:
+        conn.execute(text("ALTER TABLE experiments ADD COLUMN tag_names TEXT NOT NULL DEFAULT '[]'"))
+    conn.execute(text("CREATE INDEX IF NOT EXISTS ix_tags_name ON tags (name)"))
+    existing = conn.scalar(text("SELECT count(*) FROM sqlite_master WHERE type = 'trigger' AND name LIKE 'tags_sync_%'"))
+    if existing < len(TAG_NAMES_TRIGGERS):
+        for trigger in TAG_NAMES_TRIGGERS:
+            conn.execute(text(trigger))
+        conn.execute(text(BACKFILL_TAG_NAMES))
@@ -5,15 +5,19 @@
 
 from __future__ import annotations
 
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Query
+from sqlalchemy import select
 from sqlalchemy.orm import Session
 
 from experiments.models import Experiment
+from runs.schemas import MetricDistribution
 from shared.db import get_db
+from shared.routing import InstrumentedRoute
+from shared.sketch import describe, load_sketch
 from tags.models import Tag
 from tags.schemas import TagCreate, TagResponse  # noqa: F401 – TagCreate used by TODO endpoint below
 
-router = APIRouter()
+router = APIRouter(route_class=InstrumentedRoute)
 
 
 @router.get("/api/experiments/{experiment_id}/tags", response_model=list[TagResponse])
@@ -40,6 +44,34 @@ def list_tags(experiment_id: int, db: Session = Depends(get_db)):
     ]
 
 
+@router.get("/api/tags/{tag_name}/distribution", response_model=MetricDistribution)
+def tag_distribution(
+    tag_name: str,
+    metric: str = Query("latency_ms", description="accuracy, loss, or latency_ms"),
+    percentiles: str = Query("50,90,99", description="Comma-separated percentiles"),
+    bins: int = Query(20, ge=1, le=200, description="Histogram bins between min and max"),
+    db: Session = Depends(get_db),
+):
+    """Percentiles and a histogram for one run metric across every experiment with this tag.
+
+    The per-experiment sketches are merged in SQL. Returns 404 if no experiment has the tag.
+    """
+    experiment_ids = select(Tag.experiment_id).where(Tag.name == tag_name)
+    if db.scalar(experiment_ids.limit(1)) is None:
+        raise HTTPException(
+            status_code=404,
+            detail=f"No experiments are tagged {tag_name!r}. Check the tag name and try again.",
+        )
+    try:
+        pcts = [float(p) for p in percentiles.split(",") if p.strip()]
+        if any(not 0 < p <= 100 for p in pcts):
+            raise ValueError("Percentiles must be in (0, 100].")
+        sketch = load_sketch(db, metric, experiment_ids)
+    except ValueError as exc:
+        raise HTTPException(status_code=422, detail=str(exc)) from exc
+    return describe(sketch, metric, pcts, bins)
+
+
 # TODO: Add POST endpoint for creating tags.
 # Follow the pattern in runs/routes.py (see create_run function).
 # Accept TagCreate schema as JSON body.
@@ -1,12 +1,12 @@
 # tests/conftest.py
 # Shared pytest fixtures for the test suite.
-# Why: Provides a fresh in-memory database and test client for every test.
-# Relevant files: tests/test_experiments.py, tests/test_runs.py, tests/test_api.py
+# Why: One schema and one app per test process; each test runs inside a transaction that is rolled back.
+# Relevant files: tests/test_experiments.py, tests/test_runs.py, tests/test_api.py, manage.py (create_app)
 
 import pytest
 from fastapi.testclient import TestClient
-from sqlalchemy import create_engine
-from sqlalchemy.orm import sessionmaker
+from sqlalchemy import create_engine, event
+from sqlalchemy.orm import Session
 from sqlalchemy.pool import StaticPool
 
 # Import all models so Base.metadata knows about them before create_all()
@@ -18,30 +18,66 @@ from shared.base import Base
 from shared.db import get_db
 
 
-@pytest.fixture(name="db_session")
-def fixture_db_session():
-    """Create a fresh in-memory SQLite database for each test."""
+@pytest.fixture(name="engine", scope="session")
+def fixture_engine():
+    """One in-memory SQLite database per test process, so each pytest-xdist worker gets its own.
+
+    The schema (tables, indexes, tag triggers) is created once per session instead of per test.
+    """
     engine = create_engine(
         "sqlite:///:memory:",
         connect_args={"check_same_thread": False},
         poolclass=StaticPool,
     )
+
+    # pysqlite issues its own BEGIN lazily and breaks SAVEPOINT semantics; let SQLAlchemy emit BEGIN instead.
+    @event.listens_for(engine, "connect")
+    def _disable_pysqlite_transactions(dbapi_connection, connection_record):
+        dbapi_connection.isolation_level = None
+
+    @event.listens_for(engine, "begin")
+    def _begin(conn):
+        conn.exec_driver_sql("BEGIN")
+
     Base.metadata.create_all(bind=engine)
-    TestingSessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
-    session = TestingSessionLocal()
+    yield engine
+    engine.dispose()
+
+
+@pytest.fixture(name="app", scope="session")
+def fixture_app(engine):
+    """Build the FastAPI app once; its startup (table checks, template precompile) runs against the test DB."""
+    import manage
+
+    with pytest.MonkeyPatch.context() as mp:
+        mp.setattr(manage, "engine", engine)
+        app = manage.create_app()
+        with TestClient(app) as client:
+            app.state.test_client = client
+            yield app
+
+
+@pytest.fixture(name="db_session")
+def fixture_db_session(engine):
+    """A session inside an outer transaction that is rolled back after the test.
+
+    Code under test may commit or roll back freely: with "create_savepoint" those act on a
+    SAVEPOINT, and the outer rollback still discards everything the test wrote.
+    """
+    connection = engine.connect()
+    transaction = connection.begin()
+    session = Session(bind=connection, autoflush=False, join_transaction_mode="create_savepoint")
     try:
         yield session
     finally:
         session.close()
-        Base.metadata.drop_all(bind=engine)
+        transaction.rollback()
+        connection.close()
 
 
 @pytest.fixture(name="client")
-def fixture_client(db_session):
-    """Create a FastAPI test client with the test database injected."""
-    from manage import create_app
-
-    app = create_app()
+def fixture_client(app, db_session):
+    """The session-wide test client, with this test's database session injected."""
 
     def override_get_db():
         try:
@@ -50,5 +86,9 @@ def fixture_client(db_session):
             pass
 
     app.dependency_overrides[get_db] = override_get_db
-    with TestClient(app) as c:
-        yield c
+    client = app.state.test_client
+    client.cookies.clear()
+    try:
+        yield client
+    finally:
+        app.dependency_overrides.pop(get_db, None)
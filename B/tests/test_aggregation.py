@@ -0,0 +1,86 @@
+# tests/test_aggregation.py
+# Tests for SQL-side metric aggregation and the experiment stats endpoint.
+# Why: List, detail, dashboard, and /stats all read their numbers from shared/aggregation.py.
+# Relevant files: shared/aggregation.py, experiments/routes.py, experiments/schemas.py
+
+from datetime import datetime, timedelta
+
+from runs.models import Run
+from tags.models import Tag
+
+
+def _create_experiment(client, latencies):
+    exp_id = client.post("/api/experiments", json={"name": "Stats"}).json()["id"]
+    for i, latency in enumerate(latencies):
+        client.post(
+            f"/api/experiments/{exp_id}/runs",
+            json={"name": f"R{i}", "accuracy": 0.5 + i / 1000, "loss": 1.0, "latency_ms": latency},
+        )
+    return exp_id
+
+
+def test_stats_several_metrics(client):
+    """Count, mean, min, max, and range come back for each requested metric."""
+    exp_id = _create_experiment(client, [10.0, 20.0, 30.0])
+    data = client.get(f"/api/experiments/{exp_id}/stats?metrics=accuracy,latency_ms").json()
+    assert len(data["groups"]) == 1
+    group = data["groups"][0]
+    assert group["runs"] == 3
+    assert set(group["metrics"]) == {"accuracy", "latency_ms"}
+    latency = group["metrics"]["latency_ms"]
+    assert latency["count"] == 3
+    assert latency["mean"] == 20.0
+    assert latency["range"] == 20.0
+
+
+def test_stats_percentiles_nearest_rank(client):
+    """Percentiles use the nearest-rank definition and skip NULL values."""
+    exp_id = _create_experiment(client, [float(v) for v in range(1, 101)])
+    client.post(f"/api/experiments/{exp_id}/runs", json={"name": "no-latency"})
+    data = client.get(f"/api/experiments/{exp_id}/stats?metrics=latency_ms&percentiles=50,90,99,100").json()
+    pcts = data["groups"][0]["metrics"]["latency_ms"]["percentiles"]
+    assert pcts == {"p50": 50.0, "p90": 90.0, "p99": 99.0, "p100": 100.0}
+
+
+def test_stats_group_by_tag(client, db_session):
+    """Grouping by tag returns one group per tag on the experiment."""
+    exp_id = _create_experiment(client, [10.0, 30.0])
+    db_session.add_all([Tag(experiment_id=exp_id, name="gpu"), Tag(experiment_id=exp_id, name="nlp")])
+    db_session.commit()
+    data = client.get(f"/api/experiments/{exp_id}/stats?metrics=latency_ms&group_by=tag").json()
+    assert [g["key"] for g in data["groups"]] == ["gpu", "nlp"]
+    assert all(g["metrics"]["latency_ms"]["mean"] == 20.0 for g in data["groups"])
+
+
+def test_stats_window_days(client, db_session):
+    """window_days drops runs created before the cutoff."""
+    exp_id = _create_experiment(client, [10.0, 30.0])
+    old = db_session.query(Run).filter(Run.name == "R0").one()
+    old.created_at = datetime.utcnow() - timedelta(days=30)
+    db_session.commit()
+    data = client.get(f"/api/experiments/{exp_id}/stats?metrics=latency_ms&window_days=7").json()
+    assert data["groups"][0]["metrics"]["latency_ms"]["mean"] == 30.0
+
+
+def test_stats_rejects_unknown_metric(client):
+    """An unknown metric name returns 422 listing the valid ones."""
+    exp_id = _create_experiment(client, [10.0])
+    response = client.get(f"/api/experiments/{exp_id}/stats?metrics=notes")
+    assert response.status_code == 422
+    assert "latency_ms" in response.json()["detail"]
+
+
+def test_stats_experiment_not_found(client):
+    """Stats for a nonexistent experiment return 404."""
+    assert client.get("/api/experiments/999/stats").status_code == 404
+
+
+def test_list_reports_stats_without_runs_loaded(client):
+    """The experiment list still reports run totals and average accuracy."""
+    exp_id = _create_experiment(client, [10.0, 20.0])
+    empty_id = client.post("/api/experiments", json={"name": "Empty"}).json()["id"]
+    by_id = {e["id"]: e for e in client.get("/api/experiments").json()}
+    assert by_id[exp_id]["total_runs"] == 2
+    assert abs(by_id[exp_id]["avg_accuracy"] - 0.5005) < 1e-9
+    assert by_id[empty_id]["total_runs"] == 0
+    assert by_id[empty_id]["avg_accuracy"] is None
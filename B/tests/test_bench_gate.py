@@ -0,0 +1,35 @@
+# tests/test_bench_gate.py
+# Tests for the performance regression gate's baseline comparison.
+# Why: A gate that never fails (or always fails) is worse than none; pin the tolerance rules.
+# Relevant files: benchmarks/gate.py, manage.py (bench)
+
+from benchmarks.gate import DEFAULT_TOLERANCES, compare
+
+
+def _report(p50_ms=10.0, sql_queries=2.0, peak_memory_kb=1000.0):
+    return {"scenarios": {"list": {"p50_ms": p50_ms, "p95_ms": p50_ms, "sql_queries": sql_queries,
+                                   "peak_memory_kb": peak_memory_kb}}}
+
+
+def test_within_tolerance_passes():
+    assert compare(_report(), _report(p50_ms=25.0, peak_memory_kb=1400.0), DEFAULT_TOLERANCES) == []
+
+
+def test_extra_sql_query_fails():
+    failures = compare(_report(sql_queries=2.0), _report(sql_queries=21.0), DEFAULT_TOLERANCES)
+    assert len(failures) == 1
+    assert "SQL queries" in failures[0]
+
+
+def test_latency_and_memory_regressions_fail():
+    failures = compare(_report(), _report(p50_ms=200.0, peak_memory_kb=5000.0), DEFAULT_TOLERANCES)
+    assert len(failures) == 2
+
+
+def test_tolerance_override_allows_regression():
+    tolerances = {**DEFAULT_TOLERANCES, "sql_queries": 20}
+    assert compare(_report(sql_queries=2.0), _report(sql_queries=21.0), tolerances) == []
+
+
+def test_scenarios_missing_from_baseline_are_ignored():
+    assert compare({"scenarios": {}}, _report(), DEFAULT_TOLERANCES) == []
@@ -0,0 +1,146 @@
+# tests/test_coalesce.py
+# Tests for single-flight request coalescing.
+# Why: Coalescing that leaks across keys serves the wrong page; one that leaks in-flight entries never recomputes.
+# Relevant files: shared/coalesce.py, shared/instrumentation.py, experiments/routes.py, runs/routes.py
+
+import asyncio
+import threading
+from types import SimpleNamespace
+
+import pytest
+from anyio import to_thread
+
+from shared.coalesce import SingleFlight, coalesced, flights
+from shared.db import get_db
+from shared.instrumentation import registry
+
+
+def test_concurrent_calls_share_one_computation():
+    group = SingleFlight()
+    calls = []
+
+    async def compute():
+        calls.append(1)
+        await asyncio.sleep(0.01)
+        return {"value": 42}
+
+    async def main():
+        return await asyncio.gather(*(group.do("key", compute) for _ in range(5)))
+
+    results = asyncio.run(main())
+    assert len(calls) == 1
+    assert [shared for _, shared in results] == [False, True, True, True, True]
+    assert all(result is results[0][0] for result, _ in results)
+    assert len(group) == 0
+
+
+def test_different_keys_and_later_calls_compute_again():
+    group = SingleFlight()
+    calls = []
+
+    async def compute(key):
+        calls.append(key)
+        await asyncio.sleep(0)
+        return key
+
+    async def main():
+        first = await asyncio.gather(group.do("a", lambda: compute("a")), group.do("b", lambda: compute("b")))
+        second = await group.do("a", lambda: compute("a"))
+        return first, second
+
+    first, second = asyncio.run(main())
+    assert first == [("a", False), ("b", False)]
+    assert second == ("a", False)
+    assert calls == ["a", "b", "a"]
+
+
+def test_errors_reach_every_waiter():
+    group = SingleFlight()
+
+    async def fail():
+        await asyncio.sleep(0.01)
+        raise LookupError("missing")
+
+    async def main():
+        return await asyncio.gather(group.do("key", fail), group.do("key", fail), return_exceptions=True)
+
+    results = asyncio.run(main())
+    assert [type(r) for r in results] == [LookupError, LookupError]
+    assert len(group) == 0
+
+
+class _FakeApp:
+    """Just enough of the app for the loader to find get_db (here, an override that tracks sessions)."""
+
+    def __init__(self):
+        self.opened = []
+        self.closed = []
+
+        def sessions():
+            db = object()
+            self.opened.append(db)
+            try:
+                yield db
+            finally:
+                self.closed.append(db)
+
+        self.dependency_overrides = {get_db: sessions}
+
+
+def test_coalesced_loader_runs_once_on_its_own_session():
+    """Concurrent callers with the same params share one load, on a session opened and closed by the flight."""
+    app = _FakeApp()
+    request = SimpleNamespace(app=app)
+    started = threading.Event()
+    release = threading.Event()
+    calls = []
+
+    @coalesced
+    def load(db, experiment_id: int, limit: int):
+        calls.append((db, experiment_id, limit))
+        started.set()
+        release.wait(5)
+        return {"experiment_id": experiment_id, "limit": limit}
+
+    async def main():
+        first = asyncio.ensure_future(to_thread.run_sync(lambda: load(request, experiment_id=1, limit=10)))
+        await to_thread.run_sync(started.wait, 5)
+        joined = [
+            asyncio.ensure_future(to_thread.run_sync(lambda: load(request, experiment_id=1, limit=10)))
+            for _ in range(3)
+        ]
+        await asyncio.sleep(0.05)
+        release.set()
+        other = await to_thread.run_sync(lambda: load(request, experiment_id=1, limit=20))
+        return await asyncio.gather(first, *joined), other
+
+    same, other = asyncio.run(main())
+    assert [(experiment_id, limit) for _, experiment_id, limit in calls] == [(1, 10), (1, 20)]
+    assert all(result is same[0] for result in same)
+    assert other == {"experiment_id": 1, "limit": 20}
+    assert app.opened == app.closed == [db for db, _, _ in calls]
+    assert len(flights) == 0
+
+
+def test_coalesced_loader_closes_session_on_error():
+    """A loader that raises still closes its session, and the error reaches the caller."""
+    app = _FakeApp()
+
+    @coalesced
+    def load(db, experiment_id: int):
+        raise LookupError(experiment_id)
+
+    async def main():
+        return await to_thread.run_sync(lambda: load(SimpleNamespace(app=app), experiment_id=7))
+
+    with pytest.raises(LookupError):
+        asyncio.run(main())
+    assert len(app.opened) == len(app.closed) == 1
+
+
+@pytest.mark.parametrize("shared", [False, True])
+def test_metrics_count_coalesced_requests(shared):
+    registry.reset()
+    registry.observe_coalesce("GET", "/experiments/{experiment_id}", shared)
+    line = 'coalesce_requests_total{method="GET",route="/experiments/{experiment_id}",shared="%s"} 1'
+    assert line % ("true" if shared else "false") in registry.render_prometheus()
@@ -0,0 +1,22 @@
+# tests/test_db.py
+# Tests for the per-connection SQLite settings.
+# Why: `serve` runs several worker processes against one file; without WAL and a busy timeout they lock each other out.
+# Relevant files: shared/db.py, shared/config.py, manage.py (serve)
+
+from sqlalchemy import create_engine
+
+from shared.config import SQLITE_BUSY_TIMEOUT_MS
+from shared.db import configure_sqlite
+
+
+def test_configure_sqlite_sets_pragmas_on_each_connection(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'tracker.db'}")
+    configure_sqlite(engine)
+    configure_sqlite(engine)  # idempotent
+    try:
+        with engine.connect() as conn:
+            assert conn.exec_driver_sql("PRAGMA journal_mode").scalar() == "wal"
+            assert conn.exec_driver_sql("PRAGMA busy_timeout").scalar() == SQLITE_BUSY_TIMEOUT_MS
+            assert conn.exec_driver_sql("PRAGMA synchronous").scalar() == 1  # NORMAL
+    finally:
+        engine.dispose()
@@ -0,0 +1,91 @@
+# tests/test_experiment_fields.py
+# Tests for ?fields= on the experiment detail endpoint and for pages that skip heavy text columns.
+# Why: Clients of large experiments fetch only the columns they need; the response must match what they asked for.
+# Relevant files: experiments/routes.py, runs/routes.py, manage.py (dashboard)
+
+from sqlalchemy import event
+
+from shared.instrumentation import instrument_engine, registry
+
+
+def _create_experiment(client):
+    """Helper: an experiment with a description and two runs that have notes and hyperparameters."""
+    exp_id = client.post("/api/experiments", json={"name": "Fields", "description": "d" * 300}).json()["id"]
+    for i in range(2):
+        client.post(
+            f"/api/experiments/{exp_id}/runs",
+            json={"name": f"R{i}", "accuracy": 0.5 + i / 10, "notes": "n" * 5000, "hyperparameters": {"lr": i}},
+        )
+    return exp_id
+
+
+def _sql_for(client, db_session, url):
+    """Helper: GET `url` and return the SQL statements it executed."""
+    statements = []
+
+    def record(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+
+    bind = db_session.get_bind()
+    event.listen(bind, "before_cursor_execute", record)
+    try:
+        assert client.get(url).status_code == 200
+    finally:
+        event.remove(bind, "before_cursor_execute", record)
+    return statements
+
+
+def test_fields_selects_top_level_and_run_fields(client):
+    """Only the requested fields come back, plus the id."""
+    exp_id = _create_experiment(client)
+    response = client.get(f"/api/experiments/{exp_id}?fields=name,total_runs,runs.id,runs.accuracy")
+    assert response.status_code == 200
+    data = response.json()
+    assert list(data) == ["id", "name", "runs", "total_runs"]
+    assert data["total_runs"] == 2
+    assert [set(run) for run in data["runs"]] == [{"id", "accuracy"}] * 2
+    assert [run["accuracy"] for run in data["runs"]] == [0.5, 0.6]
+
+
+def test_fields_runs_means_every_run_field(client):
+    """"runs" without a field name returns full runs, same as without ?fields=."""
+    exp_id = _create_experiment(client)
+    full = client.get(f"/api/experiments/{exp_id}").json()
+    data = client.get(f"/api/experiments/{exp_id}?fields=runs").json()
+    assert data == {"id": exp_id, "runs": full["runs"]}
+    assert full["runs"][0]["hyperparameters"] == {"lr": 0}
+
+
+def test_fields_without_runs_skips_run_query(client, db_session):
+    """Asking for experiment columns only reads the experiment row."""
+    instrument_engine(db_session.get_bind())
+    exp_id = _create_experiment(client)
+    registry.reset()
+    data = client.get(f"/api/experiments/{exp_id}?fields=name,status").json()
+    assert data == {"id": exp_id, "name": "Fields", "status": "draft"}
+    assert registry.sql_statements[("GET", "/api/experiments/{experiment_id}")] == 1
+
+
+def test_unknown_field_returns_422(client):
+    """Unknown experiment or run fields are rejected with the allowed names."""
+    exp_id = _create_experiment(client)
+    response = client.get(f"/api/experiments/{exp_id}?fields=name,secret")
+    assert response.status_code == 422
+    assert "Unknown field 'secret'" in response.json()["detail"]
+    assert client.get(f"/api/experiments/{exp_id}?fields=runs.secret").status_code == 422
+
+
+def test_dashboard_does_not_load_descriptions(client, db_session):
+    """The dashboard renders without reading the description column."""
+    _create_experiment(client)
+    statements = _sql_for(client, db_session, "/")
+    assert statements
+    assert not any("experiments.description" in s for s in statements)
+
+
+def test_compare_page_does_not_load_notes(client, db_session):
+    """The compare page reads hyperparameters but never run notes or the description."""
+    exp_id = _create_experiment(client)
+    statements = _sql_for(client, db_session, f"/experiments/{exp_id}/compare")
+    assert any("runs.hyperparameters" in s for s in statements)
+    assert not any("runs.notes" in s or "experiments.description" in s for s in statements)
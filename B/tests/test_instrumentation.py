@@ -0,0 +1,56 @@
+# tests/test_instrumentation.py
+# Tests for request metrics, SQL instrumentation, and ?profile=1.
+# Why: /api/metrics is the only window into slow routes; it must stay in Prometheus format.
+# Relevant files: shared/instrumentation.py, shared/rendering.py, manage.py
+
+from shared import config
+from shared.instrumentation import instrument_engine, registry
+
+
+def test_metrics_reports_route_latency_and_sql(client, db_session):
+    """Requests are recorded per route template along with their SQL statement count."""
+    instrument_engine(db_session.get_bind())
+    registry.reset()
+    exp_id = client.post("/api/experiments", json={"name": "Metrics"}).json()["id"]
+    client.get(f"/api/experiments/{exp_id}")
+    response = client.get("/api/metrics")
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/plain")
+    body = response.text
+    assert 'http_request_duration_seconds_count{method="GET",route="/api/experiments/{experiment_id}"} 1' in body
+    assert 'http_requests_total{method="POST",route="/api/experiments",status="201"} 1' in body
+    assert registry.sql_statements[("GET", "/api/experiments/{experiment_id}")] > 0
+
+
+def test_metrics_records_template_render_time(client):
+    """Rendering an HTML page records a template_render_seconds observation."""
+    registry.reset()
+    client.get("/")
+    assert 'template_render_seconds_count{template="dashboard.html"} 1' in client.get("/api/metrics").text
+
+
+def test_profile_ignored_by_default(client):
+    """Without PROFILING_ENABLED, ?profile=1 is ignored and the normal response comes back."""
+    response = client.get("/api/experiments?profile=1")
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("application/json")
+    assert response.json() == []
+
+
+def test_profile_returns_call_tree(client, monkeypatch):
+    """With PROFILING_ENABLED, ?profile=1 replaces the response with a text profile of the endpoint."""
+    monkeypatch.setattr(config, "PROFILING_ENABLED", True)
+    response = client.get("/api/experiments?profile=1")
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/plain")
+    assert "GET /api/experiments -> 200" in response.text
+    assert "list_experiments" in response.text
+
+
+def test_profile_coalesced_endpoint_profiles_worker_thread(client, monkeypatch):
+    """Coalesced endpoints are profiled inside the threadpool thread that runs them."""
+    monkeypatch.setattr(config, "PROFILING_ENABLED", True)
+    exp_id = client.post("/api/experiments", json={"name": "Profiled"}).json()["id"]
+    response = client.get(f"/api/experiments/{exp_id}?profile=1")
+    assert "GET /api/experiments/{experiment_id} -> 200" in response.text
+    assert "get_experiment" in response.text
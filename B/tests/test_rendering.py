@@ -0,0 +1,48 @@
+# tests/test_rendering.py
+# Tests for the shared template environment and row fragment cache.
+# Why: Pages must render through one environment and reuse unchanged run rows.
+# Relevant files: shared/rendering.py, runs/routes.py
+
+from jinja2 import DictLoader, Environment
+
+from shared.rendering import FragmentCache, LazyBytecodeCache, row_fragments, status_badge
+
+
+def test_status_badge_is_built_once():
+    """The same status returns the identical cached badge object."""
+    assert status_badge("running") is status_badge("running")
+    assert "#0d6efd" in status_badge("running")
+
+
+def test_fragment_cache_evicts_least_recently_used():
+    """The cache stays within maxsize and drops the oldest entry first."""
+    cache = FragmentCache(maxsize=2)
+    cache.get_or_render("a", lambda: "A")
+    cache.get_or_render("b", lambda: "B")
+    cache.get_or_render("a", lambda: "unused")
+    cache.get_or_render("c", lambda: "C")
+    assert len(cache) == 2
+    assert cache.get_or_render("a", lambda: "re-rendered") == "A"
+    assert cache.get_or_render("b", lambda: "re-rendered") == "re-rendered"
+
+
+def test_compare_page_reuses_run_rows(client):
+    """A second render of the compare page serves run rows from the fragment cache."""
+    exp_id = client.post("/api/experiments", json={"name": "Cached"}).json()["id"]
+    client.post(f"/api/experiments/{exp_id}/runs", json={"name": "R1", "accuracy": 0.9})
+    row_fragments.clear()
+    first = client.get(f"/experiments/{exp_id}/compare")
+    assert row_fragments.misses == 1
+    second = client.get(f"/experiments/{exp_id}/compare")
+    assert row_fragments.hits == 1
+    assert first.text == second.text
+    assert "R1" in second.text
+
+
+def test_bytecode_cache_dir_created_on_first_compile(tmp_path):
+    """The cache directory appears when a template is first compiled, not when the cache is built."""
+    cache_dir = tmp_path / "template_cache"
+    env = Environment(loader=DictLoader({"t.html": "{{ x }}"}), bytecode_cache=LazyBytecodeCache(str(cache_dir)))
+    assert not cache_dir.exists()
+    assert env.get_template("t.html").render(x=1) == "1"
+    assert len(list(cache_dir.iterdir())) == 1
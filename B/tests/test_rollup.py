@@ -0,0 +1,71 @@
+# tests/test_rollup.py
+# Tests for hourly/daily metric rollups and the trends endpoint.
+# Why: Trend charts read only rollup rows, so ingest and rebuild must keep them exact.
+# Relevant files: shared/rollup.py, runs/models.py, runs/routes.py, experiments/routes.py
+
+from datetime import datetime, timedelta
+
+import pytest
+
+from runs.models import Run, RunMetricRollup
+from shared.rollup import rebuild_rollups
+
+
+def _create_experiment(client, accuracies):
+    exp_id = client.post("/api/experiments", json={"name": "Trend"}).json()["id"]
+    for accuracy in accuracies:
+        client.post(f"/api/experiments/{exp_id}/runs", json={"accuracy": accuracy})
+    return exp_id
+
+
+def test_ingest_updates_daily_trend(client):
+    """Each ingested run lands in today's bucket with running count, mean, min, max, stddev."""
+    exp_id = _create_experiment(client, [0.2, 0.4, 0.6])
+    data = client.get(f"/api/experiments/{exp_id}/trends?metric=accuracy&granularity=day&days=7").json()
+    assert len(data["points"]) == 1
+    point = data["points"][0]
+    assert point["bucket"] == datetime.utcnow().strftime("%Y-%m-%d")
+    assert point["count"] == 3
+    assert point["mean"] == pytest.approx(0.4)
+    assert point["min"] == 0.2
+    assert point["max"] == 0.6
+    assert point["stddev"] == pytest.approx((0.08 / 3) ** 0.5)
+
+
+def test_hourly_buckets(client):
+    exp_id = _create_experiment(client, [0.5])
+    data = client.get(f"/api/experiments/{exp_id}/trends?metric=accuracy&granularity=hour").json()
+    assert data["points"][0]["bucket"].endswith(":00")
+
+
+def test_rebuild_matches_ingest_and_window_filters(client, db_session):
+    """A rebuild from runs reproduces ingest rollups; runs outside the window drop out of the trend."""
+    exp_id = _create_experiment(client, [0.1, 0.9])
+
+    def rollups():
+        return sorted(
+            (r.metric, r.granularity, r.bucket, r.count, round(r.sum, 9), r.min, r.max)
+            for r in db_session.query(RunMetricRollup).filter(RunMetricRollup.experiment_id == exp_id)
+        )
+
+    before = rollups()
+    rebuild_rollups(db_session, [exp_id])
+    db_session.commit()
+    assert rollups() == before
+
+    old = db_session.query(Run).filter(Run.experiment_id == exp_id, Run.accuracy == 0.1).one()
+    old.created_at = datetime.utcnow() - timedelta(days=30)
+    db_session.commit()
+    rebuild_rollups(db_session, [exp_id])
+    db_session.commit()
+    recent = client.get(f"/api/experiments/{exp_id}/trends?metric=accuracy&days=7").json()["points"]
+    assert [p["mean"] for p in recent] == [0.9]
+    history = client.get(f"/api/experiments/{exp_id}/trends?metric=accuracy&days=90").json()["points"]
+    assert [p["count"] for p in history] == [1, 1]
+
+
+def test_trends_errors(client):
+    assert client.get("/api/experiments/999/trends").status_code == 404
+    exp_id = _create_experiment(client, [0.5])
+    assert client.get(f"/api/experiments/{exp_id}/trends?metric=notes").status_code == 422
+    assert client.get(f"/api/experiments/{exp_id}/trends?granularity=week").status_code == 422
@@ -0,0 +1,52 @@
+# tests/test_run_list.py
+# Tests for the paginated, sortable run list endpoint.
+# Why: The experiment detail page loads its runs table page by page from this endpoint.
+# Relevant files: runs/routes.py, runs/schemas.py, experiments/templates/detail.html
+
+
+def _create_experiment_with_runs(client, count):
+    """Helper: create an experiment with `count` runs of increasing accuracy."""
+    exp_id = client.post("/api/experiments", json={"name": "Paged"}).json()["id"]
+    for i in range(count):
+        client.post(f"/api/experiments/{exp_id}/runs", json={"name": f"R{i}", "accuracy": i / 10})
+    return exp_id
+
+
+def test_list_runs_paginates(client):
+    """Offset and limit return a window of runs plus the total count."""
+    exp_id = _create_experiment_with_runs(client, 5)
+    response = client.get(f"/api/experiments/{exp_id}/runs?offset=2&limit=2")
+    assert response.status_code == 200
+    data = response.json()
+    assert data["total"] == 5
+    assert [r["name"] for r in data["runs"]] == ["R2", "R3"]
+
+
+def test_list_runs_sorts_descending(client):
+    """Runs can be sorted by a metric in descending order."""
+    exp_id = _create_experiment_with_runs(client, 3)
+    data = client.get(f"/api/experiments/{exp_id}/runs?sort=accuracy&order=desc").json()
+    assert [r["name"] for r in data["runs"]] == ["R2", "R1", "R0"]
+
+
+def test_list_runs_rejects_unknown_sort(client):
+    """An unsupported sort field returns 422."""
+    exp_id = _create_experiment_with_runs(client, 1)
+    response = client.get(f"/api/experiments/{exp_id}/runs?sort=notes")
+    assert response.status_code == 422
+
+
+def test_list_runs_experiment_not_found(client):
+    """Listing runs for a nonexistent experiment returns 404."""
+    response = client.get("/api/experiments/999/runs")
+    assert response.status_code == 404
+
+
+def test_detail_page_does_not_inline_runs(client):
+    """The detail page carries summary stats but leaves the run rows to the API."""
+    exp_id = _create_experiment_with_runs(client, 2)
+    client.post(f"/api/experiments/{exp_id}/runs", json={"name": "R-notes", "notes": "very long notes"})
+    response = client.get(f"/experiments/{exp_id}")
+    assert response.status_code == 200
+    assert "very long notes" not in response.text
+    assert f"/api/experiments/{exp_id}/runs" in response.text
@@ -0,0 +1,100 @@
+# tests/test_sketch.py
+# Tests for per-experiment metric sketches and the distribution endpoints.
+# Why: Percentiles come from bucket counts, not rows; they must stay within the promised error.
+# Relevant files: shared/sketch.py, runs/models.py, experiments/routes.py, tags/routes.py
+
+import random
+
+from runs.models import RunMetricBucket
+from shared.sketch import DDSketch, rebuild_sketches
+from tags.models import Tag
+
+
+def _exact(values, pct):
+    ordered = sorted(values)
+    return ordered[max(1, -(-len(ordered) * pct // 100)) - 1]
+
+
+def test_quantiles_within_relative_accuracy():
+    """Every percentile is within the sketch's relative accuracy of the exact nearest-rank value."""
+    rng = random.Random(1)
+    values = [rng.lognormvariate(4, 1) for _ in range(5000)]
+    sketch = DDSketch()
+    for v in values:
+        sketch.add(v)
+    for pct in (1, 50, 90, 99, 100):
+        exact = _exact(values, pct)
+        assert abs(sketch.quantile(pct) - exact) <= sketch.relative_accuracy * exact
+
+
+def test_merge_equals_sketch_of_combined_data():
+    """Merging two sketches gives the same buckets as sketching all values at once."""
+    a, b, combined = DDSketch(), DDSketch(), DDSketch()
+    for v in [0.0, 1.5, 20.0]:
+        a.add(v)
+        combined.add(v)
+    for v in [3.0, 400.0]:
+        b.add(v)
+        combined.add(v)
+    a.merge(b)
+    assert a.counts == combined.counts
+    assert a.quantile(20) == 0.0
+
+
+def test_histogram_counts_every_value():
+    sketch = DDSketch()
+    for v in range(1, 101):
+        sketch.add(float(v))
+    bins = sketch.histogram(10)
+    assert len(bins) == 10
+    assert sum(b["count"] for b in bins) == 100
+
+
+def _create_experiment(client, latencies):
+    exp_id = client.post("/api/experiments", json={"name": "Dist"}).json()["id"]
+    for latency in latencies:
+        client.post(f"/api/experiments/{exp_id}/runs", json={"latency_ms": latency})
+    return exp_id
+
+
+def test_experiment_distribution_endpoint(client):
+    """Ingested runs are reflected in the experiment's percentiles and histogram."""
+    exp_id = _create_experiment(client, [float(v) for v in range(1, 101)])
+    data = client.get(f"/api/experiments/{exp_id}/distribution?metric=latency_ms&percentiles=50,99&bins=4").json()
+    assert data["count"] == 100
+    assert abs(data["percentiles"]["p50"] - 50) <= 0.5
+    assert abs(data["percentiles"]["p99"] - 99) <= 1
+    assert sum(b["count"] for b in data["histogram"]) == 100
+
+
+def test_tag_distribution_merges_experiments(client, db_session):
+    """A tag's distribution covers the runs of every experiment carrying that tag."""
+    first = _create_experiment(client, [10.0, 20.0])
+    second = _create_experiment(client, [30.0])
+    _create_experiment(client, [1000.0])
+    db_session.add_all([Tag(experiment_id=first, name="gpu"), Tag(experiment_id=second, name="gpu")])
+    db_session.commit()
+    data = client.get("/api/tags/gpu/distribution?metric=latency_ms&percentiles=100").json()
+    assert data["count"] == 3
+    assert abs(data["percentiles"]["p100"] - 30) <= 0.3
+
+
+def test_rebuild_matches_incremental(client, db_session):
+    """Rebuilding from the runs table reproduces the buckets maintained on ingest."""
+    _create_experiment(client, [5.0, 50.0, 500.0])
+
+    def buckets():
+        return sorted((r.experiment_id, r.metric, r.bucket, r.count) for r in db_session.query(RunMetricBucket))
+
+    before = buckets()
+    rebuild_sketches(db_session)
+    db_session.commit()
+    assert buckets() == before
+
+
+def test_distribution_errors(client):
+    """Unknown experiment or tag is 404; unknown metric is 422."""
+    assert client.get("/api/experiments/999/distribution").status_code == 404
+    assert client.get("/api/tags/nope/distribution").status_code == 404
+    exp_id = _create_experiment(client, [1.0])
+    assert client.get(f"/api/experiments/{exp_id}/distribution?metric=notes").status_code == 422
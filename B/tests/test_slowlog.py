@@ -0,0 +1,83 @@
+# tests/test_slowlog.py
+# Tests for the slow query log and its summary.
+# Why: Slow statements must be logged with route and query plan so missing indexes are visible.
+# Relevant files: shared/slowlog.py, shared/instrumentation.py, manage.py
+
+import os
+from types import SimpleNamespace
+
+import pytest
+from sqlalchemy import create_engine, text
+
+from shared.instrumentation import instrument_engine
+from shared.slowlog import read_entries, slow_query_log, summarize
+
+
+@pytest.fixture(name="slow_log")
+def fixture_slow_log(tmp_path, db_session):
+    """Log every statement (threshold 0) to a temporary file for the duration of a test."""
+    instrument_engine(db_session.get_bind())
+    old_path, old_threshold = slow_query_log.path, slow_query_log.threshold_ms
+    slow_query_log.path = str(tmp_path / "slow.log")
+    slow_query_log.threshold_ms = 0
+    yield slow_query_log.path
+    slow_query_log.path, slow_query_log.threshold_ms = old_path, old_threshold
+
+
+def test_slow_query_logged_with_route_and_plan(client, slow_log):
+    """A statement over the threshold is logged with its route and EXPLAIN QUERY PLAN."""
+    exp_id = client.post("/api/experiments", json={"name": "Slow"}).json()["id"]
+    client.get(f"/api/experiments/{exp_id}/tags")
+    entries = [e for e in read_entries(slow_log) if e["route"] == "/api/experiments/{experiment_id}/tags"]
+    tag_query = next(e for e in entries if "FROM tags" in e["sql"])
+    assert tag_query["method"] == "GET"
+    assert tag_query["plan"]
+
+
+def _record(statement, parameters=()):
+    """Helper: log one statement as if it came from a non-SQLite connection (no plan)."""
+    conn = SimpleNamespace(dialect=SimpleNamespace(name="other"))
+    slow_query_log.maybe_record(conn, None, statement, parameters, 1.0, "GET", "/r")
+
+
+def test_entries_cap_sql_and_params_and_use_utc(slow_log):
+    """Huge statements and parameter lists are truncated; timestamps carry their UTC offset."""
+    _record("SELECT " + "x" * 10_000, ["p" * 10_000])
+    (entry,) = read_entries(slow_log)
+    assert len(entry["sql"]) == 2000
+    assert len(entry["params"]) == 500
+    assert entry["timestamp"].endswith("+00:00")
+
+
+def test_log_reopens_after_external_rotation(slow_log):
+    """After logrotate moves the file away, writers start a new one and both are read back."""
+    _record("SELECT 1")
+    os.rename(slow_log, slow_log + ".1")
+    _record("SELECT 2")
+    assert os.path.exists(slow_log)
+    assert [e["sql"] for e in read_entries(slow_log)] == ["SELECT 1", "SELECT 2"]
+
+
+def test_engine_without_slow_log_is_not_logged(slow_log, tmp_path):
+    """Benchmark engines are instrumented with slow_log=False and never write to the log."""
+    engine = create_engine(f"sqlite:///{tmp_path / 'bench.db'}")
+    instrument_engine(engine, slow_log=False)
+    with engine.connect() as conn:
+        conn.execute(text("SELECT 1"))
+    engine.dispose()
+    assert read_entries(slow_log) == []
+
+
+def test_summarize_ranks_and_flags_full_scans():
+    """Entries are grouped by SQL, ranked by total time, and full scans are flagged."""
+    entries = [
+        {"timestamp": "1", "method": "GET", "route": "/a", "duration_ms": 5.0, "sql": "q1", "plan": ["SCAN runs"]},
+        {"timestamp": "2", "method": "GET", "route": "/a", "duration_ms": 7.0, "sql": "q1", "plan": ["SCAN runs"]},
+        {"timestamp": "3", "method": "GET", "route": "/b", "duration_ms": 9.0, "sql": "q2",
+         "plan": ["SEARCH runs USING INDEX ix_runs_id (id=?)"]},
+    ]
+    groups = summarize(entries)
+    assert [g["sql"] for g in groups] == ["q1", "q2"]
+    assert groups[0]["count"] == 2 and groups[0]["full_scan"]
+    assert not groups[1]["full_scan"]
+    assert summarize(entries, sort="max")[0]["sql"] == "q2"
@@ -0,0 +1,80 @@
+# tests/test_startup.py
+# Tests for the cold-start profile and the CLI's import path.
+# Why: Non-serving commands should not pay for FastAPI; a stray top-level import quietly undoes that.
+# Relevant files: benchmarks/startup.py, manage.py (create_app, startup-profile), shared/routing.py
+
+import subprocess
+import sys
+
+from benchmarks.startup import group_by_package, parse_importtime
+from shared.config import BASE_DIR
+
+IMPORTTIME = """\
+import time: self [us] | cumulative | imported package
+import time:       120 |        120 |   _io
+import time:      2000 |       5000 | sqlalchemy
+import time:      3000 |       3000 |   sqlalchemy.orm
+import time:       400 |        400 |   shared.config
+import time:       600 |       1000 | manage
+"""
+
+
+def test_parse_importtime_reads_rows_in_order():
+    modules = parse_importtime(IMPORTTIME)
+    assert [m["module"] for m in modules] == ["_io", "sqlalchemy", "sqlalchemy.orm", "shared.config", "manage"]
+    assert modules[1] == {"module": "sqlalchemy", "self_us": 2000, "cumulative_us": 5000, "depth": 0}
+    assert modules[2]["depth"] == 1
+
+
+def test_group_by_package_collapses_app_modules():
+    totals = group_by_package(parse_importtime(IMPORTTIME))
+    assert totals == {"sqlalchemy": 5000, "app": 1000, "_io": 120}
+    assert list(totals) == ["sqlalchemy", "app", "_io"]
+
+
+def test_importing_manage_does_not_import_fastapi():
+    probe = "import sys, manage; print('fastapi' in sys.modules)"
+    result = subprocess.run([sys.executable, "-c", probe], cwd=BASE_DIR, capture_output=True, text=True, check=True)
+    assert result.stdout.strip() == "False"
+
+
+def _start(app):
+    """Helper: run the app's startup and shutdown."""
+    import asyncio
+
+    async def lifespan():
+        async with app.router.lifespan_context(app):
+            pass
+
+    asyncio.run(lifespan())
+
+
+def test_serve_workers_skip_schema_check(monkeypatch):
+    """With SCHEMA_READY_ENV set (by `serve`, before forking), app startup leaves the schema alone."""
+    import manage
+
+    checks = []
+    monkeypatch.setattr(manage, "_ensure_tables", lambda: checks.append(1))
+    _start(manage.create_app())
+    assert checks == [1]
+    monkeypatch.setenv(manage.SCHEMA_READY_ENV, manage._schema_fingerprint())
+    _start(manage.create_app())
+    assert checks == [1]
+
+
+def test_reloaded_worker_with_new_schema_checks_it(monkeypatch):
+    """A worker whose models differ from what `serve` checked (new code after SIGHUP) runs the check."""
+    from sqlalchemy import Column, Integer, Table
+
+    import manage
+    from shared.base import Base
+
+    checks = []
+    monkeypatch.setattr(manage, "_ensure_tables", lambda: checks.append(1))
+    monkeypatch.setenv(manage.SCHEMA_READY_ENV, manage._schema_fingerprint())
+    table = Table("reload_probe", Base.metadata, Column("id", Integer, primary_key=True))
+    try:
+        _start(manage.create_app())
+    finally:
+        Base.metadata.remove(table)
+    assert checks == [1]
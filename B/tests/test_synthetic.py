@@ -0,0 +1,37 @@
+# tests/test_synthetic.py
+# Tests for bulk synthetic data generation (manage.py seed --experiments).
+# Why: Seeding tens of thousands of experiments must not bind one SQL variable per experiment (SQLite caps them).
+# Relevant files: shared/synthetic.py, shared/sketch.py, shared/rollup.py
+
+from sqlalchemy import create_engine, event, func, select
+from sqlalchemy.pool import StaticPool
+
+import experiments.models  # noqa: F401
+import exports.models  # noqa: F401
+import tags.models  # noqa: F401
+from runs.models import RunMetricBucket, RunMetricRollup
+from shared.base import Base
+from shared.synthetic import generate
+
+
+def test_generate_builds_sketches_and_rollups_without_binding_every_id():
+    """Sketch and rollup rebuilds select the new experiments with a subquery, not an expanded id list."""
+    engine = create_engine("sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool)
+    Base.metadata.create_all(bind=engine)
+    largest = []
+
+    @event.listens_for(engine, "before_cursor_execute")
+    def _count_params(conn, cursor, statement, parameters, context, executemany):
+        if not executemany:
+            largest.append(len(parameters or ()))
+
+    try:
+        counts = generate(engine, experiments=200, runs_per_exp=2, tags=1)
+        with engine.connect() as conn:
+            sketched = conn.scalar(select(func.count(func.distinct(RunMetricBucket.experiment_id))))
+            rolled_up = conn.scalar(select(func.count(func.distinct(RunMetricRollup.experiment_id))))
+    finally:
+        engine.dispose()
+    assert counts == {"experiments": 200, "runs": 400, "tags": 200}
+    assert sketched == rolled_up == 200
+    assert max(largest) < 200
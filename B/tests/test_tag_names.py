@@ -0,0 +1,65 @@
+# tests/test_tag_names.py
+# Tests for the denormalized experiments.tag_names column kept in sync with the tags table.
+# Why: List pages trust tag_names instead of joining tags; the triggers must never let it drift.
+# Relevant files: tags/models.py, experiments/models.py, experiments/routes.py
+
+from sqlalchemy import text
+
+from experiments.models import Experiment
+from tags.models import Tag, ensure_tag_names
+
+
+def _tag_names(db_session, exp_id):
+    db_session.expire_all()
+    return db_session.get(Experiment, exp_id).tag_names
+
+
+def test_triggers_keep_tag_names_in_sync(client, db_session):
+    """Insert, rename, move, and delete on tags are all reflected in tag_names, sorted."""
+    first = client.post("/api/experiments", json={"name": "A"}).json()["id"]
+    second = client.post("/api/experiments", json={"name": "B"}).json()["id"]
+    nlp, gpu = Tag(experiment_id=first, name="nlp"), Tag(experiment_id=first, name="gpu")
+    db_session.add_all([nlp, gpu])
+    db_session.commit()
+    assert _tag_names(db_session, first) == '["gpu","nlp"]'
+
+    nlp.name = "vision"
+    db_session.commit()
+    assert _tag_names(db_session, first) == '["gpu","vision"]'
+
+    gpu.experiment_id = second
+    db_session.commit()
+    assert _tag_names(db_session, first) == '["vision"]'
+    assert _tag_names(db_session, second) == '["gpu"]'
+
+    db_session.delete(gpu)
+    db_session.commit()
+    assert _tag_names(db_session, second) == "[]"
+
+
+def test_list_returns_tags_and_filters_by_tag(client, db_session):
+    tagged = client.post("/api/experiments", json={"name": "Tagged"}).json()["id"]
+    client.post("/api/experiments", json={"name": "Plain"})
+    db_session.add(Tag(experiment_id=tagged, name="prod"))
+    db_session.commit()
+
+    by_id = {e["id"]: e for e in client.get("/api/experiments").json()}
+    assert by_id[tagged]["tags"] == ["prod"]
+    assert len(by_id) == 2
+    filtered = client.get("/api/experiments?tag=prod").json()
+    assert [e["id"] for e in filtered] == [tagged]
+
+
+def test_ensure_tag_names_backfills_older_database(client, db_session):
+    """Without triggers (an older database), ensure_tag_names recreates them and backfills in one UPDATE."""
+    exp_id = client.post("/api/experiments", json={"name": "Old"}).json()["id"]
+    conn = db_session.connection()
+    for name in ("tags_sync_insert", "tags_sync_delete", "tags_sync_update"):
+        conn.execute(text(f"DROP TRIGGER {name}"))
+    db_session.add(Tag(experiment_id=exp_id, name="legacy"))
+    db_session.commit()
+    assert _tag_names(db_session, exp_id) == "[]"
+
+    ensure_tag_names(db_session.connection())
+    db_session.commit()
+    assert _tag_names(db_session, exp_id) == '["legacy"]'
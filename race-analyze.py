@@ -0,0 +1,369 @@
+#!/usr/bin/env python3
+"""Analyze race stream-json logs in one streaming pass and emit JSON for the slides.
+
+Usage:
+    # Analyze the most recent race (or a given results dir); JSON on stdout:
+    python3 race-analyze.py [results-dir] [--out analysis.json] [--summary]
+
+    # Timestamp a live stream (race.sh pipes `claude -p` through this):
+    claude -p "..." --output-format stream-json --verbose | python3 race-analyze.py --stamp > A-before.jsonl
+
+Per agent it reports tool-call counts, a per-call latency timeline, per-turn timing with
+cumulative input/output tokens, time to first edit and time to first passing test. For
+multi-trial runs (trial-<n>/ subdirectories) it adds a per-version summary: mean/median/p90
+wall time, tokens and tool calls, and the test pass rate.
+
+stream-json lines carry no wall-clock time of their own, so latencies need the
+"timestamp" field that --stamp adds as each line arrives (Claude session transcripts
+already have one). Without it, counts and tokens are still reported and times are null.
+
+Requirements: Python 3.9+ (standard library only)
+"""
+
+import argparse
+import glob
+import json
+import math
+import os
+import re
+import statistics
+import sys
+from datetime import datetime, timezone
+
+SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
+
+AGENTS = {"A": "A-before", "B": "B-after"}
+EDIT_TOOLS = {"Edit", "MultiEdit", "Write", "NotebookEdit"}
+TEST_COMMAND = re.compile(r"\b(pytest|unittest)\b")
+TESTS_PASSED = re.compile(r"\b\d+ passed\b")
+TESTS_FAILED = re.compile(r"\b\d+ (failed|errors?)\b")
+USAGE_FIELDS = ("input_tokens", "cache_creation_input_tokens", "cache_read_input_tokens", "output_tokens")
+
+
+# ── Stamping ────────────────────────────────────────────────────────────────
+
+def stamp(src, dst):
+    """Copy stream-json lines from src to dst, adding an arrival "timestamp" to each object.
+
+    The field is spliced in as text rather than by re-serializing, so the rest of every
+    line stays byte-for-byte what the CLI wrote.
+    """
+    for line in src:
+        body = line.lstrip()
+        if body.startswith(b"{"):
+            now = datetime.now(timezone.utc).isoformat(timespec="milliseconds")
+            sep = b"" if body[1:].lstrip().startswith(b"}") else b","
+            line = b'{"timestamp":"' + now.encode() + b'"' + sep + body[1:]
+        dst.write(line)
+        dst.flush()
+
+
+# ── Analysis ────────────────────────────────────────────────────────────────
+
+def parse_time(value):
+    if not value:
+        return None
+    try:
+        return datetime.fromisoformat(value.replace("Z", "+00:00")).timestamp()
+    except ValueError:
+        return None
+
+
+def result_text(block):
+    content = block.get("content")
+    if isinstance(content, list):
+        return "\n".join(part.get("text", "") for part in content if isinstance(part, dict))
+    return content or ""
+
+
+def analyze(path):
+    """One pass over a stream-json file; memory is bounded by the number of in-flight tool calls."""
+    start = None
+    tool_counts = {}
+    calls = []          # timeline, in call order
+    pending = {}        # tool_use_id -> timeline entry awaiting its result
+    usage = {}          # message id -> latest usage seen (blocks of one message repeat it)
+    turns = []
+    first_edit = None
+    first_pass = None
+    handed_over = None  # when the model last got the conversation back (init or tool results)
+    final = None
+    lines = bad_lines = 0
+
+    def rel(ts):
+        return None if ts is None or start is None else round(ts - start, 3)
+
+    with open(path, "rb") as f:
+        for raw in f:
+            lines += 1
+            try:
+                event = json.loads(raw)
+            except ValueError:
+                bad_lines += 1
+                continue
+            if not isinstance(event, dict):
+                continue
+            ts = parse_time(event.get("timestamp"))
+            if start is None and ts is not None:
+                start = ts
+            kind = event.get("type")
+            message = event.get("message") or {}
+
+            if kind == "assistant":
+                msg_id = message.get("id") or f"line-{lines}"
+                if msg_id not in usage:
+                    if turns and turns[-1]["end"] is None:
+                        turns[-1]["end"] = rel(ts)
+                    wait = round(ts - handed_over, 3) if ts is not None and handed_over is not None else None
+                    turns.append({"turn": len(turns) + 1, "message_id": msg_id, "start": rel(ts),
+                                  "end": None, "model_latency_s": wait, "tool_calls": 0})
+                usage[msg_id] = message.get("usage") or usage.get(msg_id) or {}
+                for block in message.get("content") or ():
+                    if block.get("type") != "tool_use":
+                        continue
+                    name = block.get("name", "?")
+                    tool_counts[name] = tool_counts.get(name, 0) + 1
+                    turns[-1]["tool_calls"] += 1
+                    entry = {"id": block.get("id"), "name": name, "turn": len(turns), "start": rel(ts),
+                             "end": None, "latency_s": None, "is_error": None}
+                    if name == "Bash":
+                        entry["command"] = ((block.get("input") or {}).get("command") or "")[:200]
+                    calls.append(entry)
+                    pending[entry["id"]] = entry
+                    if first_edit is None and name in EDIT_TOOLS:
+                        first_edit = rel(ts)
+
+            elif kind == "system":
+                handed_over = ts
+
+            elif kind == "user":
+                handed_over = ts
+                if turns and turns[-1]["end"] is None:
+                    turns[-1]["end"] = rel(ts)
+                content = message.get("content")
+                for block in content if isinstance(content, list) else ():
+                    if not isinstance(block, dict) or block.get("type") != "tool_result":
+                        continue
+                    entry = pending.pop(block.get("tool_use_id"), None)
+                    if entry is None:
+                        continue
+                    entry["end"] = rel(ts)
+                    entry["is_error"] = bool(block.get("is_error"))
+                    if entry["start"] is not None and entry["end"] is not None:
+                        entry["latency_s"] = round(entry["end"] - entry["start"], 3)
+                    if (first_pass is None and entry["name"] == "Bash" and not entry["is_error"]
+                            and TEST_COMMAND.search(entry.get("command", ""))):
+                        text = result_text(block)
+                        if TESTS_PASSED.search(text) and not TESTS_FAILED.search(text):
+                            first_pass = entry["end"]
+
+            elif kind == "result":
+                final = event
+                if turns and turns[-1]["end"] is None:
+                    turns[-1]["end"] = rel(ts)
+
+    # Cumulative tokens per turn, in order; cache reads/writes are input too, so report them apart.
+    totals = dict.fromkeys(USAGE_FIELDS, 0)
+    for turn in turns:
+        turn_usage = usage.get(turn.pop("message_id"), {})
+        for field in USAGE_FIELDS:
+            totals[field] += turn_usage.get(field) or 0
+        turn["duration_s"] = (round(turn["end"] - turn["start"], 3)
+                              if turn["start"] is not None and turn["end"] is not None else None)
+        turn["cumulative_input_tokens"] = (totals["input_tokens"] + totals["cache_creation_input_tokens"]
+                                           + totals["cache_read_input_tokens"])
+        turn["cumulative_output_tokens"] = totals["output_tokens"]
+
+    latencies = sorted(c["latency_s"] for c in calls if c["latency_s"] is not None)
+    return {
+        "file": path,
+        "lines": lines,
+        "unparsed_lines": bad_lines,
+        "timestamps": start is not None,
+        "tool_calls": {"total": len(calls), "by_tool": dict(sorted(tool_counts.items()))},
+        "tool_latency_s": {
+            "total": round(sum(latencies), 3),
+            "median": latencies[len(latencies) // 2] if latencies else None,
+            "max": latencies[-1] if latencies else None,
+        },
+        "tokens": {**totals, "total_input_tokens": turns[-1]["cumulative_input_tokens"] if turns else 0},
+        "time_to_first_edit_s": first_edit,
+        "time_to_first_passing_test_s": first_pass,
+        "duration_s": final["duration_ms"] / 1000 if final and final.get("duration_ms") is not None else None,
+        "num_turns": (final or {}).get("num_turns", len(turns)),
+        "cost_usd": (final or {}).get("total_cost_usd"),
+        "is_error": (final or {}).get("is_error"),
+        "turns": turns,
+        "timeline": calls,
+    }
+
+
+def read_number(path):
+    try:
+        with open(path) as f:
+            return float(f.read().strip())
+    except (OSError, ValueError):
+        return None
+
+
+def read_lines(path):
+    try:
+        with open(path) as f:
+            return [line.rstrip("\n") for line in f if line.strip()]
+    except OSError:
+        return None
+
+
+def analyze_trial(trial_dir):
+    agents = {}
+    for agent, label in AGENTS.items():
+        log = os.path.join(trial_dir, f"{label}.jsonl")
+        if not os.path.exists(log):
+            agents[agent] = None
+            continue
+        result = analyze(log)
+        result["wall_time_s"] = read_number(os.path.join(trial_dir, f"{label}.time"))
+        exit_code = read_number(os.path.join(trial_dir, f"{label}.tests"))
+        result["tests_passed"] = None if exit_code is None else exit_code == 0
+        result["files_changed"] = read_lines(os.path.join(trial_dir, f"{label}.files"))
+        agents[agent] = result
+    return agents
+
+
+def stats(values):
+    """mean/median/p90 (nearest rank) of the non-null values."""
+    values = sorted(v for v in values if v is not None)
+    if not values:
+        return {"n": 0, "mean": None, "median": None, "p90": None, "min": None, "max": None}
+    return {
+        "n": len(values),
+        "mean": round(statistics.fmean(values), 3),
+        "median": round(statistics.median(values), 3),
+        "p90": values[max(1, math.ceil(0.9 * len(values))) - 1],
+        "min": values[0],
+        "max": values[-1],
+    }
+
+
+def summarize(trials):
+    summary = {}
+    for agent in AGENTS:
+        results = [t["agents"][agent] for t in trials if t["agents"][agent] is not None]
+        tested = [r["tests_passed"] for r in results if r["tests_passed"] is not None]
+        summary[agent] = {
+            "trials": len(results),
+            "wall_time_s": stats(r["wall_time_s"] for r in results),
+            "input_tokens": stats(r["tokens"]["total_input_tokens"] for r in results),
+            "output_tokens": stats(r["tokens"]["output_tokens"] for r in results),
+            "tool_calls": stats(r["tool_calls"]["total"] for r in results),
+            "time_to_first_edit_s": stats(r["time_to_first_edit_s"] for r in results),
+            "time_to_first_passing_test_s": stats(r["time_to_first_passing_test_s"] for r in results),
+            "pass_rate": round(sum(tested) / len(tested), 3) if tested else None,
+        }
+    return summary
+
+
+def analyze_results(results_dir):
+    """Analyze race.sh output: trial-<n>/ subdirectories, or the logs directly in results_dir."""
+    trial_dirs = sorted(glob.glob(os.path.join(results_dir, "trial-*", "")),
+                        key=lambda d: int(os.path.basename(d.rstrip(os.sep)).split("-")[-1]))
+    trials = [{"trial": os.path.basename(d.rstrip(os.sep)), "agents": analyze_trial(d)}
+              for d in trial_dirs or [results_dir]]
+    return {"results_dir": results_dir, "summary": summarize(trials), "trials": trials}
+
+
+def print_agent(agent, result, out):
+    def fmt(value, unit="s"):
+        return "N/A" if value is None else f"{value:g}{unit}"
+
+    label = f"Version {agent}"
+    if result is None:
+        print(f"  [{label}] No output file found", file=out)
+        return
+    tokens = result["tokens"]
+    print(f"  [{label}] Tool usage breakdown:", file=out)
+    for name, count in result["tool_calls"]["by_tool"].items():
+        print(f"    {name}: {count}", file=out)
+    print(f"    Total tool calls: {result['tool_calls']['total']}", file=out)
+    print(f"    Input tokens: {tokens['total_input_tokens']} "
+          f"({tokens['cache_read_input_tokens']} cache read)", file=out)
+    print(f"    Output tokens: {tokens['output_tokens']}", file=out)
+    print(f"    Wall time: {fmt(result['wall_time_s'])}", file=out)
+    print(f"    Time to first edit: {fmt(result['time_to_first_edit_s'])}", file=out)
+    print(f"    Time to first passing test: {fmt(result['time_to_first_passing_test_s'])}", file=out)
+    print(f"    Tool time (sum / median / max): {fmt(result['tool_latency_s']['total'])} / "
+          f"{fmt(result['tool_latency_s']['median'])} / {fmt(result['tool_latency_s']['max'])}", file=out)
+    if result["files_changed"] is not None:
+        print(f"    Files changed: {len(result['files_changed'])}", file=out)
+        for line in result["files_changed"]:
+            print(f"      {line}", file=out)
+    if result["tests_passed"] is not None:
+        print(f"    Tests after run: {'PASS' if result['tests_passed'] else 'FAIL'}", file=out)
+    print("", file=out)
+
+
+def print_summary(report, out):
+    trials = report["trials"]
+    if len(trials) == 1:
+        for agent, result in trials[0]["agents"].items():
+            print_agent(agent, result, out)
+        return
+
+    def cell(s, unit=""):
+        if s["n"] == 0:
+            return "N/A"
+        return f"{s['mean']:g}{unit} / {s['median']:g}{unit} / {s['p90']:g}{unit}"
+
+    print(f"  {len(trials)} trials (mean / median / p90)", file=out)
+    for agent, s in report["summary"].items():
+        rate = "N/A" if s["pass_rate"] is None else f"{s['pass_rate']:.0%}"
+        print(f"  [Version {agent}] {s['trials']} completed", file=out)
+        print(f"    Wall time:     {cell(s['wall_time_s'], 's')}", file=out)
+        print(f"    Input tokens:  {cell(s['input_tokens'])}", file=out)
+        print(f"    Output tokens: {cell(s['output_tokens'])}", file=out)
+        print(f"    Tool calls:    {cell(s['tool_calls'])}", file=out)
+        print(f"    First edit:    {cell(s['time_to_first_edit_s'], 's')}", file=out)
+        print(f"    Test pass rate: {rate}", file=out)
+        print("", file=out)
+
+
+def latest_results_dir():
+    dirs = sorted(glob.glob(os.path.join(SCRIPT_DIR, "race-results", "*", "")), key=os.path.getmtime)
+    return dirs[-1] if dirs else None
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Analyze race stream-json logs.")
+    parser.add_argument("results_dir", nargs="?", help="race-results/<timestamp>/ (default: most recent)")
+    parser.add_argument("--out", help="write the JSON report here instead of stdout")
+    parser.add_argument("--summary", action="store_true",
+                        help="print a human-readable summary (JSON then needs --out)")
+    parser.add_argument("--stamp", action="store_true",
+                        help="filter mode: timestamp stream-json from stdin to stdout")
+    return parser.parse_args()
+
+
+def main():
+    args = parse_args()
+    if args.stamp:
+        stamp(sys.stdin.buffer, sys.stdout.buffer)
+        return
+
+    results_dir = args.results_dir or latest_results_dir()
+    if not results_dir:
+        sys.exit("No race results found. Run race.sh first.")
+    report = analyze_results(results_dir)
+
+    if args.summary:
+        print_summary(report, sys.stdout)
+    if args.out:
+        with open(args.out, "w") as f:
+            json.dump(report, f, indent=2)
+            f.write("\n")
+    elif not args.summary:
+        json.dump(report, sys.stdout, indent=2)
+        sys.stdout.write("\n")
+
+
+if __name__ == "__main__":
+    main()
@@ -20,58 +20,12 @@ fi
 echo "Analyzing: $RESULTS_DIR"
 echo ""
 
-# Parse stream-json for tool usage breakdown
-analyze_tools() {
-    local file="$1"
-    local label="$2"
-
-    if [[ ! -f "$file" ]]; then
-        echo "  [$label] No output file found"
-        return
-    fi
-
-    echo "  [$label] Tool usage breakdown:"
-
-    # Count each tool type
-    for tool in Read Write Edit Glob Grep Bash; do
-        local count=$(grep -o "\"name\":\"$tool\"" "$file" 2>/dev/null | wc -l | tr -d ' ')
-        if [[ "$count" -gt 0 ]]; then
-            echo "    $tool: $count"
-        fi
-    done
-
-    # Count total tokens if available
-    local input_tokens=$(grep -o '"input_tokens":[0-9]*' "$file" 2>/dev/null | tail -1 | grep -o '[0-9]*' || echo "N/A")
-    local output_tokens=$(grep -o '"output_tokens":[0-9]*' "$file" 2>/dev/null | tail -1 | grep -o '[0-9]*' || echo "N/A")
-    echo "    Input tokens: $input_tokens"
-    echo "    Output tokens: $output_tokens"
-    echo ""
-}
-
-echo "--- Timing ---"
-echo "  Version A: $(cat "$RESULTS_DIR/A-before.time" 2>/dev/null || echo 'N/A')s"
-echo "  Version B: $(cat "$RESULTS_DIR/B-after.time" 2>/dev/null || echo 'N/A')s"
-echo ""
-
-echo "--- Tool Usage ---"
-analyze_tools "$RESULTS_DIR/A-before.jsonl" "Version A"
-analyze_tools "$RESULTS_DIR/B-after.jsonl" "Version B"
-
-echo "--- Files Modified ---"
-echo "  Version A:"
-cd "$SCRIPT_DIR/A"
-git diff --name-only -- . 2>/dev/null | sed 's/^/    /' || echo "    (no changes or not a git repo)"
-echo ""
-echo "  Version B:"
-cd "$SCRIPT_DIR/B"
-git diff --name-only -- . 2>/dev/null | sed 's/^/    /' || echo "    (no changes or not a git repo)"
-echo ""
-
-echo "--- Test Results ---"
-echo "  Version B:"
-cd "$SCRIPT_DIR/B"
-PYTEST=$(.venv/bin/pytest --version >/dev/null 2>&1 && echo ".venv/bin/pytest" || echo "pytest")
-$PYTEST --tb=line -q 2>&1 | tail -5 | sed 's/^/    /'
+# One streaming pass per log: tool counts, latencies, tokens, time to first edit/passing test.
+# race.sh records each trial's changed files and test outcome next to its logs, so those come
+# from the results dir too (the shared A/ and B/ checkouts are never touched by a race).
+echo "--- Results ---"
+python3 "$SCRIPT_DIR/race-analyze.py" "$RESULTS_DIR" --summary --out "$RESULTS_DIR/analysis.json"
+echo "  Full report (JSON): $RESULTS_DIR/analysis.json"
 echo ""
 
 echo "Done. Full logs in $RESULTS_DIR/"
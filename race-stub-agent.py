@@ -0,0 +1,68 @@
+#!/usr/bin/env python3
+"""Stand-in for `claude -p` that prints a short, plausible stream-json session.
+
+Usage:
+    ./race.sh --trials 4 --concurrency 2 --agent-cmd "python3 race-stub-agent.py"
+
+Accepts (and ignores) the CLI's arguments, changes nothing on disk, and finishes in
+well under a minute, so the race runner and race-analyze.py can be exercised without
+API calls. Turn count, delays and token usage vary from run to run.
+
+Environment:
+    RACE_STUB_DELAY  max seconds per simulated step (default 0.2)
+    RACE_STUB_SEED   make a run reproducible
+"""
+
+import json
+import os
+import random
+import sys
+import time
+
+TOOLS = ["Read", "Glob", "Grep", "Read", "Edit", "Bash"]
+
+
+def emit(event):
+    sys.stdout.write(json.dumps(event) + "\n")
+    sys.stdout.flush()
+
+
+def main():
+    rng = random.Random(os.environ.get("RACE_STUB_SEED"))
+    delay = float(os.environ.get("RACE_STUB_DELAY", "0.2"))
+    session = f"stub-{os.getpid()}"
+    started = time.monotonic()
+
+    emit({"type": "system", "subtype": "init", "session_id": session, "cwd": os.getcwd(), "tools": TOOLS})
+    cached = 0
+    turns = rng.randint(4, 10)
+    for turn in range(1, turns + 1):
+        time.sleep(rng.uniform(0, delay))
+        usage = {
+            "input_tokens": rng.randint(3, 40),
+            "cache_creation_input_tokens": rng.randint(200, 3000),
+            "cache_read_input_tokens": cached,
+            "output_tokens": rng.randint(20, 400),
+        }
+        cached += usage["cache_creation_input_tokens"]
+        name = "Bash" if turn == turns else rng.choice(TOOLS)
+        tool_input = {"command": "python -m pytest -q"} if name == "Bash" else {"file_path": "app.py"}
+        message = {"id": f"msg_{session}_{turn}", "type": "message", "role": "assistant", "usage": usage}
+        emit({"type": "assistant", "session_id": session,
+              "message": {**message, "content": [{"type": "text", "text": f"Step {turn}."}]}})
+        emit({"type": "assistant", "session_id": session,
+              "message": {**message, "content": [{"type": "tool_use", "id": f"toolu_{turn}",
+                                                  "name": name, "input": tool_input}]}})
+        time.sleep(rng.uniform(0, delay))
+        output = f"{rng.randint(3, 30)} passed in 0.42s" if name == "Bash" else "(stub output)"
+        emit({"type": "user", "session_id": session,
+              "message": {"role": "user", "content": [{"type": "tool_result", "tool_use_id": f"toolu_{turn}",
+                                                       "content": output, "is_error": False}]}})
+
+    emit({"type": "result", "subtype": "success", "session_id": session, "is_error": False,
+          "duration_ms": round((time.monotonic() - started) * 1000), "num_turns": turns,
+          "total_cost_usd": 0.0, "result": "Done (stub)."})
+
+
+if __name__ == "__main__":
+    main()
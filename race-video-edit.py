@@ -8,19 +8,31 @@ Usage:
     ffmpeg -i A.mov -vf "fps=1" /tmp/race-frames/A/frame_%03d.png
     ffmpeg -i B.mov -vf "fps=1" /tmp/race-frames/B/frame_%03d.png
 
-    # 3. Generate annotated frames:
-    python3 race-video-edit.py
+    # 3. Composite and encode in one pass (frames are piped into ffmpeg, no PNGs):
+    python3 race-video-edit.py [--workers N] [--output race-side-by-side.mp4]
 
-    # 4. Assemble into video (0.7x speed):
+    # Fallback: write annotated PNGs to /tmp/race-frames/out instead (also used
+    # automatically when ffmpeg is not on PATH), then assemble at 0.7x speed:
+    python3 race-video-edit.py --png [--workers N]
     ffmpeg -y -framerate 1 -i /tmp/race-frames/out/frame_%03d.png \
         -c:v libx264 -crf 23 -pix_fmt yuv420p -r 30 -an /tmp/race-normal.mp4
     ffmpeg -y -i /tmp/race-normal.mp4 -vf "setpts=1.43*PTS" \
         -c:v libx264 -crf 23 -an race-side-by-side.mp4
 
-Requirements: pip install Pillow
+Requirements: pip install Pillow; ffmpeg with libx264 on PATH
 """
 
+import argparse
+import functools
+import hashlib
 import os
+import shutil
+import subprocess
+import sys
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+
 from PIL import Image, ImageDraw, ImageFont
 
 SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
@@ -29,12 +41,7 @@ SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
 A_DIR = "/tmp/race-frames/A"
 B_DIR = "/tmp/race-frames/B"
 OUT_DIR = "/tmp/race-frames/out"
-os.makedirs(OUT_DIR, exist_ok=True)
-
-# Frame counts
-A_COUNT = len([f for f in os.listdir(A_DIR) if f.endswith(".png")])
-B_COUNT = len([f for f in os.listdir(B_DIR) if f.endswith(".png")])
-TOTAL = max(A_COUNT, B_COUNT)
+OUTPUT = "race-side-by-side.mp4"
 
 # Dimensions
 VW, VH = 1224, 1372  # each video panel
@@ -43,6 +50,10 @@ CALLOUT_H = 76
 CANVAS_W = VW * 2
 CANVAS_H = HEADER_H + CALLOUT_H + VH  # 1538 (even, required by libx264)
 
+# Encoding: one composited frame per recorded second, played at 0.7x speed
+SLOWDOWN = 1.43
+OUTPUT_FPS = 30
+
 
 # ── Colors ──────────────────────────────────────────────────────────────────
 
@@ -121,20 +132,27 @@ def center_text(draw, text, font, y, width, fill):
     draw.text((x, y), text, fill=fill, font=font)
 
 
-# ── Build frames ────────────────────────────────────────────────────────────
+def count_frames(directory):
+    return len([f for f in os.listdir(directory) if f.endswith(".png")])
 
-for sec in range(1, TOTAL + 1):
-    # Load video frames (clamp A to last frame if past its duration)
-    a_idx = min(sec, A_COUNT)
-    b_idx = min(sec, B_COUNT)
 
-    a_path = os.path.join(A_DIR, f"frame_{a_idx:03d}.png")
-    b_path = os.path.join(B_DIR, f"frame_{b_idx:03d}.png")
+def frame_path(directory, idx):
+    return os.path.join(directory, f"frame_{idx:03d}.png")
 
-    a_frame = Image.open(a_path).resize((VW, VH))
-    b_frame = Image.open(b_path).resize((VW, VH))
 
-    # Create canvas
+def file_digest(path):
+    with open(path, "rb") as f:
+        return hashlib.blake2b(f.read(), digest_size=16).digest()
+
+
+# ── Build frames ────────────────────────────────────────────────────────────
+# Each frame depends only on its second and the two frame counts, so frames are
+# built independently in worker processes. The task functions stay at module
+# level so the pool can pickle them. The caches below are per process.
+
+@functools.lru_cache(maxsize=1)
+def base_canvas():
+    """Everything that never changes: background, header labels, dividers, empty callout bar."""
     canvas = Image.new("RGB", (CANVAS_W, CANVAS_H), BG)
     draw = ImageDraw.Draw(canvas)
 
@@ -158,19 +176,216 @@ for sec in range(1, TOTAL + 1):
 
     # Callout bar
     draw.rectangle([(0, HEADER_H), (CANVAS_W, HEADER_H + CALLOUT_H)], fill=CALLOUT_BG)
+    return canvas
+
+
+@functools.lru_cache(maxsize=None)
+def callout_strip(text):
+    """The callout bar with `text` centered, measured and drawn once per distinct string."""
+    strip = Image.new("RGB", (CANVAS_W, CALLOUT_H), CALLOUT_BG)
+    center_text(ImageDraw.Draw(strip), text, font_callout, 18, CANVAS_W, ACCENT)
+    return strip
+
+
+# A and B are requested alternately, so a few entries keep both current panels,
+# including the clamped last frame of whichever agent finished first.
+@functools.lru_cache(maxsize=4)
+def load_panel(path):
+    with Image.open(path) as frame:
+        return frame.resize((VW, VH))
+
+
+def compose_frame(sec, a_count, b_count):
+    # Load video frames (clamp A to last frame if past its duration)
+    a_frame = load_panel(frame_path(A_DIR, min(sec, a_count)))
+    b_frame = load_panel(frame_path(B_DIR, min(sec, b_count)))
+
+    canvas = base_canvas().copy()
     callout = get_callout(sec)
     if callout:
-        center_text(draw, callout, font_callout, HEADER_H + 18, CANVAS_W, ACCENT)
+        canvas.paste(callout_strip(callout), (0, HEADER_H))
 
     # Paste video frames
     canvas.paste(a_frame, (0, HEADER_H + CALLOUT_H))
     canvas.paste(b_frame, (VW, HEADER_H + CALLOUT_H))
 
     # Vertical divider between panels
+    draw = ImageDraw.Draw(canvas)
     draw.line([(VW, HEADER_H + CALLOUT_H), (VW, CANVAS_H)], fill=(50, 50, 50), width=2)
 
-    canvas.save(os.path.join(OUT_DIR, f"frame_{sec:03d}.png"))
-    print(f"  frame {sec}/{TOTAL}", end="\r")
-
-print(f"\nDone. {TOTAL} frames written to {OUT_DIR}")
-print("Next: assemble with ffmpeg (see docstring for commands)")
+    return canvas
+
+
+def plan_frames(a_count, b_count):
+    """Collapse runs of identical output frames: [(sec, repeats), ...] in order.
+
+    A frame is identical to the previous one when both source frames have the same
+    content (idle screens, or the finished agent's clamped last frame) and the callout
+    text is the same. Only the first second of each run gets composited.
+    """
+    digests = {}
+
+    def digest(directory, idx):
+        key = (directory, idx)
+        if key not in digests:
+            digests[key] = file_digest(frame_path(directory, idx))
+        return digests[key]
+
+    plan = []
+    previous = None
+    for sec in range(1, max(a_count, b_count) + 1):
+        key = (digest(A_DIR, min(sec, a_count)), digest(B_DIR, min(sec, b_count)), get_callout(sec))
+        if key == previous:
+            plan[-1][1] += 1
+        else:
+            plan.append([sec, 1])
+            previous = key
+    return [tuple(run) for run in plan]
+
+
+def link_frame(src, dst):
+    # A hardlink costs no encode and no extra disk; copy where links aren't supported.
+    if os.path.exists(dst):
+        os.remove(dst)
+    try:
+        os.link(src, dst)
+    except OSError:
+        shutil.copyfile(src, dst)
+
+
+def build_chunk(runs, a_count, b_count, raw):
+    """Build a chunk of (sec, repeats) runs in one task, so each worker round-trip covers several frames.
+
+    Returns [(payload, repeats), ...]: with `raw`, the frame's packed RGB bytes for the
+    ffmpeg pipe; otherwise the PNG is saved to OUT_DIR (repeats hardlinked) and the
+    payload is its second.
+    """
+    built = []
+    for sec, repeats in runs:
+        canvas = compose_frame(sec, a_count, b_count)
+        if raw:
+            built.append((canvas.tobytes(), repeats))
+            continue
+        path = frame_path(OUT_DIR, sec)
+        canvas.save(path)
+        for dup in range(sec + 1, sec + repeats):
+            link_frame(path, frame_path(OUT_DIR, dup))
+        built.append((sec, repeats))
+    return built
+
+
+def iter_chunks(chunks, a_count, b_count, raw, workers):
+    """Yield built chunks in order, keeping at most two chunks per worker in flight.
+
+    The bound matters for raw frames (~11 MB each): an unbounded map would buffer the
+    whole video in memory whenever ffmpeg encodes slower than the pool composites.
+    """
+    if workers == 1:
+        for chunk in chunks:
+            yield build_chunk(chunk, a_count, b_count, raw)
+        return
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        pending = deque()
+        for chunk in chunks:
+            pending.append(pool.submit(build_chunk, chunk, a_count, b_count, raw))
+            if len(pending) >= workers * 2:
+                yield pending.popleft().result()
+        while pending:
+            yield pending.popleft().result()
+
+
+def ffmpeg_command(ffmpeg, output):
+    # Same result as the two-step PNG assembly in the docstring: 1 fps input,
+    # slowed by SLOWDOWN, resampled to OUTPUT_FPS, H.264 yuv420p, no audio.
+    return [
+        ffmpeg, "-y", "-loglevel", "error",
+        "-f", "rawvideo", "-pix_fmt", "rgb24", "-s", f"{CANVAS_W}x{CANVAS_H}", "-framerate", "1",
+        "-i", "-",
+        "-vf", f"setpts={SLOWDOWN}*PTS,fps={OUTPUT_FPS}",
+        "-c:v", "libx264", "-crf", "23", "-pix_fmt", "yuv420p", "-an",
+        output,
+    ]
+
+
+def chunked(seq, size):
+    return [seq[i:i + size] for i in range(0, len(seq), size)]
+
+
+def report(done, total, started):
+    elapsed = time.monotonic() - started
+    rate = done / elapsed if elapsed else 0.0
+    eta = (total - done) / rate if rate else 0.0
+    print(f"  frame {done}/{total}  {rate:5.1f} fps  eta {eta:4.0f}s", end="\r", flush=True)
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Compose the race side-by-side video.")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1,
+                        help="worker processes (default: number of CPUs; 1 builds in-process)")
+    parser.add_argument("--chunk-size", type=int, default=None,
+                        help="frames per task (default: spread ~4 tasks per worker, capped at 16)")
+    parser.add_argument("--output", default=OUTPUT, help=f"video to write (default: {OUTPUT})")
+    parser.add_argument("--png", action="store_true",
+                        help=f"write PNG frames to {OUT_DIR} instead of piping into ffmpeg")
+    parser.add_argument("--ffmpeg", default="ffmpeg", help="ffmpeg binary (default: ffmpeg on PATH)")
+    return parser.parse_args()
+
+
+def main():
+    args = parse_args()
+    if args.workers < 1:
+        sys.exit("--workers must be at least 1")
+
+    ffmpeg = None if args.png else shutil.which(args.ffmpeg)
+    if not args.png and ffmpeg is None:
+        print(f"{args.ffmpeg} not found, falling back to PNG frames in {OUT_DIR}")
+    raw = ffmpeg is not None
+
+    a_count = count_frames(A_DIR)
+    b_count = count_frames(B_DIR)
+    total = max(a_count, b_count)
+    plan = plan_frames(a_count, b_count)
+    print(f"{total} frames, {len(plan)} distinct ({total - len(plan)} repeats reused)")
+
+    # Small chunks keep the progress line moving and the pool balanced; bigger ones cut IPC per frame.
+    chunk_size = args.chunk_size or max(1, min(16, len(plan) // (args.workers * 4)))
+    chunks = chunked(plan, chunk_size)
+
+    if raw:
+        encoder = subprocess.Popen(ffmpeg_command(ffmpeg, args.output), stdin=subprocess.PIPE)
+    else:
+        os.makedirs(OUT_DIR, exist_ok=True)
+
+    started = time.monotonic()
+    done = 0
+    try:
+        for built in iter_chunks(chunks, a_count, b_count, raw, args.workers):
+            for payload, repeats in built:
+                if raw:
+                    for _ in range(repeats):
+                        encoder.stdin.write(payload)
+                done += repeats
+            report(done, total, started)
+    except BrokenPipeError:
+        pass  # ffmpeg exited early; its own error is on stderr and the return code is checked below
+    finally:
+        if raw:
+            try:
+                encoder.stdin.close()
+            except BrokenPipeError:
+                pass
+            returncode = encoder.wait()
+
+    elapsed = time.monotonic() - started
+    print()
+    if raw:
+        if returncode != 0:
+            sys.exit(f"ffmpeg failed (exit {returncode}) after {done}/{total} frames")
+        print(f"Done. {total} frames encoded to {args.output} in {elapsed:.1f}s ({args.workers} worker(s))")
+    else:
+        print(f"Done. {total} frames written to {OUT_DIR} in {elapsed:.1f}s ({args.workers} worker(s))")
+        print("Next: assemble with ffmpeg (see docstring for commands)")
+
+
+if __name__ == "__main__":
+    main()
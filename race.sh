@@ -1,21 +1,34 @@
 #!/usr/bin/env bash
 # race.sh - Run both agents in parallel and capture timing + output
-# Usage: ./race.sh [--prompt "custom prompt"]
+# Usage: ./race.sh [--prompt "custom prompt"] [--trials N] [--concurrency K]
+#                  [--agent-cmd "command"] [--keep-worktrees]
+#
+# Every trial races A and B in their own git worktrees (checked out from HEAD),
+# so trials can run side by side and the shared A/ and B/ checkouts are never
+# touched. Results land in race-results/<timestamp>/trial-<n>/, and the
+# per-version summary (mean/median/p90 wall time, tokens, pass rate) is written
+# to race-results/<timestamp>/analysis.json.
+#
+# --agent-cmd swaps the claude CLI for anything that takes the same arguments
+# and prints stream-json, e.g. the stub for dry runs:
+#   ./race.sh --trials 4 --concurrency 2 --agent-cmd "python3 race-stub-agent.py"
 #
 # Prerequisites:
-#   - claude CLI installed and authenticated
-#   - Both A/ and B/ repos set up with dependencies installed
-#   - Both repos in clean git state
+#   - claude CLI installed and authenticated (unless --agent-cmd is given)
+#   - Dependencies for A/ and B/ installed (tests run inside each worktree)
+#   - Workshop changes committed: worktrees are created from HEAD
 
 set -euo pipefail
 
 SCRIPT_DIR="$(cd "$(dirname "${BASH_SOURCE[0]}")" && pwd)"
-REPO_A="$SCRIPT_DIR/A"
-REPO_B="$SCRIPT_DIR/B"
 RESULTS_DIR="$SCRIPT_DIR/race-results/$(date +%Y%m%d-%H%M%S)"
 
 # Default prompt
 PROMPT='Add a new feature: experiment tagging. Users should be able to add tags to experiments via a new API endpoint POST /api/experiments/{id}/tags (accepting a JSON body with a "name" field) and see tags displayed on the experiment detail page. Follow the existing patterns in the codebase. Run the tests to verify your changes work.'
+TRIALS=1
+CONCURRENCY=1
+AGENT_CMD="${RACE_AGENT_CMD:-claude}"
+KEEP_WORKTREES=false
 
 # Parse arguments
 while [[ $# -gt 0 ]]; do
@@ -24,6 +37,22 @@ while [[ $# -gt 0 ]]; do
             PROMPT="$2"
             shift 2
             ;;
+        --trials)
+            TRIALS="$2"
+            shift 2
+            ;;
+        --concurrency)
+            CONCURRENCY="$2"
+            shift 2
+            ;;
+        --agent-cmd)
+            AGENT_CMD="$2"
+            shift 2
+            ;;
+        --keep-worktrees)
+            KEEP_WORKTREES=true
+            shift
+            ;;
         *)
             echo "Unknown option: $1"
             exit 1
@@ -31,68 +60,132 @@ while [[ $# -gt 0 ]]; do
     esac
 done
 
+if ! [[ "$TRIALS" =~ ^[1-9][0-9]*$ && "$CONCURRENCY" =~ ^[1-9][0-9]*$ ]]; then
+    echo "--trials and --concurrency must be positive integers"
+    exit 1
+fi
+
 ALLOWED_TOOLS="Bash,Read,Write,Edit,Glob,Grep"
+read -r -a AGENT <<< "$AGENT_CMD"
+# Agents run inside the worktrees, so pin relative paths (e.g. a local stub script) to here
+for i in "${!AGENT[@]}"; do
+    if [[ "${AGENT[$i]}" != /* && -e "${AGENT[$i]}" ]]; then
+        AGENT[$i]="$PWD/${AGENT[$i]}"
+    fi
+done
 
 mkdir -p "$RESULTS_DIR"
+WORKTREE_ROOT="$(mktemp -d "${TMPDIR:-/tmp}/race-worktrees.XXXXXX")"
+
+cleanup_worktrees() {
+    if [[ "$KEEP_WORKTREES" == true ]]; then
+        echo "Worktrees kept in $WORKTREE_ROOT (remove with: git worktree remove --force <path>)"
+        return
+    fi
+    for wt in "$WORKTREE_ROOT"/*; do
+        [[ -d "$wt" ]] && git -C "$SCRIPT_DIR" worktree remove --force "$wt" >/dev/null 2>&1 || true
+    done
+    git -C "$SCRIPT_DIR" worktree prune
+    rm -rf "$WORKTREE_ROOT"
+}
+trap cleanup_worktrees EXIT
+trap 'echo ""; echo "Aborting..."; kill $(jobs -p) 2>/dev/null; exit 130' INT TERM
 
 echo "============================================"
 echo "  AGENT RACE"
 echo "============================================"
 echo ""
 echo "Prompt: $PROMPT"
+echo "Trials: $TRIALS (up to $CONCURRENCY at a time)"
+echo "Agent: $AGENT_CMD"
 echo "Results: $RESULTS_DIR"
 echo ""
 
 # Save the prompt
 echo "$PROMPT" > "$RESULTS_DIR/prompt.txt"
 
+now() {
+    python3 -c 'import time; print(f"{time.time():.3f}")'
+}
+
+# Use the version's own venv for its tests when it has one
+pytest_for() {
+    local version="$1"
+    if [[ -x "$SCRIPT_DIR/$version/.venv/bin/pytest" ]]; then
+        echo "$SCRIPT_DIR/$version/.venv/bin/pytest"
+    else
+        echo "pytest"
+    fi
+}
+
 # Function to run an agent and capture output
 run_agent() {
     local label="$1"
     local workdir="$2"
-    local output_file="$RESULTS_DIR/${label}.jsonl"
-    local log_file="$RESULTS_DIR/${label}.log"
-    local time_file="$RESULTS_DIR/${label}.time"
-
-    echo "[$label] Starting agent in $workdir..."
+    local out_dir="$3"
+    local version="$4"
+    local output_file="$out_dir/${label}.jsonl"
+    local log_file="$out_dir/${label}.log"
+    local time_file="$out_dir/${label}.time"
 
     # Record start time
-    local start_time=$(date +%s)
+    local start_time=$(now)
 
-    # Run claude with stream-json output, capture everything
+    # Run the agent with stream-json output, capture everything
     # Unset CLAUDECODE to allow nested sessions
+    # Each line gets an arrival timestamp so race-analyze.py can time tool calls
     cd "$workdir"
-    env -u CLAUDECODE claude -p "$PROMPT" \
+    env -u CLAUDECODE "${AGENT[@]}" -p "$PROMPT" \
         --output-format stream-json \
         --verbose \
         --allowedTools "$ALLOWED_TOOLS" \
-        > "$output_file" 2>"$log_file" || true
+        2>"$log_file" | python3 "$SCRIPT_DIR/race-analyze.py" --stamp > "$output_file" || true
 
     # Record end time
-    local end_time=$(date +%s)
-    local elapsed=$((end_time - start_time))
-
-    echo "$elapsed" > "$time_file"
-    echo "[$label] Finished in ${elapsed}s"
+    local end_time=$(now)
+    awk -v s="$start_time" -v e="$end_time" 'BEGIN { printf "%.1f\n", e - s }' > "$time_file"
+
+    # What the agent changed, and whether the version's test suite passes afterwards
+    git -C "$workdir" status --porcelain -- . > "$out_dir/${label}.files"
+    local status=0
+    "$(pytest_for "$version")" --tb=short -q > "$out_dir/${label}.tests.log" 2>&1 || status=$?
+    echo "$status" > "$out_dir/${label}.tests"
 }
 
-# Run both agents in parallel
-echo "Starting both agents..."
-echo ""
+# One trial: fresh worktrees for A and B, both agents in parallel
+run_trial() {
+    local trial="$1"
+    local out_dir="$RESULTS_DIR/trial-$trial"
+    mkdir -p "$out_dir"
 
-run_agent "A-before" "$REPO_A" &
-PID_A=$!
+    run_agent "A-before" "$WORKTREE_ROOT/trial-$trial-A/A" "$out_dir" A &
+    local pid_a=$!
+    run_agent "B-after" "$WORKTREE_ROOT/trial-$trial-B/B" "$out_dir" B &
+    local pid_b=$!
 
-run_agent "B-after" "$REPO_B" &
-PID_B=$!
+    wait $pid_a 2>/dev/null || true
+    wait $pid_b 2>/dev/null || true
+    echo "[trial $trial] A: $(cat "$out_dir/A-before.time")s  B: $(cat "$out_dir/B-after.time")s"
+}
 
-# Wait for both to finish
-echo "Waiting for agents to complete..."
-echo "(Press Ctrl+C to abort both)"
+# Run trials, at most $CONCURRENCY at a time (polling keeps this bash 3.2 compatible)
+echo "Starting trials..."
+echo "(Press Ctrl+C to abort all)"
 echo ""
 
-wait $PID_A 2>/dev/null || true
-wait $PID_B 2>/dev/null || true
+for trial in $(seq 1 "$TRIALS"); do
+    while [[ $(jobs -rp | wc -l) -ge $CONCURRENCY ]]; do
+        sleep 1
+    done
+    # Worktrees are created here, one at a time, so git never races on its own lock files
+    for version in A B; do
+        git -C "$SCRIPT_DIR" worktree add --detach --quiet "$WORKTREE_ROOT/trial-$trial-$version" HEAD
+    done
+    echo "[trial $trial] Starting agents..."
+    run_trial "$trial" &
+done
+
+wait
 
 echo ""
 echo "============================================"
@@ -100,44 +193,13 @@ echo "  RESULTS"
 echo "============================================"
 echo ""
 
-# Read timing
-TIME_A=$(cat "$RESULTS_DIR/A-before.time" 2>/dev/null || echo "DNF")
-TIME_B=$(cat "$RESULTS_DIR/B-after.time" 2>/dev/null || echo "DNF")
-
-echo "Version A (Before): ${TIME_A}s"
-echo "Version B (After):  ${TIME_B}s"
-echo ""
-
-# Count tool calls from stream-json output
-count_tool_calls() {
-    local file="$1"
-    if [[ -f "$file" ]]; then
-        grep -c '"type":"tool_use"' "$file" 2>/dev/null || echo "0"
-    else
-        echo "0"
-    fi
-}
-
-TOOLS_A=$(count_tool_calls "$RESULTS_DIR/A-before.jsonl")
-TOOLS_B=$(count_tool_calls "$RESULTS_DIR/B-after.jsonl")
-
-echo "Tool calls (A): $TOOLS_A"
-echo "Tool calls (B): $TOOLS_B"
-echo ""
-
-# Check if tests pass in B
-echo "Verifying Version B tests..."
-cd "$REPO_B"
-if pytest --tb=short -q 2>/dev/null; then
-    echo "Version B: ALL TESTS PASS"
-else
-    echo "Version B: SOME TESTS FAILED"
-fi
+python3 "$SCRIPT_DIR/race-analyze.py" "$RESULTS_DIR" --summary --out "$RESULTS_DIR/analysis.json"
 
-echo ""
 echo "Full output saved to: $RESULTS_DIR/"
-echo "  A-before.jsonl  - Agent A stream output"
-echo "  B-after.jsonl   - Agent B stream output"
-echo "  A-before.log    - Agent A stderr/verbose log"
-echo "  B-after.log     - Agent B stderr/verbose log"
-echo "  prompt.txt      - The prompt used"
+echo "  analysis.json            - Per-trial details and per-version summary"
+echo "  trial-N/A-before.jsonl   - Agent A stream output"
+echo "  trial-N/B-after.jsonl    - Agent B stream output"
+echo "  trial-N/*.log            - Agent stderr/verbose logs"
+echo "  trial-N/*.files          - Files each agent changed"
+echo "  trial-N/*.tests.log      - Test run after each agent finished"
+echo "  prompt.txt               - The prompt used"